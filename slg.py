@@ -1,225 +1,179 @@
 #!/usr/bin/env python3
 # SLG Strategy Game - Resource Management Simulation
 
-import random
+import argparse
+import io
+import re
+import sys
 import time
+from contextlib import redirect_stdout
 
-class SLGGame:
-    def __init__(self):
-        # Game resources
-        self.gold = 100
-        self.food = 50
-        self.wood = 30
-        self.stone = 20
-        
-        # Buildings
-        self.buildings = {
-            'farm': {'level': 1, 'food_production': 5},
-            'lumber_mill': {'level': 1, 'wood_production': 3},
-            'mine': {'level': 1, 'gold_production': 2},
-            'quarry': {'level': 1, 'stone_production': 2}
-        }
-        
-        # Population
-        self.population = 10
-        self.max_population = 20
-        
-        # Game state
-        self.day = 1
-        self.game_over = False
-        
-    def display_status(self):
-        print(f"\n=== Day {self.day} ===")
-        print(f"Resources: Gold: {self.gold} | Food: {self.food} | Wood: {self.wood} | Stone: {self.stone}")
-        print(f"Population: {self.population}/{self.max_population}")
-        print("Buildings:")
-        for building, info in self.buildings.items():
-            print(f"  {building.title()}: Level {info['level']}")
-    
-    def collect_resources(self):
-        """Collect resources from buildings"""
-        self.food += self.buildings['farm']['food_production']
-        self.wood += self.buildings['lumber_mill']['wood_production']
-        self.gold += self.buildings['mine']['gold_production']
-        self.stone += self.buildings['quarry']['stone_production']
-        
-        print("\nResources collected for the day!")
-    
-    def consume_resources(self):
-        """Population consumes food"""
-        food_needed = self.population
-        if self.food >= food_needed:
-            self.food -= food_needed
-            print(f"Population consumed {food_needed} food")
-            
-            # Chance for population growth if food is sufficient
-            if random.random() < 0.3 and self.population < self.max_population:
-                self.population += 1
-                print("Population grew by 1!")
-        else:
-            # Starvation
-            starvation = min(food_needed - self.food, self.population)
-            self.population -= starvation
-            self.food = 0
-            print(f"STARVATION! {starvation} people died from hunger!")
-    
-    def upgrade_building(self, building_name):
-        """Upgrade a building if resources are sufficient"""
-        if building_name not in self.buildings:
-            print("Invalid building name!")
-            return False
-            
-        current_level = self.buildings[building_name]['level']
-        cost_multiplier = current_level * 10
-        
-        costs = {
-            'gold': cost_multiplier * 5,
-            'wood': cost_multiplier * 3,
-            'stone': cost_multiplier * 2
-        }
-        
-        # Check if player has enough resources
-        if (self.gold >= costs['gold'] and 
-            self.wood >= costs['wood'] and 
-            self.stone >= costs['stone']):
-            
-            # Deduct resources
-            self.gold -= costs['gold']
-            self.wood -= costs['wood']
-            self.stone -= costs['stone']
-            
-            # Upgrade building
-            self.buildings[building_name]['level'] += 1
-            
-            # Increase production based on building type
-            if building_name == 'farm':
-                self.buildings[building_name]['food_production'] += 3
-            elif building_name == 'lumber_mill':
-                self.buildings[building_name]['wood_production'] += 2
-            elif building_name == 'mine':
-                self.buildings[building_name]['gold_production'] += 2
-            elif building_name == 'quarry':
-                self.buildings[building_name]['stone_production'] += 1
-            
-            print(f"{building_name.title()} upgraded to level {self.buildings[building_name]['level']}!")
-            return True
-        else:
-            print("Not enough resources for upgrade!")
-            print(f"Cost: Gold: {costs['gold']}, Wood: {costs['wood']}, Stone: {costs['stone']}")
-            return False
-    
-    def random_event(self):
-        """Random events that can occur"""
-        events = [
-            {
-                'name': 'Bountiful Harvest',
-                'probability': 0.2,
-                'effect': lambda: self.food + random.randint(10, 20),
-                'message': "A bountiful harvest provides extra food!"
-            },
-            {
-                'name': 'Bandit Raid',
-                'probability': 0.15,
-                'effect': lambda: self.gold - random.randint(5, 15),
-                'message': "Bandits raided your treasury!"
-            },
-            {
-                'name': 'Trade Opportunity',
-                'probability': 0.1,
-                'effect': lambda: (self.wood + 10, self.gold - 5),
-                'message': "A merchant offers a good trade!"
-            },
-            {
-                'name': 'Plague',
-                'probability': 0.1,
-                'effect': lambda: self.population - random.randint(1, 3),
-                'message': "A plague strikes your population!"
-            }
-        ]
-        
-        for event in events:
-            if random.random() < event['probability']:
-                result = event['effect']()
-                if isinstance(result, tuple):
-                    # Handle multiple resource changes
-                    self.wood, self.gold = result
-                elif event['name'] == 'Bountiful Harvest':
-                    self.food = result
-                elif event['name'] == 'Bandit Raid':
-                    self.gold = max(0, result)
-                elif event['name'] == 'Plague':
-                    self.population = max(1, result)
-                
-                print(f"\n*** EVENT: {event['name']} ***")
-                print(event['message'])
+from slg_core import SLGGame, spawn_seeds, stream_seed
+from slg_sinks import InvalidCommand, JsonLinesSink
+
+# A trailing ' xN' runs a command N times, e.g. 'next x25'
+REPEAT = re.compile(r'(.*\S)\s+x(\d+)$')
+
+
+def _plain(action):
+    return lambda words: (action, None) if len(words) == 1 else None
+
+def _building(action):
+    return lambda words: (action, words[1]) if len(words) > 1 else None
+
+def _skip(words):
+    if len(words) > 3 and words[1] == 'until' and words[2] == 'upgrade':
+        return 'skip_until_upgrade', words[3]
+    if len(words) > 1 and words[1].isdigit():
+        return 'skip_days', int(words[1])
+    return None
+
+# First word of a command -> parser of its words into (action, argument), or None
+COMMANDS = {
+    'status': _plain('status'),
+    'upgrade': _building('upgrade_building'),
+    'build': _building('build_building'),
+    'skip': _skip,
+    'next': _plain('next_day'),
+    'help': _plain('help'),
+    'quit': _plain('quit'),
+}
+
+# Actions after which interactive play shows the status
+ADVANCES = {'next_day', 'skip_days', 'skip_until_upgrade'}
+
+def parse_command(line):
+    """(action, argument, repeat) for a command line; the action is 'invalid' if it is not a command"""
+    command = line.strip().lower()
+    repeat = 1
+    match = REPEAT.match(command)
+    if match:
+        command, repeat = match.group(1), int(match.group(2))
+    words = command.split(' ')
+    parser = COMMANDS.get(words[0])
+    parsed = parser(words) if parser else None
+    if parsed is None:
+        return 'invalid', command, 1
+    return parsed + (repeat,)
+
+def command_handlers(game, json_output=False):
+    """Action -> game callable; actions with an argument take it, the others take nothing"""
+    emit = game.emit or (lambda record: None)
+
+    def status():
+        emit(game.status_record())
+
+    def invalid(command):
+        emit(InvalidCommand(game.day, command))
+
+    return {
+        'status': status,
+        'upgrade_building': game.upgrade_building,
+        'build_building': game.build_building,
+        'skip_until_upgrade': game.skip_until_upgrade,
+        'skip_days': game.skip_days,
+        'next_day': game.next_day,
+        'help': (lambda: None) if json_output else game.show_help,
+        'invalid': invalid,
+    }
+
+def run_script(game, lines, json_output=False):
+    """Run command lines until quit or the game ends; returns the commands run (repeats count).
+
+    Each distinct line is parsed once. Blank lines and lines starting
+    with '#' are skipped, and unlike interactive play the status is only
+    shown when a line asks for it.
+    """
+    handlers = command_handlers(game, json_output)
+    parsed = {}
+    executed = 0
+    for line in lines:
+        if game.game_over:
+            break
+        command = parsed.get(line)
+        if command is None:
+            stripped = line.lstrip()
+            command = parsed[line] = parse_command(line) if stripped and stripped[0] != '#' else ()
+        if not command:
+            continue
+        action, argument, repeat = command
+        if action == 'quit':
+            break
+        handler = handlers[action]
+        for _ in range(repeat):
+            if game.game_over:
                 break
-    
-    def next_day(self):
-        """Advance to the next day"""
-        self.day += 1
-        self.collect_resources()
-        self.consume_resources()
-        self.random_event()
-        
-        # Check game over conditions
-        if self.population <= 0:
-            self.game_over = True
-            print("\n💀 GAME OVER - Your population has perished!")
-        elif self.day >= 30:
-            self.game_over = True
-            print("\n🎉 VICTORY! You survived 30 days!")
-            self.display_final_score()
-    
-    def display_final_score(self):
-        """Display final game score"""
-        score = (self.gold + self.food + self.wood + self.stone) * self.population
-        print(f"\n=== FINAL SCORE ===")
-        print(f"Days Survived: {self.day}")
-        print(f"Final Population: {self.population}")
-        print(f"Total Resources: {self.gold + self.food + self.wood + self.stone}")
-        print(f"Final Score: {score}")
-    
-    def show_help(self):
-        """Display game instructions"""
-        print("\n=== SLG GAME COMMANDS ===")
-        print("status - Show current game status")
-        print("upgrade [building] - Upgrade a building (farm, lumber_mill, mine, quarry)")
-        print("next - Advance to next day")
-        print("help - Show this help message")
-        print("quit - Exit the game")
+            if argument is None:
+                handler()
+            else:
+                handler(argument)
+            executed += 1
+    return executed
 
-def main():
+def read_script(path):
+    """All lines of a command file at once; '-' reads stdin"""
+    if path == '-':
+        return sys.stdin.read().splitlines()
+    with open(path, encoding='utf-8') as f:
+        return f.read().splitlines()
+
+def play(game):
+    """Interactive play: one command per prompt, with the status after every advance"""
     print("🎮 Welcome to SLG Strategy Game!")
-    print("Manage your resources, build your empire, and survive for 30 days!")
-    
-    game = SLGGame()
+    print(f"Manage your resources, build your empire, and survive for {game.victory_day} days!")
+
     game.show_help()
-    
+    handlers = command_handlers(game)
+
     while not game.game_over:
         try:
-            command = input("\nEnter command: ").strip().lower()
-            
-            if command == 'quit':
+            action, argument, repeat = parse_command(input("\nEnter command: "))
+            if action == 'quit':
                 print("Thanks for playing!")
                 break
-            elif command == 'status':
+            handler = handlers[action]
+            for _ in range(repeat):
+                if game.game_over:
+                    break
+                if argument is None:
+                    handler()
+                else:
+                    handler(argument)
+            if action in ADVANCES and not game.game_over:
                 game.display_status()
-            elif command.startswith('upgrade '):
-                building = command.split(' ')[1]
-                game.upgrade_building(building)
-            elif command == 'next':
-                game.next_day()
-                if not game.game_over:
-                    game.display_status()
-            elif command == 'help':
-                game.show_help()
-            else:
-                print("Invalid command. Type 'help' for available commands.")
-        except KeyboardInterrupt:
+        except (KeyboardInterrupt, EOFError):
             print("\nGame interrupted. Thanks for playing!")
             break
         except Exception as e:
             print(f"Error: {e}")
 
+def main():
+    parser = argparse.ArgumentParser(description="Play the SLG strategy game")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--script', default=None, metavar='FILE',
+                        help="run the commands in FILE ('-' for stdin) without prompts")
+    parser.add_argument('--json', action='store_true', help="with --script, stream records as JSON lines")
+    parser.add_argument('--stats', action='store_true', help="with --script, report commands/s on stderr")
+    args = parser.parse_args()
+
+    if args.script is None:
+        play(SLGGame(args.seed))
+        return
+
+    lines = read_script(args.script)
+    start = time.perf_counter()
+    if args.json:
+        game = SLGGame(args.seed, sink=JsonLinesSink(sys.stdout))
+        executed = run_script(game, lines, json_output=True)
+        game.sink.flush()
+    else:
+        # Everything the game prints is kept and written in one go at the end
+        with redirect_stdout(io.StringIO()) as output:
+            executed = run_script(SLGGame(args.seed), lines)
+        sys.stdout.write(output.getvalue())
+    elapsed = time.perf_counter() - start
+    if args.stats:
+        print(f"{executed:,} commands in {elapsed:.3f} s ({executed / elapsed:,.0f} commands/s)", file=sys.stderr)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
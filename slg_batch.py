@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# SLG Strategy Game - Vectorized Batch Simulator
+
+import os
+import time
+
+import numpy as np
+
+from slg_buildings import BUILDING_REGISTRY
+from slg_core import DEFAULT_BALANCE, SLGGame
+from slg_events import EVENT_TABLE
+from slg_sinks import NULL_SINK, TextSink
+
+# Building order used for the per-game level/production columns. The batch
+# engine runs the default buildings only, one copy each, so column i also
+# produces resource i.
+BUILDINGS = list(BUILDING_REGISTRY.names)
+BASE_PRODUCTION = [building.production(1) for building in BUILDING_REGISTRY.types]
+PRODUCTION_STEP = [building.per_level for building in BUILDING_REGISTRY.types]
+
+
+class BatchSLGGame:
+    """N independent games stored as struct-of-arrays columns.
+
+    Every method applies the same rules as SLGGame in slg.py to all games
+    at once, with the same balance parameters. Games that are already over
+    are left untouched.
+    """
+
+    def __init__(self, n_games, seed=None, events=None, balance=None):
+        self.n_games = n_games
+        self.rng = np.random.default_rng(seed)
+        self.events = events if events is not None else EVENT_TABLE
+        self.event_thresholds = np.array(self.events.thresholds)
+        if balance:
+            unknown = set(balance) - set(DEFAULT_BALANCE)
+            if unknown:
+                raise ValueError(f"Unknown balance parameters {sorted(unknown)}")
+            balance = dict(DEFAULT_BALANCE, **balance)
+        else:
+            balance = DEFAULT_BALANCE
+        self.balance = balance
+        self.growth_chance = balance['growth_chance']
+        self.victory_day = balance['victory_day']
+
+        # Game resources
+        self.gold = np.empty(n_games, dtype=np.int64)
+        self.food = np.empty(n_games, dtype=np.int64)
+        self.wood = np.empty(n_games, dtype=np.int64)
+        self.stone = np.empty(n_games, dtype=np.int64)
+
+        # Buildings, one column per entry in BUILDINGS
+        self.levels = np.empty((n_games, len(BUILDINGS)), dtype=np.int64)
+        self.production = np.empty((n_games, len(BUILDINGS)), dtype=np.int64)
+
+        # Population
+        self.population = np.empty(n_games, dtype=np.int64)
+        self.max_population = np.empty(n_games, dtype=np.int64)
+
+        # Game state
+        self.day = np.empty(n_games, dtype=np.int64)
+        self.game_over = np.empty(n_games, dtype=bool)
+        self.victory = np.empty(n_games, dtype=bool)
+        self.reset()
+
+    def reset(self, mask=None):
+        """Start the selected games (all by default) over from day 1"""
+        rows = slice(None) if mask is None else mask
+        balance = self.balance
+        self.gold[rows] = balance['gold']
+        self.food[rows] = balance['food']
+        self.wood[rows] = balance['wood']
+        self.stone[rows] = balance['stone']
+        self.levels[rows] = 1
+        self.production[rows] = BASE_PRODUCTION
+        self.population[rows] = balance['population']
+        self.max_population[rows] = balance['max_population']
+        self.day[rows] = 1
+        self.game_over[rows] = False
+        self.victory[rows] = False
+
+    @property
+    def active(self):
+        """Mask of games that are still running"""
+        return ~self.game_over
+
+    def collect_resources(self, active):
+        """Collect resources from buildings"""
+        running = active.astype(np.int64)
+        self.food += self.production[:, 0] * running
+        self.wood += self.production[:, 1] * running
+        self.gold += self.production[:, 2] * running
+        self.stone += self.production[:, 3] * running
+
+    def consume_resources(self, active):
+        """Population consumes food, grows with the balance's growth chance or starves"""
+        food_needed = self.population
+        fed = active & (self.food >= food_needed)
+        starving = active & ~fed
+
+        grew = fed & (self.rng.random(self.n_games) < self.growth_chance) & (self.population < self.max_population)
+        starvation = np.where(starving, np.minimum(food_needed - self.food, self.population), 0)
+
+        self.food = np.where(fed, self.food - food_needed, np.where(starving, 0, self.food))
+        self.population = self.population + grew - starvation
+        return starvation
+
+    def random_event(self, active):
+        """Roll at most one random event per game and apply it.
+
+        Uses the same compiled event table as SLGGame: one uniform draw per
+        game picks the event. Returns the event index per game, -1 for none.
+        """
+        draws = self.rng.random(self.n_games)
+        events = np.searchsorted(self.event_thresholds, draws, side='right')
+        events = np.where(active & (events < len(self.events.events)), events, -1)
+
+        for event in self.events.events:
+            hit = events == event.index
+            if not hit.any():
+                continue
+            for field, low, high, floor in event.effects:
+                column = getattr(self, field)
+                if low == high:
+                    value = column + low
+                else:
+                    value = column + self.rng.integers(low, high + 1, self.n_games)
+                if floor is not None:
+                    value = np.maximum(floor, value)
+                setattr(self, field, np.where(hit, value, column))
+        return events
+
+    def check_game_over(self, active):
+        """Mark games that perished or reached the victory day"""
+        perished = active & (self.population <= 0)
+        survived = active & ~perished & (self.day >= self.victory_day)
+        self.game_over |= perished | survived
+        self.victory |= survived
+
+    def next_day(self, mask=None):
+        """Advance every running game (or the running games in mask) to the next day"""
+        active = self.active if mask is None else self.active & mask
+        self.day += active
+        self.collect_resources(active)
+        self.consume_resources(active)
+        self.random_event(active)
+        self.check_game_over(active)
+        return int(active.sum())
+
+    def upgrade_building(self, building_name, mask=None):
+        """Upgrade a building in every selected game that can afford it.
+
+        Returns a boolean mask of the games where the upgrade happened.
+        """
+        if building_name not in BUILDINGS:
+            raise ValueError(f"Invalid building name: {building_name}")
+        column = BUILDINGS.index(building_name)
+
+        # Price each distinct level once with the building's own cost rule
+        building = BUILDING_REGISTRY.types[column]
+        levels, inverse = np.unique(self.levels[:, column], return_inverse=True)
+        costs = np.array([building.upgrade_cost(int(level)) for level in levels], dtype=np.int64)[inverse]
+        food_cost, wood_cost, gold_cost, stone_cost = costs.T
+
+        upgraded = (self.active & (self.gold >= gold_cost) & (self.wood >= wood_cost) &
+                    (self.stone >= stone_cost) & (self.food >= food_cost))
+        if mask is not None:
+            upgraded &= mask
+
+        self.food -= food_cost * upgraded
+        self.gold -= gold_cost * upgraded
+        self.wood -= wood_cost * upgraded
+        self.stone -= stone_cost * upgraded
+        self.levels[:, column] += upgraded
+        self.production[:, column] += PRODUCTION_STEP[column] * upgraded
+        return upgraded
+
+    def final_scores(self):
+        """Final score per game, as in SLGGame.display_final_score"""
+        return (self.gold + self.food + self.wood + self.stone) * self.population
+
+    def run(self):
+        """Play every game until it is over"""
+        while self.next_day():
+            pass
+
+
+def scalar_games_per_second(n_games, sink=NULL_SINK):
+    """Play n_games SLGGame instances one by one, sending their records to sink"""
+    start = time.perf_counter()
+    for _ in range(n_games):
+        game = SLGGame(sink=sink)
+        while not game.game_over:
+            game.next_day()
+    return n_games / (time.perf_counter() - start)
+
+
+def batch_games_per_second(n_games, seed=None):
+    """Play n_games in lockstep with BatchSLGGame"""
+    start = time.perf_counter()
+    BatchSLGGame(n_games, seed).run()
+    return n_games / (time.perf_counter() - start)
+
+
+def main():
+    with open(os.devnull, 'w') as devnull:
+        text = scalar_games_per_second(2000, TextSink(devnull))
+    scalar = scalar_games_per_second(2000)
+    batch = batch_games_per_second(100000, seed=0)
+    print(f"Scalar SLGGame (text output): {text:12,.0f} games/s")
+    print(f"Scalar SLGGame (null sink):   {scalar:12,.0f} games/s")
+    print(f"BatchSLGGame:                 {batch:12,.0f} games/s ({batch / scalar:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# SLG Strategy Game - Engine Benchmark Suite
+
+import argparse
+import json
+import platform
+import re
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from slg_core import SLGGame
+from slg_sinks import NULL_SINK
+
+BASELINE_FILE = 'bench_baseline.json'
+
+# Metric name -> True if higher is better
+METRICS = {
+    'next_day_per_second': True,
+    'upgrade_per_second': True,
+    'games_per_second': True,
+    'bytes_per_game': False,
+    'import_slg_ms': False,
+    'import_slg_ui_ms': False,
+}
+
+IMPORT_TIME_LINE = re.compile(r'^import time:\s+\d+ \|\s+(\d+) \| (\S+)$')
+
+# Report fields that must match the baseline for absolute numbers to be comparable
+ENVIRONMENT = ('python', 'machine')
+
+
+def best_rate(run, calls, repeat):
+    """Best calls/second of repeat timed runs of run(calls)"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(calls)
+        best = min(best, time.perf_counter() - start)
+    return calls / best
+
+
+def bench_next_day(calls=100000, repeat=5):
+    """next_day calls per second on one game (next_day keeps working past day 30)"""
+    def run(n):
+        next_day = SLGGame(seed=1, sink=NULL_SINK).next_day
+        for _ in range(n):
+            next_day()
+    return best_rate(run, calls, repeat)
+
+
+def bench_upgrade(calls=100000, repeat=5):
+    """Successful upgrade_building calls per second, cycling through the buildings"""
+    game = SLGGame(seed=1, sink=NULL_SINK)
+    game.gold = game.wood = game.stone = 10 ** 12
+    rich = game.snapshot()
+    buildings = list(game.buildings) * 250
+
+    def run(n):
+        upgrade = game.upgrade_building
+        for _ in range(n // len(buildings)):
+            game.restore(rich)
+            for building in buildings:
+                upgrade(building)
+    return best_rate(run, calls - calls % len(buildings), repeat)
+
+
+def bench_games(calls=5000, repeat=5):
+    """Full games per second, seeded 0..calls-1"""
+    def run(n):
+        for seed in range(n):
+            game = SLGGame(seed, sink=NULL_SINK)
+            while not game.game_over:
+                game.next_day()
+    return best_rate(run, calls, repeat)
+
+
+def bench_memory(count=1000):
+    """Bytes allocated per live SLGGame, including its RNG"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        games = [SLGGame(seed, sink=NULL_SINK) for seed in range(count)]
+        allocated = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del games
+    return allocated / count
+
+
+def bench_import(module, repeat=5):
+    """Cold import time of a module in milliseconds, best of repeat fresh interpreters"""
+    best = float('inf')
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                                capture_output=True, text=True, check=True)
+        for line in result.stderr.splitlines():
+            match = IMPORT_TIME_LINE.match(line)
+            if match and match.group(2) == module:
+                best = min(best, int(match.group(1)) / 1000)
+    return best
+
+
+def run_benchmarks(scale=1.0):
+    """Run every benchmark; scale shrinks or grows the work per measurement"""
+    return {
+        'next_day_per_second': bench_next_day(max(1, int(100000 * scale))),
+        'upgrade_per_second': bench_upgrade(max(1000, int(100000 * scale))),
+        'games_per_second': bench_games(max(1, int(5000 * scale))),
+        'bytes_per_game': bench_memory(),
+        'import_slg_ms': bench_import('slg'),
+        'import_slg_ui_ms': bench_import('slg_ui'),
+    }
+
+
+def environment():
+    """The ENVIRONMENT fields of a report measured on this interpreter and machine"""
+    return {'python': platform.python_version(), 'machine': platform.machine()}
+
+
+def mismatched_environment(report, baseline_report):
+    """ENVIRONMENT fields that differ between a report and the baseline report"""
+    return [name for name in ENVIRONMENT if report.get(name) != baseline_report.get(name)]
+
+
+def compare(results, baseline, threshold):
+    """Metrics that got worse than the baseline by more than threshold.
+
+    Returns (name, baseline, result, change) tuples, change being the
+    relative regression (0.3 means 30% worse).
+    """
+    regressions = []
+    for name, higher_is_better in METRICS.items():
+        if name not in baseline or name not in results:
+            continue
+        old, new = baseline[name], results[name]
+        change = (old - new) / old if higher_is_better else (new - old) / old
+        if change > threshold:
+            regressions.append((name, old, new, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the SLG engine against a committed baseline")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="baseline results to compare against")
+    parser.add_argument('--output', default=None, help="write the results here as JSON")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="fail if a metric is this much worse than the baseline (default 0.25)")
+    parser.add_argument('--scale', type=float, default=1.0, help="multiply the work per measurement")
+    parser.add_argument('--update-baseline', action='store_true', help="save the results as the new baseline")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.scale)
+    report = dict(environment(), metrics=results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+
+    try:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline_report = json.load(f)
+    except FileNotFoundError:
+        baseline_report = {}
+    baseline = baseline_report.get('metrics', {})
+
+    for name, value in results.items():
+        line = f"{name:22} {value:14,.1f}"
+        if name in baseline:
+            line += f"   baseline {baseline[name]:14,.1f}"
+        print(line)
+
+    mismatched = mismatched_environment(report, baseline_report) if baseline else []
+    if mismatched:
+        details = ", ".join(f"{name} {baseline_report.get(name)} vs {report[name]}" for name in mismatched)
+        print(f"⚠️  Baseline measured elsewhere ({details}); not comparing. "
+              f"Rerun with --update-baseline on this machine to gate on it.")
+        return
+
+    regressions = compare(results, baseline, args.threshold)
+    for name, old, new, change in regressions:
+        print(f"❌ {name} regressed {change:.0%}: {old:,.1f} -> {new:,.1f}")
+    if regressions:
+        raise SystemExit(1)
+    print(f"✅ No metric regressed by more than {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# SLG Strategy Game - Data-Driven Building Registry
+
+import os
+
+# Resources a building can produce or cost, in production vector order
+RESOURCES = ('food', 'wood', 'gold', 'stone')
+
+# Default buildings. A building of type T at level L produces
+# 'production' + 'production_per_level' * (L - 1) of its resource per copy
+# and day. Upgrading a type raises the level of all its copies and costs
+# 'cost' * L per copy (or 'cost' * cost_growth ** (L - 1) when a
+# 'cost_growth' is given); a new copy is built at the type's current level
+# for the cost of one copy. 'count' is the number of copies at game start.
+DEFAULT_BUILDINGS = [
+    {'name': 'farm', 'resource': 'food', 'production': 5, 'production_per_level': 3,
+     'cost': {'gold': 50, 'wood': 30, 'stone': 20}},
+    {'name': 'lumber_mill', 'resource': 'wood', 'production': 3, 'production_per_level': 2,
+     'cost': {'gold': 50, 'wood': 30, 'stone': 20}},
+    {'name': 'mine', 'resource': 'gold', 'production': 2, 'production_per_level': 2,
+     'cost': {'gold': 50, 'wood': 30, 'stone': 20}},
+    {'name': 'quarry', 'resource': 'stone', 'production': 2, 'production_per_level': 1,
+     'cost': {'gold': 50, 'wood': 30, 'stone': 20}},
+]
+
+
+class BuildingType:
+    """One compiled building definition; costs are in RESOURCES order"""
+
+    __slots__ = ('index', 'name', 'resource', 'resource_index', 'key', 'base', 'per_level',
+                 'costs', 'cost_growth', 'count')
+
+    def __init__(self, index, name, resource, base, per_level, costs, cost_growth, count):
+        self.index = index
+        self.name = name
+        self.resource = resource
+        self.resource_index = RESOURCES.index(resource)
+        self.key = f"{resource}_production"
+        self.base = base
+        self.per_level = per_level
+        self.costs = costs
+        self.cost_growth = cost_growth
+        self.count = count
+
+    def production(self, level):
+        """Daily production of one copy at a level"""
+        return self.base + self.per_level * (level - 1)
+
+    def upgrade_cost(self, level, count=1):
+        """(food, wood, gold, stone) to raise count copies from level to level + 1.
+
+        A type with no copies yet is charged as one copy.
+        """
+        food, wood, gold, stone = self.costs
+        count = count or 1
+        if self.cost_growth is None:
+            multiplier = level * count
+            return food * multiplier, wood * multiplier, gold * multiplier, stone * multiplier
+        factor = self.cost_growth ** (level - 1)
+        return (round(food * factor) * count, round(wood * factor) * count,
+                round(gold * factor) * count, round(stone * factor) * count)
+
+    def __repr__(self):
+        return f"BuildingType({self.name!r}, produces {self.resource})"
+
+
+class BuildingRegistry:
+    """Building definitions compiled for the engine.
+
+    Each type records which slot of the production vector it feeds, so an
+    SLGGame can keep that vector up to date on every build and upgrade and
+    collect resources in O(len(RESOURCES)) however many buildings exist.
+    """
+
+    def __init__(self, specs):
+        self.types = []
+        for index, spec in enumerate(specs):
+            name = spec['name']
+            if spec['resource'] not in RESOURCES:
+                raise ValueError(f"Building {name!r} produces unknown resource {spec['resource']!r}")
+            unknown = set(spec.get('cost', {})) - set(RESOURCES)
+            if unknown:
+                raise ValueError(f"Building {name!r} costs unknown resources {sorted(unknown)}")
+            cost_growth = spec.get('cost_growth')
+            if cost_growth is not None and cost_growth <= 0:
+                raise ValueError(f"Building {name!r} has cost_growth {cost_growth} <= 0")
+            count = int(spec.get('count', 1))
+            if count < 0:
+                raise ValueError(f"Building {name!r} starts with {count} copies")
+            costs = tuple(int(spec.get('cost', {}).get(resource, 0)) for resource in RESOURCES)
+            self.types.append(BuildingType(index, name, spec['resource'], int(spec['production']),
+                                           int(spec.get('production_per_level', 0)), costs,
+                                           cost_growth, count))
+        self.by_name = {building.name: building for building in self.types}
+        if len(self.by_name) != len(self.types):
+            raise ValueError("Building names must be unique")
+        self.names = tuple(building.name for building in self.types)
+
+    @classmethod
+    def from_file(cls, path):
+        """Load building definitions from a .json or .toml file.
+
+        TOML files list buildings as an array of tables named 'buildings'.
+        """
+        if os.path.splitext(path)[1].lower() == '.toml':
+            import tomllib
+            with open(path, 'rb') as f:
+                return cls(tomllib.load(f)['buildings'])
+        import json
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def __len__(self):
+        return len(self.types)
+
+    def initial_buildings(self):
+        """Fresh per-game building records: level, count and total production"""
+        return {building.name: {'level': 1, 'count': building.count,
+                                building.key: building.production(1) * building.count}
+                for building in self.types}
+
+    def production_vector(self, production):
+        """Per-resource totals from per-type production, in RESOURCES order"""
+        totals = [0] * len(RESOURCES)
+        for building, amount in zip(self.types, production):
+            totals[building.resource_index] += amount
+        return totals
+
+
+# The registry every engine uses unless given another one
+BUILDING_REGISTRY = BuildingRegistry(DEFAULT_BUILDINGS)
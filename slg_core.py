@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# SLG Strategy Game - Core Game Engine
+
+import hashlib
+import random
+
+from slg_buildings import BUILDING_REGISTRY, RESOURCES
+from slg_events import EVENT_TABLE
+from slg_sinks import (BuildFailed, BuildingBuilt, BuildingUpgraded, DaysSkipped, EventTriggered, FoodConsumed,
+                       GameOver, InvalidBuilding, NullSink, PopulationGrew, ResourcesCollected, Starvation,
+                       StatusShown, TextSink, UpgradeFailed)
+from slg_state import GROWTH_CHANCE, VICTORY_DAY, GameState
+
+# Balance constants a game starts from; SLGGame(balance=...) overrides any
+# of them, e.g. for slg_tuner sweeps. The lookahead engines in slg_state,
+# slg_planner and slg_exact assume these defaults.
+DEFAULT_BALANCE = {
+    'gold': 100,
+    'food': 50,
+    'wood': 30,
+    'stone': 20,
+    'population': 10,
+    'max_population': 20,
+    'growth_chance': GROWTH_CHANCE,
+    'victory_day': VICTORY_DAY,
+}
+
+def stream_seed(seed, *path):
+    """Seed of an independent child stream, e.g. stream_seed(run_seed, shard, game).
+    
+    Streams are derived by hashing, so any stream can be jumped to directly
+    and parallel runners never have to share or lock an RNG.
+    """
+    key = "/".join(str(part) for part in (seed,) + path)
+    return int.from_bytes(hashlib.sha256(key.encode()).digest()[:8], 'little')
+
+def spawn_seeds(seed, count, start=0):
+    """Seeds for child streams start .. start+count-1 of a parent seed"""
+    return [stream_seed(seed, stream) for stream in range(start, start + count)]
+
+class SLGGame:
+    """The game rules, shared by the CLI, the Tk UI and every headless tool.
+
+    This module must stay cheap to import: no tkinter, no numpy.
+    """
+    
+    def __init__(self, seed=None, rng=None, events=None, sink=None, registry=None, balance=None):
+        # Per-game random stream, so games never share the global RNG
+        self.seed = seed
+        self.rng = rng if rng is not None else random.Random(seed)
+        self.events = events if events is not None else EVENT_TABLE
+        self.registry = registry if registry is not None else BUILDING_REGISTRY
+        
+        # Where game records go; the default prints the classic CLI text
+        self.set_sink(sink if sink is not None else TextSink())
+        
+        if balance:
+            unknown = set(balance) - set(DEFAULT_BALANCE)
+            if unknown:
+                raise ValueError(f"Unknown balance parameters {sorted(unknown)}")
+            balance = dict(DEFAULT_BALANCE, **balance)
+        else:
+            balance = DEFAULT_BALANCE
+        self.growth_chance = balance['growth_chance']
+        self.victory_day = balance['victory_day']
+        
+        # Game resources
+        self.gold = balance['gold']
+        self.food = balance['food']
+        self.wood = balance['wood']
+        self.stone = balance['stone']
+        
+        # Buildings, plus total production per resource (in RESOURCES order),
+        # which is kept up to date by every build and upgrade
+        self.buildings = self.registry.initial_buildings()
+        self.production = self.registry.production_vector(
+            info[building.key] for building, info in zip(self.registry.types, self.buildings.values()))
+        
+        # Population
+        self.population = balance['population']
+        self.max_population = balance['max_population']
+        
+        # Game state
+        self.day = 1
+        self.game_over = False
+        
+    def set_sink(self, sink):
+        """Send game records to a sink; records are not even built for a NullSink"""
+        self.sink = sink
+        self.emit = None if isinstance(sink, NullSink) else sink.emit
+    
+    def snapshot(self):
+        """Capture the game state (without the RNG) as a compact GameState"""
+        return GameState.from_game(self)
+    
+    def restore(self, state):
+        """Return to a state captured by snapshot()"""
+        state.apply_to(self)
+    
+    def display_status(self):
+        print(f"\n=== Day {self.day} ===")
+        print(f"Resources: Gold: {self.gold} | Food: {self.food} | Wood: {self.wood} | Stone: {self.stone}")
+        print(f"Population: {self.population}/{self.max_population}")
+        print("Buildings:")
+        for building, info in self.buildings.items():
+            copies = f" x{info['count']}" if info['count'] != 1 else ""
+            print(f"  {building.title()}: Level {info['level']}{copies}")
+    
+    def collect_resources(self):
+        """Collect resources from buildings, using the cached production vector"""
+        food, wood, gold, stone = self.production
+        self.food += food
+        self.wood += wood
+        self.gold += gold
+        self.stone += stone
+        
+        if self.emit:
+            self.emit(ResourcesCollected(self.day, food, wood, gold, stone))
+    
+    def consume_resources(self):
+        """Population consumes food"""
+        food_needed = self.population
+        if self.food >= food_needed:
+            self.food -= food_needed
+            if self.emit:
+                self.emit(FoodConsumed(self.day, food_needed))
+            
+            # Chance for population growth if food is sufficient
+            if self.rng.random() < self.growth_chance and self.population < self.max_population:
+                self.population += 1
+                if self.emit:
+                    self.emit(PopulationGrew(self.day, self.population))
+        else:
+            # Starvation
+            starvation = min(food_needed - self.food, self.population)
+            self.population -= starvation
+            self.food = 0
+            if self.emit:
+                self.emit(Starvation(self.day, starvation))
+    
+    def upgrade_building(self, building_name):
+        """Upgrade every copy of a building type if resources are sufficient"""
+        building = self.registry.by_name.get(building_name)
+        if building is None:
+            if self.emit:
+                self.emit(InvalidBuilding(self.day, building_name))
+            return False
+        
+        info = self.buildings[building_name]
+        level = info['level']
+        count = info['count']
+        food_cost, wood_cost, gold_cost, stone_cost = building.upgrade_cost(level, count)
+        
+        # Check if player has enough resources
+        if (self.gold >= gold_cost and self.wood >= wood_cost and
+                self.stone >= stone_cost and self.food >= food_cost):
+            
+            # Deduct resources
+            self.gold -= gold_cost
+            self.wood -= wood_cost
+            self.stone -= stone_cost
+            self.food -= food_cost
+            
+            # Upgrade the building and its share of the production vector
+            info['level'] = level + 1
+            step = building.per_level * count
+            info[building.key] += step
+            self.production[building.resource_index] += step
+            
+            if self.emit:
+                self.emit(BuildingUpgraded(self.day, building_name, level + 1))
+            return True
+        else:
+            if self.emit:
+                self.emit(UpgradeFailed(self.day, building_name, gold_cost, wood_cost, stone_cost))
+            return False
+    
+    def build_building(self, building_name):
+        """Build another copy of a building type at its current level"""
+        building = self.registry.by_name.get(building_name)
+        if building is None:
+            if self.emit:
+                self.emit(InvalidBuilding(self.day, building_name))
+            return False
+        
+        info = self.buildings[building_name]
+        food_cost, wood_cost, gold_cost, stone_cost = building.upgrade_cost(info['level'])
+        if (self.gold >= gold_cost and self.wood >= wood_cost and
+                self.stone >= stone_cost and self.food >= food_cost):
+            self.gold -= gold_cost
+            self.wood -= wood_cost
+            self.stone -= stone_cost
+            self.food -= food_cost
+            
+            info['count'] += 1
+            output = building.production(info['level'])
+            info[building.key] += output
+            self.production[building.resource_index] += output
+            
+            if self.emit:
+                self.emit(BuildingBuilt(self.day, building_name, info['count']))
+            return True
+        else:
+            if self.emit:
+                self.emit(BuildFailed(self.day, building_name, gold_cost, wood_cost, stone_cost))
+            return False
+    
+    def random_event(self):
+        """Random events that can occur"""
+        event = self.events.roll(self.rng)
+        if event is not None:
+            self.events.apply(event, self, self.rng)
+            if self.emit:
+                self.emit(EventTriggered(self.day, event.name, event.message))
+        return event
+    
+    def next_day(self):
+        """Advance to the next day"""
+        self.day += 1
+        self.collect_resources()
+        self.consume_resources()
+        self.random_event()
+        self.check_game_over()
+    
+    def check_game_over(self):
+        """End the game if the population perished or victory_day (30) days have passed"""
+        if self.population <= 0 or self.day >= self.victory_day:
+            self.game_over = True
+            if self.emit:
+                self.emit(self.game_over_record())
+    
+    def game_over_record(self):
+        """The GameOver record for the game as it stands"""
+        return GameOver(self.day, self.population > 0, self.population,
+                        self.gold + self.food + self.wood + self.stone, self.final_score())
+    
+    def status_record(self):
+        """A StatusShown record for the game as it stands; renders as display_status"""
+        return StatusShown(self.day, self.gold, self.food, self.wood, self.stone, self.population,
+                           self.max_population, tuple((building, info['level'], info['count'])
+                                                      for building, info in self.buildings.items()))
+    
+    def skip_days(self, days):
+        """Play up to days days without per-day records; returns the days played.
+        
+        The days are played by next_day itself, drawing exactly the same
+        random numbers, but only a DaysSkipped summary (and GameOver, if the
+        game ends) is emitted.
+        """
+        start, was_over = self.day, self.game_over
+        self._play_quietly(days)
+        self._report_skip(start, was_over)
+        return self.day - start
+    
+    def _play_quietly(self, days):
+        emit = self.emit
+        self.emit = None
+        try:
+            for _ in range(days):
+                if self.game_over:
+                    break
+                self.next_day()
+        finally:
+            self.emit = emit
+    
+    def _report_skip(self, start, was_over):
+        if self.emit:
+            self.emit(DaysSkipped(self.day, self.day - start))
+            if self.game_over and not was_over:
+                self.emit(self.game_over_record())
+    
+    def days_until_affordable(self, costs):
+        """Fewest days before costs (food, wood, gold, stone) could be affordable.
+        
+        Assumes every day brings full production plus the biggest gain any
+        event can give, so the game can never afford the costs sooner.
+        Returns None if production and events can never get there.
+        """
+        days = 0
+        for resource, cost, have, rate in zip(RESOURCES, costs, (self.food, self.wood, self.gold, self.stone),
+                                              self.production):
+            if have >= cost:
+                continue
+            gain = rate + self.events.max_gain(resource)
+            if gain <= 0:
+                return None
+            days = max(days, -(-(cost - have) // gain))
+        return days
+    
+    def skip_until_upgrade(self, building_name):
+        """Skip days until a building's upgrade is affordable; returns the days played.
+        
+        Jumps straight to the first day the upgrade could be affordable,
+        checks, and jumps again, so most days are played without any
+        decision or output. Stops early when the game ends.
+        """
+        building = self.registry.by_name.get(building_name)
+        if building is None:
+            if self.emit:
+                self.emit(InvalidBuilding(self.day, building_name))
+            return 0
+        
+        info = self.buildings[building_name]
+        costs = building.upgrade_cost(info['level'], info['count'])
+        days = self.days_until_affordable(costs)
+        if days is None:
+            if self.emit:
+                self.emit(UpgradeFailed(self.day, building_name, costs[2], costs[1], costs[3]))
+            return 0
+        
+        start, was_over = self.day, self.game_over
+        while days and not self.game_over:
+            self._play_quietly(days)
+            days = self.days_until_affordable(costs)
+        self._report_skip(start, was_over)
+        return self.day - start
+    
+    def final_score(self):
+        """Total resources multiplied by the surviving population"""
+        return (self.gold + self.food + self.wood + self.stone) * self.population
+    
+    def display_final_score(self):
+        """Display final game score"""
+        score = self.final_score()
+        print(f"\n=== FINAL SCORE ===")
+        print(f"Days Survived: {self.day}")
+        print(f"Final Population: {self.population}")
+        print(f"Total Resources: {self.gold + self.food + self.wood + self.stone}")
+        print(f"Final Score: {score}")
+    
+    def help_text(self):
+        """The game instructions show_help prints"""
+        return "\n".join([
+            "\n=== SLG GAME COMMANDS ===",
+            "status - Show current game status",
+            f"upgrade [building] - Upgrade a building ({', '.join(self.registry.names)})",
+            "build [building] - Build another copy of a building",
+            "skip [days] - Advance several days at once",
+            "skip until upgrade [building] - Advance until an upgrade is affordable",
+            "next - Advance to next day",
+            "help - Show this help message",
+            "quit - Exit the game",
+        ])
+    
+    def show_help(self):
+        """Display game instructions"""
+        print(self.help_text())
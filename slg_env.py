@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# SLG Strategy Game - Vectorized Training Environment
+
+import argparse
+import time
+
+import numpy as np
+
+from slg_batch import BUILDINGS, PRODUCTION_STEP, BatchSLGGame
+from slg_buildings import BUILDING_REGISTRY
+
+# Action ids: 0..3 upgrade BUILDINGS[id], 4 advances to the next day
+ACTIONS = tuple(BUILDINGS) + ('next',)
+NEXT_DAY = len(BUILDINGS)
+
+# Observation columns
+OBSERVATION_FIELDS = (('day', 'gold', 'food', 'wood', 'stone', 'population', 'max_population') +
+                      tuple(f"{building}_level" for building in BUILDINGS))
+
+# Upgrade cost per level of each building, as (food, wood, gold, stone) columns
+UNIT_COSTS = np.array([building.costs for building in BUILDING_REGISTRY.types], dtype=np.int64)
+PRODUCTION_STEPS = np.array(PRODUCTION_STEP, dtype=np.int64)
+
+
+class SLGVectorEnv:
+    """Gym-style environment running a batch of SLG games in lockstep.
+
+    step() takes one action id per game. Upgrades the game cannot afford
+    are no-ops; action_mask holds the legal actions for the next step,
+    computed with upgrade_building's cost rule. The reward is the final
+    score (total resources x population) on the step a game ends, or with
+    dense=True the change in that score on every step, which sums to the
+    same total less the starting score. A game that ended is reset on the
+    next step, which ignores its action and returns its first observation.
+    Games still running after max_episode_steps steps are truncated.
+
+    observations, rewards, terminated, truncated and action_mask are
+    preallocated and overwritten in place by every reset() and step().
+    """
+
+    def __init__(self, n_envs, dense=False, max_episode_steps=1000, events=None):
+        self.n_envs = n_envs
+        self.dense = dense
+        self.max_episode_steps = max_episode_steps
+        self.events = events
+        self.games = None
+        self.observations = np.zeros((n_envs, len(OBSERVATION_FIELDS)), dtype=np.float32)
+        self.rewards = np.zeros(n_envs, dtype=np.float32)
+        self.terminated = np.zeros(n_envs, dtype=bool)
+        self.truncated = np.zeros(n_envs, dtype=bool)
+        self.action_mask = np.zeros((n_envs, len(ACTIONS)), dtype=bool)
+        self.infos = {}
+        self._steps = np.zeros(n_envs, dtype=np.int64)
+        self._scores = np.zeros(n_envs, dtype=np.int64)
+        self._rows = np.arange(n_envs)
+
+    def reset(self, seed=None):
+        """Start every game over; returns (observations, infos)"""
+        self.games = BatchSLGGame(self.n_envs, seed, self.events)
+        self._steps[:] = 0
+        self.terminated[:] = False
+        self.truncated[:] = False
+        self._scores[:] = self.games.final_scores()
+        self._observe()
+        return self.observations, self.infos
+
+    def step(self, actions):
+        """Apply one action per game; returns (observations, rewards, terminated, truncated, infos)"""
+        games = self.games
+        actions = np.asarray(actions)
+        finished = self.terminated | self.truncated
+        restarting = finished.any()
+        if restarting:
+            games.reset(finished)
+
+        # Upgrades that are legal for the chosen building
+        building = np.minimum(actions, NEXT_DAY - 1)
+        upgrading = (actions < NEXT_DAY) & self.action_mask[self._rows, building]
+        if restarting:
+            upgrading &= ~finished
+        if upgrading.any():
+            rows = self._rows[upgrading]
+            columns = building[upgrading]
+            costs = UNIT_COSTS[columns] * games.levels[rows, columns][:, None]
+            games.food[rows] -= costs[:, 0]
+            games.wood[rows] -= costs[:, 1]
+            games.gold[rows] -= costs[:, 2]
+            games.stone[rows] -= costs[:, 3]
+            games.levels[rows, columns] += 1
+            games.production[rows, columns] += PRODUCTION_STEPS[columns]
+
+        advancing = actions == NEXT_DAY
+        if restarting:
+            advancing &= ~finished
+        games.next_day(advancing)
+
+        self._steps += 1
+        if restarting:
+            self._steps[finished] = 0
+        np.copyto(self.terminated, games.game_over)
+        np.greater_equal(self._steps, self.max_episode_steps, out=self.truncated)
+        self.truncated &= ~self.terminated
+
+        scores = games.final_scores()
+        if self.dense:
+            np.subtract(scores, self._scores, out=self.rewards, casting='unsafe')
+            if restarting:
+                self.rewards[finished] = 0.0
+            self._scores[:] = scores
+        else:
+            self.rewards[:] = 0.0
+            np.copyto(self.rewards, scores, where=self.terminated, casting='unsafe')
+        self._observe()
+        return self.observations, self.rewards, self.terminated, self.truncated, self.infos
+
+    def _observe(self):
+        games = self.games
+        observations = self.observations
+        for column, field in enumerate(OBSERVATION_FIELDS[:7]):
+            observations[:, column] = getattr(games, field)
+        observations[:, 7:] = games.levels
+
+        # Legal actions: affordable upgrades and next day, for running games
+        mask = self.action_mask
+        costs = games.levels[:, :, None] * UNIT_COSTS[None, :, :]
+        np.less_equal(costs[:, :, 0], games.food[:, None], out=mask[:, :NEXT_DAY])
+        mask[:, :NEXT_DAY] &= costs[:, :, 1] <= games.wood[:, None]
+        mask[:, :NEXT_DAY] &= costs[:, :, 2] <= games.gold[:, None]
+        mask[:, :NEXT_DAY] &= costs[:, :, 3] <= games.stone[:, None]
+        mask[:, NEXT_DAY] = True
+        mask &= ~games.game_over[:, None]
+
+
+def steps_per_second(n_envs=4096, steps=500, seed=0):
+    """Environment steps per second with random actions"""
+    env = SLGVectorEnv(n_envs)
+    env.reset(seed)
+    rng = np.random.default_rng(seed)
+    # Mostly next day, sometimes an upgrade, drawn ahead of time
+    choices = rng.choice(len(ACTIONS), size=(64, n_envs), p=[0.05, 0.05, 0.05, 0.05, 0.8])
+    start = time.perf_counter()
+    for step in range(steps):
+        env.step(choices[step % len(choices)])
+    return n_envs * steps / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure SLGVectorEnv throughput")
+    parser.add_argument('--envs', type=int, default=4096)
+    parser.add_argument('--steps', type=int, default=500)
+    args = parser.parse_args()
+    rate = steps_per_second(args.envs, args.steps)
+    print(f"SLGVectorEnv ({args.envs:,} games): {rate:,.0f} steps/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# SLG Strategy Game - Data-Driven Event Table
+
+import bisect
+import itertools
+import os
+
+# Game fields an event may change
+EVENT_FIELDS = ('gold', 'food', 'wood', 'stone', 'population')
+
+# Default events. Events are tried in order each day and at most one fires:
+# 'probability' is the chance of an event given that none before it fired.
+# Each effect adds a delta drawn uniformly from [min, max] to a field and
+# clamps the result at 'floor' when one is given.
+DEFAULT_EVENTS = [
+    {
+        'name': 'Bountiful Harvest',
+        'probability': 0.2,
+        'message': "A bountiful harvest provides extra food!",
+        'effects': [{'field': 'food', 'min': 10, 'max': 20}],
+    },
+    {
+        'name': 'Bandit Raid',
+        'probability': 0.15,
+        'message': "Bandits raided your treasury!",
+        'effects': [{'field': 'gold', 'min': -15, 'max': -5, 'floor': 0}],
+    },
+    {
+        'name': 'Trade Opportunity',
+        'probability': 0.1,
+        'message': "A merchant offers a good trade!",
+        'effects': [{'field': 'wood', 'min': 10, 'max': 10},
+                    {'field': 'gold', 'min': -5, 'max': -5}],
+    },
+    {
+        'name': 'Plague',
+        'probability': 0.1,
+        'message': "A plague strikes your population!",
+        'effects': [{'field': 'population', 'min': -3, 'max': -1, 'floor': 1}],
+    },
+]
+
+
+class Event:
+    """One compiled event: effects are (field, low, high, floor) tuples"""
+
+    __slots__ = ('index', 'name', 'message', 'chance', 'effects')
+
+    def __init__(self, index, name, message, chance, effects):
+        self.index = index
+        self.name = name
+        self.message = message
+        self.chance = chance
+        self.effects = effects
+
+    def __repr__(self):
+        return f"Event({self.name!r}, chance={self.chance:.4f})"
+
+
+class EventTable:
+    """Event definitions compiled for single-draw selection.
+
+    The sequential per-event probabilities are turned into the absolute
+    chance of each event firing, and those into cumulative thresholds, so
+    one uniform draw and a bisect pick the day's event.
+    """
+
+    def __init__(self, specs):
+        self.events = []
+        self.thresholds = []
+        remaining = 1.0
+        total = 0.0
+        for index, spec in enumerate(specs):
+            probability = float(spec['probability'])
+            if not 0.0 <= probability <= 1.0:
+                raise ValueError(f"Event {spec['name']!r} has probability {probability} outside [0, 1]")
+            effects = []
+            for effect in spec.get('effects', ()):
+                if effect['field'] not in EVENT_FIELDS:
+                    raise ValueError(f"Event {spec['name']!r} changes unknown field {effect['field']!r}")
+                if effect['min'] > effect['max']:
+                    raise ValueError(f"Event {spec['name']!r} has min > max for {effect['field']!r}")
+                effects.append((effect['field'], int(effect['min']), int(effect['max']), effect.get('floor')))
+            chance = remaining * probability
+            remaining -= chance
+            total += chance
+            self.events.append(Event(index, spec['name'], spec.get('message', ''), chance, tuple(effects)))
+            self.thresholds.append(total)
+        self.no_event_chance = remaining
+        self.by_name = {event.name: event for event in self.events}
+        self.outcomes = self._enumerate_outcomes()
+        self.mean_outcomes = self._enumerate_outcomes(mean=True)
+
+    @classmethod
+    def from_file(cls, path):
+        """Load event definitions from a .json or .toml file.
+
+        TOML files list events as an array of tables named 'events'.
+        """
+        if os.path.splitext(path)[1].lower() == '.toml':
+            import tomllib
+            with open(path, 'rb') as f:
+                return cls(tomllib.load(f)['events'])
+        import json
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def pick(self, draw):
+        """Event selected by a uniform draw in [0, 1), or None"""
+        index = bisect.bisect_right(self.thresholds, draw)
+        return self.events[index] if index < len(self.events) else None
+
+    def roll(self, rng):
+        """Pick the day's event with a single draw from rng"""
+        return self.pick(rng.random())
+
+    @staticmethod
+    def apply(event, target, rng):
+        """Apply an event's effects to a game (or anything with the same fields)"""
+        for field, low, high, floor in event.effects:
+            value = getattr(target, field) + (low if low == high else rng.randint(low, high))
+            if floor is not None and value < floor:
+                value = floor
+            setattr(target, field, value)
+
+    def _enumerate_outcomes(self, mean=False):
+        """Every outcome of one roll as (probability, effects), for exact engines.
+
+        effects lists (field index in EVENT_FIELDS, delta, floor) tuples;
+        the no-event outcome has no effects. With mean=True each event is a
+        single outcome with its mean deltas, rounded, for lookahead that
+        trades exactness for a much smaller branching factor.
+        """
+        outcomes = []
+        for event in self.events:
+            if mean:
+                ranges = [(round((low + high) / 2),) for _, low, high, _ in event.effects]
+            else:
+                ranges = [range(low, high + 1) for _, low, high, _ in event.effects]
+            combinations = list(itertools.product(*ranges))
+            for deltas in combinations:
+                effects = tuple((EVENT_FIELDS.index(field), delta, floor)
+                                for (field, _, _, floor), delta in zip(event.effects, deltas))
+                outcomes.append((event.chance / len(combinations), effects))
+        outcomes.append((self.no_event_chance, ()))
+        return outcomes
+
+    def max_gain(self, field):
+        """Largest increase of a field a single day's event can cause (0 if none raises it)"""
+        return max([high for event in self.events
+                    for effect_field, _, high, _ in event.effects
+                    if effect_field == field and high > 0], default=0)
+
+    def expected_delta(self, field):
+        """Mean daily change of a field from events, ignoring floors"""
+        return sum(event.chance * (low + high) / 2
+                   for event in self.events
+                   for effect_field, low, high, _ in event.effects
+                   if effect_field == field)
+
+
+# The table every engine uses unless given another one
+EVENT_TABLE = EventTable(DEFAULT_EVENTS)
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# SLG Strategy Game - Exact Outcome Distribution Engine
+
+import argparse
+import heapq
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+from slg_buildings import BUILDING_REGISTRY, RESOURCES
+from slg_core import SLGGame
+from slg_events import EVENT_FIELDS, EVENT_TABLE
+from slg_montecarlo import STRATEGIES, no_upgrades, round_robin
+from slg_sinks import NULL_SINK
+from slg_state import GameState, day_transitions
+
+
+# Most upgrades each strategy makes in a day. Strategies not listed may
+# spend without bound, so their states are never merged on resources.
+UPGRADES_PER_DAY = {no_upgrades: 0, round_robin: 1}
+
+
+# Longest game the CLI analyses by default; every strategy finishes it
+# within max_pruned in seconds, while a day more already fails for some
+SHORT_GAME = 6
+
+
+class ExactnessError(Exception):
+    """Raised when more probability was pruned than the caller tolerates"""
+
+
+class StrategyPolicy:
+    """Turns a Monte Carlo strategy into a state -> state upgrade policy.
+
+    The strategy is run on a scratch SLGGame restored to the state, so the
+    exact same strategy functions drive both sampling and exact analysis.
+    upgrades_per_day bounds the upgrades it makes in one day (None: no
+    bound), which is what lets the engine merge resource-rich states.
+    """
+
+    def __init__(self, strategy, upgrades_per_day=None):
+        self.strategy = strategy
+        self.upgrades_per_day = upgrades_per_day if upgrades_per_day is not None \
+            else UPGRADES_PER_DAY.get(strategy)
+        self.game = SLGGame(sink=NULL_SINK)
+
+    def __call__(self, state):
+        self.game.restore(state)
+        self.strategy(self.game)
+        return self.game.snapshot()
+
+
+def resource_caps(levels, days_left, upgrades_per_day, max_population, registry=BUILDING_REGISTRY,
+                  events=EVENT_TABLE):
+    """(gold, food, wood, stone) amounts above which a resource no longer changes the game.
+
+    A resource at or above its cap stays clear of every event floor and of
+    starvation for the next days_left days, even after losing the most
+    events and feeding can take and spending on the most upgrades the
+    policy can make. Above the cap, the rest of the game is the same for
+    any amount shifted by a constant, so only the excess needs tracking.
+    None when the policy's spending is unbounded.
+    """
+    if upgrades_per_day is None:
+        return None
+    caps = []
+    for resource in EVENT_FIELDS[:4]:
+        floor = loss = 0
+        for event in events.events:
+            for field, low, high, event_floor in event.effects:
+                if field == resource:
+                    loss = max(loss, -low)
+                    if event_floor is not None:
+                        floor = max(floor, event_floor - low)
+        if resource == 'food':
+            floor = max(floor, max_population)
+            loss += max_population
+        index = RESOURCES.index(resource)
+        spend = sum(max(building.upgrade_cost(level + upgrade)[index]
+                        for building, level in zip(registry.types, levels))
+                    for upgrade in range(upgrades_per_day * days_left))
+        caps.append(floor + max(days_left - 1, 0) * loss + spend)
+    return tuple(caps)
+
+
+def _spread(value, low, cap, resolution):
+    """(value, weight) pairs to spread a resource over, weighted to keep its mean.
+
+    Below low the value is kept, at or above cap it is clamped, and in
+    between it goes to the two nearest multiples of resolution above low.
+    """
+    if value < low:
+        return ((value, 1.0),)
+    if value >= cap:
+        return ((cap, 1.0),)
+    below = value - (value - low) % resolution
+    if below == value:
+        return ((value, 1.0),)
+    above = min(below + resolution, cap)
+    share = (value - below) / (above - below)
+    return ((below, 1.0 - share), (above, share))
+
+
+class ExactResult:
+    """Exact outcome distribution of a policy, up to the pruned mass"""
+
+    def __init__(self):
+        self.win_probability = 0.0
+        self.expected_score = 0.0
+        self.score_second_moment = 0.0
+        self.death_days = Counter()
+        self.pruned_probability = 0.0
+        self.peak_states = 0
+        self.states_per_day = []
+        self.peak_memory = None
+        self.elapsed = 0.0
+
+    @property
+    def win_probability_bounds(self):
+        """Exact interval for the win probability given the pruned mass"""
+        return self.win_probability, self.win_probability + self.pruned_probability
+
+    @property
+    def score_variance(self):
+        return self.score_second_moment - self.expected_score ** 2
+
+    def __repr__(self):
+        return (f"ExactResult(win_probability={self.win_probability:.6f}, "
+                f"expected_score={self.expected_score:.2f}, peak_states={self.peak_states}, "
+                f"pruned_probability={self.pruned_probability:.2e})")
+
+
+def exact_distribution(policy, epsilon=1e-12, max_states=None, track_memory=False, victory_day=30,
+                       max_pruned=1e-6, resolution=1):
+    """Propagate the exact state distribution of a game day by day.
+
+    policy maps a GameState to the GameState after that day's upgrades.
+    Every live state shares the same day, so the distribution is keyed on
+    plain (gold, food, wood, stone, population, levels, production)
+    tuples, with each resource clamped at its resource_caps() value.
+    States that only differ above the caps are merged exactly: each key
+    carries its probability and the probability-weighted first and second
+    moments of the total excess above the caps, which is all the score
+    needs.
+
+    With resolution > 1, gold, wood and stone that are safe for the
+    coming day (at least their cap with one day left) are also spread
+    over the two nearest multiples of resolution above that threshold,
+    with weights that keep their mean; the difference from the true amount
+    joins the excess, so scores still add up exactly. Results are then
+    approximate only where the spread moves a later floor or upgrade by a
+    day. Food is never spread, since starvation and growth turn its
+    spread into a biased population.
+
+    States whose probability falls below epsilon are dropped, and if
+    max_states is given only that many of the most likely states are
+    kept; both apply to merged states. As soon as the dropped mass exceeds
+    max_pruned, ExactnessError is raised rather than returning a result
+    that no longer means much.
+
+    This is not a replacement for slg_montecarlo. Food and population
+    are kept exactly, and their joint distribution still grows several
+    fold a day, so only short games finish (about SHORT_GAME days within
+    the default tolerance). The full 30-day game is out of reach; sample
+    it with slg_montecarlo instead.
+    """
+    result = ExactResult()
+    if track_memory:
+        tracemalloc.start()
+    try:
+        _propagate(policy, result, epsilon, max_states, victory_day, max_pruned, resolution)
+    finally:
+        if track_memory:
+            result.peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return result
+
+
+def _propagate(policy, result, epsilon, max_states, victory_day, max_pruned, resolution):
+    start = time.perf_counter()
+
+    initial = SLGGame(sink=NULL_SINK).snapshot()
+    day = initial.day
+    max_population = initial.max_population
+    upgrades_per_day = getattr(policy, 'upgrades_per_day', None)
+    caps = {}
+    thresholds = {}
+    distribution = {(initial.gold, initial.food, initial.wood, initial.stone, initial.population,
+                     initial.levels, initial.production): (1.0, 0.0, 0.0)}
+
+    while distribution:
+        result.states_per_day.append(len(distribution))
+        result.peak_states = max(result.peak_states, len(distribution))
+        day += 1
+        following = {}
+        for (gold, food, wood, stone, population, levels, production), (probability, excess, excess_square) \
+                in distribution.items():
+            state = GameState(day - 1, gold, food, wood, stone, population, max_population,
+                              False, levels, production)
+            if upgrades_per_day != 0:
+                state = policy(state)
+            levels, production = state.levels, state.production
+            if levels not in caps:
+                caps[levels] = resource_caps(levels, victory_day - day, upgrades_per_day, max_population)
+                thresholds[levels] = resource_caps(levels, 1, upgrades_per_day, max_population)
+            limits = caps[levels]
+            if limits is not None:
+                gold_cap, food_cap, wood_cap, stone_cap = limits
+                # Below these a resource is kept exactly
+                gold_low, _, wood_low, stone_low = thresholds[levels]
+            for chance, gold, food, wood, stone, population in day_transitions(
+                    state.gold, state.food, state.wood, state.stone, state.population,
+                    max_population, production):
+                mass = probability * chance
+                first, second = excess * chance, excess_square * chance
+                if population <= 0 or day >= victory_day:
+                    # score = (total + excess) * population
+                    total = gold + food + wood + stone
+                    result.expected_score += population * (mass * total + first)
+                    result.score_second_moment += population * population * (
+                        mass * total * total + 2 * total * first + second)
+                    if population > 0:
+                        result.win_probability += mass
+                    else:
+                        result.death_days[day] += mass
+                    continue
+                if limits is None:
+                    spread = ((gold, food, wood, stone, 1.0),)
+                elif resolution == 1:
+                    spread = ((min(gold, gold_cap), min(food, food_cap), min(wood, wood_cap),
+                               min(stone, stone_cap), 1.0),)
+                else:
+                    spread = [(g, f, w, s, gold_weight * food_weight * wood_weight * stone_weight)
+                              for g, gold_weight in _spread(gold, gold_low, gold_cap, resolution)
+                              for f, food_weight in ((min(food, food_cap), 1.0),)
+                              for w, wood_weight in _spread(wood, wood_low, wood_cap, resolution)
+                              for s, stone_weight in _spread(stone, stone_low, stone_cap, resolution)]
+                total = gold + food + wood + stone
+                for gold, food, wood, stone, weight in spread:
+                    part, part_first, part_second = mass * weight, first * weight, second * weight
+                    shift = total - gold - food - wood - stone
+                    if shift:
+                        part_second += 2 * shift * part_first + shift * shift * part
+                        part_first += shift * part
+                    key = (gold, food, wood, stone, population, levels, production)
+                    merged = following.get(key)
+                    if merged is None:
+                        following[key] = (part, part_first, part_second)
+                    else:
+                        following[key] = (merged[0] + part, merged[1] + part_first, merged[2] + part_second)
+        # Prune merged states, so branches that add up past epsilon are kept
+        unlikely = [key for key, entry in following.items() if entry[0] < epsilon]
+        for key in unlikely:
+            result.pruned_probability += following.pop(key)[0]
+        if max_states is not None and len(following) > max_states:
+            kept = heapq.nlargest(max_states, following.items(), key=lambda item: item[1][0])
+            result.pruned_probability += (sum(entry[0] for entry in following.values()) -
+                                          sum(entry[0] for _, entry in kept))
+            following = dict(kept)
+        if result.pruned_probability > max_pruned:
+            raise ExactnessError(f"Pruned probability {result.pruned_probability:.2e} exceeds {max_pruned:.0e} "
+                                 f"by day {day} of {victory_day} with {len(following):,} states")
+        distribution = following
+    result.elapsed = time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exact win probability and expected score of an SLG strategy "
+                                                 "over a short game (use slg_montecarlo for full games)")
+    parser.add_argument('strategies', nargs='*', default=sorted(STRATEGIES), help="strategies to analyse")
+    parser.add_argument('--epsilon', type=float, default=1e-9, help="drop states less likely than this")
+    parser.add_argument('--max-states', type=int, default=None, help="keep at most this many states per day")
+    parser.add_argument('--max-pruned', type=float, default=1e-6,
+                        help="fail once more probability than this has been dropped")
+    parser.add_argument('--resolution', type=int, default=1, help="bin safe gold, wood and stone this coarsely")
+    parser.add_argument('--victory-day', type=int, default=SHORT_GAME,
+                        help="analyse games this long; longer games quickly exceed --max-pruned")
+    parser.add_argument('--memory', action='store_true', help="trace peak memory (slower)")
+    args = parser.parse_args()
+
+    failed = False
+    for name in args.strategies:
+        try:
+            result = exact_distribution(StrategyPolicy(STRATEGIES[name]), args.epsilon, args.max_states,
+                                        args.memory, args.victory_day, args.max_pruned, args.resolution)
+        except ExactnessError as e:
+            print(f"\n=== {name} ===\nNot exact: {e}; try a shorter --victory-day or a larger --max-pruned",
+                  file=sys.stderr)
+            failed = True
+            continue
+        print(f"\n=== {name} ===")
+        low, high = result.win_probability_bounds
+        print(f"Win probability: {low:.6f} .. {high:.6f}")
+        print(f"Expected score: {result.expected_score:.2f} (variance {result.score_variance:.1f})")
+        print(f"Pruned probability: {result.pruned_probability:.2e}")
+        print(f"Peak states: {result.peak_states:,}")
+        if result.peak_memory is not None:
+            print(f"Peak memory: {result.peak_memory / 2 ** 20:.1f} MiB")
+        print(f"Time: {result.elapsed:.2f}s")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
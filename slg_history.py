@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# SLG Strategy Game - Columnar Per-Day History
+
+import argparse
+import csv
+from array import array
+
+# Per-day fields recorded for every game, before one level column per building
+STATE_FIELDS = ('day', 'gold', 'food', 'wood', 'stone', 'population', 'max_population')
+
+
+class MinMaxPyramid:
+    """A growing integer column plus the min and max of every aligned power-of-two block.
+
+    Appending is amortized O(1) and the pyramid adds at most one extra
+    value per stored value, so envelope() can summarize any number of days
+    in O(buckets) work.
+    """
+
+    __slots__ = ('values', 'mins', 'maxs')
+
+    def __init__(self, typecode='q'):
+        self.values = array(typecode)
+        # mins[k - 1] and maxs[k - 1] hold the blocks of 2 ** k values
+        self.mins = []
+        self.maxs = []
+
+    def __len__(self):
+        return len(self.values)
+
+    def append(self, value):
+        values = self.values
+        values.append(value)
+        n = len(values)
+        k = 1
+        while n % (1 << k) == 0:
+            # The block of 2 ** k values ending here is complete
+            if k == 1:
+                low, high = min(values[-2], values[-1]), max(values[-2], values[-1])
+            else:
+                below_min, below_max = self.mins[k - 2], self.maxs[k - 2]
+                low = min(below_min[-2], below_min[-1])
+                high = max(below_max[-2], below_max[-1])
+            if len(self.mins) < k:
+                self.mins.append(array(values.typecode))
+                self.maxs.append(array(values.typecode))
+            self.mins[k - 1].append(low)
+            self.maxs[k - 1].append(high)
+            k += 1
+
+    def _block(self, k, index):
+        if k == 0:
+            value = self.values[index]
+            return value, value
+        return self.mins[k - 1][index], self.maxs[k - 1][index]
+
+    def envelope(self, buckets):
+        """At most buckets + 1 (first index, min, max) tuples covering every value in order"""
+        n = len(self.values)
+        if n == 0:
+            return []
+        k = 0
+        while (n >> k) > buckets:
+            k += 1
+        envelope = [(index << k, *self._block(k, index)) for index in range(n >> k)]
+
+        # The partial block at the end splits into at most one block per lower level
+        start = tail_start = (n >> k) << k
+        low = high = None
+        for level in range(k - 1, -1, -1):
+            if n - start >= 1 << level:
+                block_low, block_high = self._block(level, start >> level)
+                low = block_low if low is None else min(low, block_low)
+                high = block_high if high is None else max(high, block_high)
+                start += 1 << level
+        if low is not None:
+            envelope.append((tail_start, low, high))
+        return envelope
+
+
+class HistoryRecorder:
+    """Records a game's state once per day into typed columns.
+
+    attach() records the starting state and wraps the game's next_day, so
+    every day played (including skipped days) adds one row: the fields in
+    STATE_FIELDS and one '<building>_level' column per building type.
+    """
+
+    def __init__(self):
+        self.fields = ()
+        self.columns = {}
+        self._buildings = ()
+
+    def attach(self, game):
+        """Start recording a game; returns the game"""
+        self._buildings = tuple((building.name, game.buildings[building.name])
+                                for building in game.registry.types)
+        self.fields = STATE_FIELDS + tuple(f"{name}_level" for name, _ in self._buildings)
+        self.columns = {field: MinMaxPyramid() for field in self.fields}
+        self.record(game)
+
+        next_day = game.next_day
+
+        def recorded_next_day():
+            next_day()
+            self.record(game)
+        game.next_day = recorded_next_day
+        return game
+
+    def record(self, game):
+        """Append the game's current state as one row"""
+        columns = self.columns
+        for field in STATE_FIELDS:
+            columns[field].append(getattr(game, field))
+        for name, info in self._buildings:
+            columns[f"{name}_level"].append(info['level'])
+
+    def __len__(self):
+        return len(self.columns['day']) if self.columns else 0
+
+    def column(self, field):
+        """The raw typed array of one field"""
+        return self.columns[field].values
+
+    def envelope(self, field, buckets):
+        """Min/max downsampling of a field to about buckets points, see MinMaxPyramid"""
+        return self.columns[field].envelope(buckets)
+
+    def to_csv(self, path):
+        """Write every row to a CSV file with a header line"""
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(self.fields)
+            writer.writerows(zip(*(self.column(field) for field in self.fields)))
+
+    def to_npz(self, path):
+        """Write every column as an int64 array to a compressed .npz file"""
+        import numpy as np
+        np.savez_compressed(path, **{field: np.frombuffer(self.column(field), dtype=np.int64)
+                                     for field in self.fields})
+
+
+def main():
+    from slg_core import SLGGame
+    from slg_montecarlo import STRATEGIES
+    from slg_sinks import NULL_SINK
+
+    parser = argparse.ArgumentParser(description="Record the per-day history of a seeded game")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--strategy', default='round_robin', choices=sorted(STRATEGIES))
+    parser.add_argument('--csv', default=None, help="write the history here as CSV")
+    parser.add_argument('--npz', default=None, help="write the history here as NPZ")
+    args = parser.parse_args()
+
+    history = HistoryRecorder()
+    game = history.attach(SLGGame(args.seed, sink=NULL_SINK))
+    play = STRATEGIES[args.strategy]
+    while not game.game_over:
+        play(game)
+        game.next_day()
+
+    if args.csv:
+        history.to_csv(args.csv)
+    if args.npz:
+        history.to_npz(args.npz)
+    print(f"Recorded {len(history)} days of {len(history.fields)} fields")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+# SLG Strategy Game - Shared File Helpers
+
+import os
+import tempfile
+
+
+def write_atomic(path, data, fsync=False):
+    """Replace path with data (str or bytes) so readers see the old file or the new one, never half.
+
+    The data goes to a temporary file in the same directory, which is then
+    renamed over path; with fsync=True it is flushed to disk first.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        if isinstance(data, str):
+            f = os.fdopen(fd, 'w', encoding='utf-8')
+        else:
+            f = os.fdopen(fd, 'wb')
+        with f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.unlink(temporary)
+        raise
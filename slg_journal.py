@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# SLG Strategy Game - Command Journal and Binary Snapshots
+
+import argparse
+import glob
+import os
+import random
+import struct
+import tempfile
+import threading
+import time
+
+from slg_buildings import BUILDING_REGISTRY
+from slg_core import SLGGame
+from slg_io import write_atomic
+from slg_sinks import NULL_SINK, TextSink
+from slg_state import GameState
+
+# Journal record: opcode, argument, number of RNG draws, then one float64
+# per draw. The argument is the building's index in the game's registry,
+# or the number of days for SKIP_DAYS.
+RECORD_HEADER = struct.Struct('<BII')
+DRAW = struct.Struct('<d')
+NEXT_DAY, UPGRADE, BUILD, SKIP_DAYS, SKIP_UNTIL_UPGRADE = range(5)
+
+# Snapshot: magic, command count, packed GameState size, building names
+# size, then the building names (comma separated), the packed GameState
+# and the Mersenne Twister state. The names pin down what the building
+# indices in the journal and the state record refer to.
+SNAPSHOT_MAGIC = b'SLG3'
+SNAPSHOT_HEADER = struct.Struct('<4sQII')
+RNG_STATE = struct.Struct('<B625Id')
+
+
+class JournalError(Exception):
+    """Raised when a journal cannot be replayed consistently"""
+
+
+class _RecordingRandom:
+    """Wraps a random.Random and remembers every value it hands out"""
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.draws = []
+
+    def random(self):
+        value = self.rng.random()
+        self.draws.append(value)
+        return value
+
+    def randint(self, low, high):
+        value = self.rng.randint(low, high)
+        self.draws.append(value)
+        return value
+
+
+class _CheckedRandom:
+    """Draws from the real RNG during replay and checks them against the journal"""
+
+    def __init__(self, rng, draws):
+        self.rng = rng
+        self.draws = iter(draws)
+
+    def _check(self, value):
+        if next(self.draws, None) != value:
+            raise JournalError("RNG draws differ from the journal")
+        return value
+
+    def random(self):
+        return self._check(self.rng.random())
+
+    def randint(self, low, high):
+        return self._check(self.rng.randint(low, high))
+
+
+def pack_rng(rng):
+    version, internal, gauss_next = rng.getstate()
+    has_gauss = gauss_next is not None
+    return RNG_STATE.pack(has_gauss, *internal, gauss_next if has_gauss else 0.0)
+
+
+def unpack_rng(data):
+    fields = RNG_STATE.unpack(data)
+    rng = random.Random()
+    rng.setstate((3, tuple(fields[1:626]), fields[626] if fields[0] else None))
+    return rng
+
+
+class JournaledGame:
+    """An SLGGame whose applied commands are journaled to a directory.
+
+    Every command that changes the game (a successful upgrade or build,
+    next_day and the skips) appends one small record, including the RNG
+    draws it consumed. Every snapshot_every commands a
+    binary snapshot of the game state and RNG is written and a new journal
+    segment started; older segments and snapshots are then deleted by a
+    background compaction thread. Recovery loads the latest snapshot and
+    replays at most snapshot_every records, however long the game has run.
+    A directory can only be recovered with the building registry it was
+    written with.
+    """
+
+    def __init__(self, directory, seed=None, snapshot_every=1000, fsync=False, background=True,
+                 sink=None, registry=BUILDING_REGISTRY):
+        self.directory = directory
+        self.registry = registry
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self.background = background
+        self.commands = 0
+        self._segment = None
+        self._compactor = None
+        os.makedirs(directory, exist_ok=True)
+
+        if self._snapshots():
+            self.game = self._recover(sink)
+        else:
+            self.game = SLGGame(seed, sink=sink, registry=registry)
+            self.snapshot()
+        self._recorder = _RecordingRandom(self.game.rng)
+
+    def upgrade_building(self, building_name):
+        """Upgrade a building and journal it if it happened"""
+        upgraded = self.game.upgrade_building(building_name)
+        if upgraded:
+            self._append(UPGRADE, self.registry.names.index(building_name), ())
+        return upgraded
+
+    def build_building(self, building_name):
+        """Build a building and journal it if it happened"""
+        built = self.game.build_building(building_name)
+        if built:
+            self._append(BUILD, self.registry.names.index(building_name), ())
+        return built
+
+    def next_day(self):
+        """Advance the game a day and journal the draws it consumed"""
+        self._advance(NEXT_DAY, 0, self.game.next_day)
+
+    def skip_days(self, days):
+        """Skip days and journal the draws they consumed; returns the days played"""
+        return self._advance(SKIP_DAYS, days, self.game.skip_days, days)
+
+    def skip_until_upgrade(self, building_name):
+        """Skip until an upgrade is affordable and journal the draws; returns the days played"""
+        building = self.registry.by_name.get(building_name)
+        index = building.index if building is not None else 0
+        return self._advance(SKIP_UNTIL_UPGRADE, index, self.game.skip_until_upgrade, building_name)
+
+    def _advance(self, opcode, argument, method, *args):
+        game = self.game
+        recorder = self._recorder
+        recorder.draws.clear()
+        day = game.day
+        game.rng = recorder
+        try:
+            played = method(*args)
+        finally:
+            game.rng = recorder.rng
+        if opcode == NEXT_DAY or game.day != day:
+            self._append(opcode, argument, recorder.draws)
+        return played
+
+    def _append(self, opcode, argument, draws):
+        record = RECORD_HEADER.pack(opcode, argument, len(draws)) + b''.join(DRAW.pack(draw) for draw in draws)
+        self._segment.write(record)
+        self._segment.flush()
+        if self.fsync:
+            os.fsync(self._segment.fileno())
+        self.commands += 1
+        if self.commands % self.snapshot_every == 0:
+            self.snapshot()
+
+    def snapshot(self):
+        """Write a snapshot and start a new journal segment"""
+        state = self.game.snapshot().pack()
+        names = ','.join(self.registry.names).encode()
+        data = (SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, self.commands, len(state), len(names)) +
+                names + state + pack_rng(self.game.rng))
+        write_atomic(self._path('snapshot', self.commands), data, self.fsync)
+
+        if self._segment is not None:
+            self._segment.close()
+        self._segment = open(self._path('journal', self.commands), 'ab')
+
+        if self.background:
+            if self._compactor is not None:
+                self._compactor.join()
+            self._compactor = threading.Thread(target=self.compact, args=(self.commands,), daemon=True)
+            self._compactor.start()
+        else:
+            self.compact(self.commands)
+
+    def compact(self, keep_from):
+        """Delete snapshots and journal segments older than command keep_from"""
+        for kind in ('snapshot', 'journal'):
+            for position, path in self._files(kind):
+                if position < keep_from:
+                    os.remove(path)
+
+    def close(self):
+        if self._compactor is not None:
+            self._compactor.join()
+        self._segment.close()
+
+    def _path(self, kind, position):
+        extension = 'bin' if kind == 'snapshot' else 'log'
+        return os.path.join(self.directory, f"{kind}-{position:012d}.{extension}")
+
+    def _files(self, kind):
+        files = []
+        for path in glob.glob(os.path.join(self.directory, f"{kind}-*")):
+            name = os.path.basename(path)
+            files.append((int(name[len(kind) + 1:].split('.')[0]), path))
+        return sorted(files)
+
+    def _snapshots(self):
+        return self._files('snapshot')
+
+    def _recover(self, sink):
+        """Load the latest snapshot and replay the journal tail after it"""
+        position, path = self._snapshots()[-1]
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, commands, state_size, names_size = SNAPSHOT_HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC or commands != position:
+            raise JournalError(f"Corrupt snapshot {path}")
+        offset = SNAPSHOT_HEADER.size
+        names = tuple(data[offset:offset + names_size].decode().split(','))
+        if names != self.registry.names:
+            raise JournalError(f"Snapshot {path} was written for buildings {', '.join(names)}, "
+                               f"not {', '.join(self.registry.names)}")
+        offset += names_size
+        state = GameState.unpack(data[offset:offset + state_size])
+        game = SLGGame(rng=unpack_rng(data[offset + state_size:]), sink=NULL_SINK, registry=self.registry)
+        game.restore(state)
+        self.commands = commands
+
+        segment_path = self._path('journal', position)
+        valid_length = 0
+        if os.path.exists(segment_path):
+            with open(segment_path, 'rb') as f:
+                journal = f.read()
+            valid_length = self._replay(game, journal)
+            if valid_length < len(journal):
+                # Drop a record torn by a crash mid-write
+                with open(segment_path, 'r+b') as f:
+                    f.truncate(valid_length)
+        self._segment = open(segment_path, 'ab')
+        game.set_sink(sink if sink is not None else TextSink())
+        return game
+
+    def _replay(self, game, journal):
+        names = self.registry.names
+        offset = 0
+        while offset + RECORD_HEADER.size <= len(journal):
+            opcode, argument, count = RECORD_HEADER.unpack_from(journal, offset)
+            end = offset + RECORD_HEADER.size + count * DRAW.size
+            if end > len(journal):
+                break
+            draws = [DRAW.unpack_from(journal, offset + RECORD_HEADER.size + i * DRAW.size)[0]
+                     for i in range(count)]
+            if opcode == UPGRADE:
+                if not game.upgrade_building(names[argument]):
+                    raise JournalError(f"Journaled upgrade of {names[argument]} failed on replay")
+            elif opcode == BUILD:
+                if not game.build_building(names[argument]):
+                    raise JournalError(f"Journaled build of {names[argument]} failed on replay")
+            else:
+                rng = game.rng
+                checked = game.rng = _CheckedRandom(rng, draws)
+                try:
+                    if opcode == NEXT_DAY:
+                        game.next_day()
+                    elif opcode == SKIP_DAYS:
+                        game.skip_days(argument)
+                    elif opcode == SKIP_UNTIL_UPGRADE:
+                        game.skip_until_upgrade(names[argument])
+                    else:
+                        raise JournalError(f"Unknown journal opcode {opcode}")
+                finally:
+                    game.rng = rng
+                if next(checked.draws, None) is not None:
+                    raise JournalError("Replay drew fewer RNG values than the journal holds")
+            self.commands += 1
+            offset = end
+        return offset
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure journal write cost and recovery time")
+    parser.add_argument('--commands', type=int, default=100000)
+    parser.add_argument('--snapshot-every', type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        journaled = JournaledGame(directory, seed=1, snapshot_every=args.snapshot_every, sink=NULL_SINK)
+        start = time.perf_counter()
+        # next_day keeps working past day 30, so the journal can grow without limit
+        for _ in range(args.commands):
+            journaled.next_day()
+        write_time = time.perf_counter() - start
+        journaled.close()
+
+        start = time.perf_counter()
+        recovered = JournaledGame(directory, snapshot_every=args.snapshot_every)
+        recover_time = time.perf_counter() - start
+        recovered.close()
+        files = os.listdir(directory)
+
+    print(f"Journaled {args.commands:,} commands: {write_time / args.commands * 1e6:.1f} µs/command")
+    print(f"Recovered {recovered.commands:,} commands in {recover_time * 1000:.1f} ms ({len(files)} files on disk)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# SLG Strategy Game - Loopback Load Generator for slg_server
+
+import argparse
+import asyncio
+import resource
+import time
+
+from slg_server import PROMPT, SLGServer
+
+PROMPT_LINE = f"{PROMPT}\n".encode()
+
+# Commands that never end the game, so a client can repeat them forever
+COMMAND_CYCLE = ['status', 'upgrade farm', 'upgrade mine', 'help']
+
+# Descriptors beyond the sockets: stdio, the listener, the event loop's own
+SPARE_DESCRIPTORS = 64
+
+
+def descriptors_needed(sessions, in_process):
+    """Open files a run holds at once; an in-process server holds the other end of each socket"""
+    return sessions * (2 if in_process else 1) + SPARE_DESCRIPTORS
+
+
+def raise_open_file_limit(needed):
+    """Raise the soft RLIMIT_NOFILE towards the hard limit if needed; returns the soft limit"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != resource.RLIM_INFINITY and soft < needed:
+        target = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+            soft = target
+        except (ValueError, OSError):
+            pass
+    return soft
+
+
+async def read_responses(reader, count):
+    """Read until count prompt lines have arrived"""
+    seen = 0
+    while seen < count:
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError("server closed the connection")
+        if line == PROMPT_LINE:
+            seen += 1
+
+
+async def open_session(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    await read_responses(reader, 1)  # welcome help text
+    return reader, writer
+
+
+async def active_client(host, port, commands, window):
+    """Send commands in pipelined windows and wait for every response"""
+    reader, writer = await open_session(host, port)
+    sent = 0
+    while sent < commands:
+        batch = min(window, commands - sent)
+        lines = (COMMAND_CYCLE[(sent + i) % len(COMMAND_CYCLE)] for i in range(batch))
+        writer.write("".join(f"{line}\n" for line in lines).encode())
+        await read_responses(reader, batch)
+        sent += batch
+    writer.close()
+
+
+async def open_idle_sessions(host, port, count):
+    """Open sessions that just sit there, like players who walked away"""
+    return [await open_session(host, port) for _ in range(count)]
+
+
+async def run_active_sessions(host, port, clients, commands, window):
+    """Drive clients concurrently and return the command throughput"""
+    start = time.perf_counter()
+    await asyncio.gather(*(active_client(host, port, commands, window) for _ in range(clients)))
+    return clients * commands / (time.perf_counter() - start)
+
+
+async def main_async(args):
+    server = None
+    host, port = args.host, args.port
+    if port is None:
+        server = await SLGServer(host, 0).start()
+        port = server.port
+
+    idle = await open_idle_sessions(host, port, args.idle)
+    print(f"Idle sessions held: {args.idle:,}")
+    if server is not None:
+        memory = server.memory_bytes
+        print(f"Game memory: {memory / 2 ** 20:.1f} MiB "
+              f"({memory // max(1, len(server.sessions)):,} bytes per session)")
+
+    throughput = await run_active_sessions(host, port, args.active, args.commands, args.window)
+    print(f"Command throughput: {throughput:,.0f} commands/s "
+          f"({args.active} clients x {args.commands:,} commands, window {args.window})")
+
+    for _, writer in idle:
+        writer.close()
+    if server is not None:
+        await server.close()
+    print(f"Peak RSS of this process: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Loopback load test for slg_server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=None, help="server port (default: start one in-process)")
+    parser.add_argument('--idle', type=int, default=10000, help="idle sessions to hold open")
+    parser.add_argument('--active', type=int, default=50, help="clients sending commands")
+    parser.add_argument('--commands', type=int, default=2000, help="commands per active client")
+    parser.add_argument('--window', type=int, default=64, help="pipelined commands per write")
+    args = parser.parse_args()
+    needed = descriptors_needed(args.idle + args.active, args.port is None)
+    limit = raise_open_file_limit(needed)
+    if limit != resource.RLIM_INFINITY and limit < needed:
+        raise SystemExit(f"❌ {args.idle:,} idle + {args.active} active sessions need about {needed:,} open files, "
+                         f"but the limit is {limit:,}. Raise it (ulimit -n) or lower --idle.")
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
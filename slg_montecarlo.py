@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# SLG Strategy Game - Monte Carlo Strategy Evaluator
+
+import argparse
+import time
+from collections import Counter
+
+from slg_core import SLGGame, stream_seed
+from slg_sinks import NULL_SINK
+
+
+# Upgrade strategies. A strategy is called once per day, before next_day,
+# and may call game.upgrade_building as often as it likes. Strategies must
+# be module-level functions so they can be sent to worker processes.
+
+def no_upgrades(game):
+    """Never upgrade anything"""
+
+
+def farm_first(game):
+    """Put every spare resource into the farm"""
+    while game.upgrade_building('farm'):
+        pass
+
+
+def round_robin(game):
+    """Upgrade buildings in turn, waiting until the next one is affordable"""
+    buildings = list(game.buildings)
+    upgrades = sum(info['level'] - 1 for info in game.buildings.values())
+    game.upgrade_building(buildings[upgrades % len(buildings)])
+
+
+STRATEGIES = {
+    'none': no_upgrades,
+    'farm_first': farm_first,
+    'round_robin': round_robin,
+}
+
+
+class StrategyStats:
+    """Mergeable aggregates over a set of finished games.
+
+    Only integer counters are kept so that merging is exact and the result
+    does not depend on how the seeds were split across workers.
+    """
+
+    def __init__(self):
+        self.games = 0
+        self.wins = 0
+        self.score_sum = 0
+        self.score_sq_sum = 0
+        self.death_days = Counter()
+
+    def add(self, game):
+        """Record one finished game"""
+        score = game.final_score()
+        self.games += 1
+        self.score_sum += score
+        self.score_sq_sum += score * score
+        if game.population > 0:
+            self.wins += 1
+        else:
+            self.death_days[game.day] += 1
+
+    def merge(self, other):
+        """Fold another StrategyStats into this one"""
+        self.games += other.games
+        self.wins += other.wins
+        self.score_sum += other.score_sum
+        self.score_sq_sum += other.score_sq_sum
+        self.death_days.update(other.death_days)
+        return self
+
+    def to_dict(self):
+        """The counters as a JSON-ready dict"""
+        return {'games': self.games, 'wins': self.wins, 'score_sum': self.score_sum,
+                'score_sq_sum': self.score_sq_sum,
+                'death_days': {str(day): count for day, count in self.death_days.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild StrategyStats from to_dict() output"""
+        stats = cls()
+        stats.games = data['games']
+        stats.wins = data['wins']
+        stats.score_sum = data['score_sum']
+        stats.score_sq_sum = data['score_sq_sum']
+        stats.death_days = Counter({int(day): count for day, count in data['death_days'].items()})
+        return stats
+
+    @property
+    def win_rate(self):
+        return self.wins / self.games if self.games else 0.0
+
+    @property
+    def mean_score(self):
+        return self.score_sum / self.games if self.games else 0.0
+
+    @property
+    def score_variance(self):
+        """Population variance of the final score"""
+        if not self.games:
+            return 0.0
+        return (self.score_sq_sum * self.games - self.score_sum ** 2) / self.games ** 2
+
+    def __eq__(self, other):
+        return (isinstance(other, StrategyStats) and
+                (self.games, self.wins, self.score_sum, self.score_sq_sum, self.death_days) ==
+                (other.games, other.wins, other.score_sum, other.score_sq_sum, other.death_days))
+
+    def __repr__(self):
+        return (f"StrategyStats(games={self.games}, win_rate={self.win_rate:.4f}, "
+                f"mean_score={self.mean_score:.1f}, score_variance={self.score_variance:.1f})")
+
+
+def play_game(strategy, index, run_seed=0):
+    """Play game number index of a run headlessly and return the finished game"""
+    game = SLGGame(stream_seed(run_seed, index), sink=NULL_SINK)
+    while not game.game_over:
+        strategy(game)
+        game.next_day()
+    return game
+
+
+def evaluate_shard(strategy, first_seed, last_seed, run_seed=0):
+    """Play games [first_seed, last_seed) of a run and aggregate the results"""
+    stats = StrategyStats()
+    for index in range(first_seed, last_seed):
+        stats.add(play_game(strategy, index, run_seed))
+    return stats
+
+
+def shard_seeds(first_seed, last_seed, shard_size):
+    """Split a seed range into contiguous shards"""
+    return [(start, min(start + shard_size, last_seed))
+            for start in range(first_seed, last_seed, shard_size)]
+
+
+def evaluate_strategy(strategy, first_seed, last_seed, workers=None, shard_size=1000, run_seed=0):
+    """Score a strategy over games [first_seed, last_seed) of a run.
+
+    Game i plays its own stream, stream_seed(run_seed, i), so the merged
+    StrategyStats are the same for any number of workers. workers=1 runs
+    in-process.
+    """
+    shards = shard_seeds(first_seed, last_seed, shard_size)
+    stats = StrategyStats()
+    if workers == 1:
+        for start, stop in shards:
+            stats.merge(evaluate_shard(strategy, start, stop, run_seed))
+        return stats
+
+    # Imported here so in-process runs and pool workers skip multiprocessing setup
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(evaluate_shard, strategy, start, stop, run_seed) for start, stop in shards]
+        for future in futures:
+            stats.merge(future.result())
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo evaluation of SLG upgrade strategies")
+    parser.add_argument('strategies', nargs='*', default=sorted(STRATEGIES), help="strategies to evaluate")
+    parser.add_argument('--games', type=int, default=10000, help="number of seeds per strategy")
+    parser.add_argument('--first-seed', type=int, default=0, help="index of the first game in the run")
+    parser.add_argument('--run-seed', type=int, default=0, help="seed every game's stream is derived from")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--shard-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    for name in args.strategies:
+        start = time.perf_counter()
+        stats = evaluate_strategy(STRATEGIES[name], args.first_seed, args.first_seed + args.games,
+                                  args.workers, args.shard_size, args.run_seed)
+        elapsed = time.perf_counter() - start
+        print(f"\n=== {name} ===")
+        print(f"Games: {stats.games} ({stats.games / elapsed:,.0f} games/s)")
+        print(f"Win rate: {stats.win_rate:.2%}")
+        print(f"Score: mean {stats.mean_score:.1f}, variance {stats.score_variance:.1f}")
+        if stats.death_days:
+            deaths = ", ".join(f"day {day}: {count}" for day, count in sorted(stats.death_days.items()))
+            print(f"Deaths: {deaths}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# SLG Strategy Game - Expectimax Planner
+
+import time
+from collections import OrderedDict
+
+from slg_core import SLGGame
+from slg_events import EVENT_TABLE
+from slg_montecarlo import StrategyStats
+from slg_sinks import NULL_SINK
+from slg_state import BUILDINGS, GROWTH_CHANCE, VICTORY_DAY, final_score, next_day_outcomes, upgrade_state
+
+NEXT_DAY = 'next'
+ACTIONS = BUILDINGS + (NEXT_DAY,)
+
+# Mean daily effect of random_event, used by the leaf heuristic
+EXPECTED_FOOD_DELTA = EVENT_TABLE.expected_delta('food')
+EXPECTED_OTHER_DELTA = sum(EVENT_TABLE.expected_delta(field) for field in ('gold', 'wood', 'stone'))
+EXPECTED_POPULATION_DELTA = EVENT_TABLE.expected_delta('population')
+
+# Most upgrades the search chains within one day before the next chance node
+MAX_CHAIN = 2
+
+
+class _OutOfTime(Exception):
+    """Raised inside the search when the time budget is spent"""
+
+
+class Planner:
+    """Picks the best action for a game state by expectimax search.
+
+    Chance nodes enumerate the next_day outcomes (population growth,
+    starvation and each event) with every event at its mean effect
+    (EventTable.mean_outcomes), which cuts the branching from 54 outcomes
+    to 10 so that a full day of search fits a 10 ms budget. Upgrades are
+    deterministic and do not
+    use up a day, so up to MAX_CHAIN can be chained before the next chance
+    node, in building order (upgrading A then B reaches the same state as B
+    then A). Search deepens one day at a time until the time budget runs
+    out, including the first day: an unfinished depth falls back to the
+    deeper of the last finished depth and the leaf heuristic. Values are
+    kept in a bounded LRU transposition table that persists across calls.
+    The game ends on victory_day; choose() takes another one per call,
+    and the planner as a strategy takes it from the game. max_depth, if
+    given, caps the days searched ahead.
+    """
+
+    def __init__(self, budget=0.01, table_size=200000, victory_day=VICTORY_DAY, max_depth=None):
+        self.budget = budget
+        self.table_size = table_size
+        self.victory_day = victory_day
+        self.max_depth = max_depth
+        self.table = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.last_depth = 0
+        self._deadline = float('inf')
+
+    def choose(self, state, victory_day=None):
+        """Best action for a GameState: a building name to upgrade, or 'next'"""
+        if victory_day is not None and victory_day != self.victory_day:
+            # Cached values assume the old game length
+            self.victory_day = victory_day
+            self.table.clear()
+        if state.game_over:
+            return NEXT_DAY
+        self.last_depth = 0
+        self._deadline = time.perf_counter() + self.budget
+        best_action = self._best_action(state, 0)
+        days_left = self.victory_day - state.day
+        if self.max_depth is not None:
+            days_left = min(days_left, self.max_depth)
+        for depth in range(1, days_left + 1):
+            try:
+                best_action = self._best_action(state, depth)
+            except _OutOfTime:
+                break
+            self.last_depth = depth
+            if time.perf_counter() >= self._deadline:
+                break
+        return best_action
+
+    def __call__(self, game):
+        """Strategy interface: upgrade as the planner advises, then return"""
+        while True:
+            action = self.choose(game.snapshot(), game.victory_day)
+            if action == NEXT_DAY or not game.upgrade_building(action):
+                return
+
+    def _best_action(self, state, depth):
+        """Best root action searching depth days ahead; depth 0 ranks actions by the leaf heuristic"""
+        next_day = self._expected_next_day(state, depth) if depth else self._estimate(state)
+        best_action, best_value = NEXT_DAY, next_day
+        for index, building in enumerate(BUILDINGS):
+            upgraded = upgrade_state(state, index)
+            if upgraded is not None:
+                value = self._value(upgraded, depth, index, 1)
+                if value > best_value:
+                    best_action, best_value = building, value
+        return best_action
+
+    def _value(self, state, depth, first=0, chain=0):
+        """Expected final score of a state with depth days left to search.
+
+        chain upgrades were already made today, the last of BUILDINGS[first].
+        """
+        if state.game_over:
+            return final_score(state)
+        if depth == 0:
+            return self._estimate(state)
+
+        key = (state, depth, first, chain)
+        table = self.table
+        if key in table:
+            self.hits += 1
+            table.move_to_end(key)
+            return table[key]
+        self.misses += 1
+        if time.perf_counter() >= self._deadline:
+            raise _OutOfTime
+
+        best = self._expected_next_day(state, depth)
+        if chain < MAX_CHAIN:
+            for index in range(first, len(BUILDINGS)):
+                upgraded = upgrade_state(state, index)
+                if upgraded is not None:
+                    best = max(best, self._value(upgraded, depth, index, chain + 1))
+
+        table[key] = best
+        if len(table) > self.table_size:
+            table.popitem(last=False)
+        return best
+
+    def _expected_next_day(self, state, depth):
+        outcomes = next_day_outcomes(state, self.victory_day, EVENT_TABLE.mean_outcomes)
+        return sum(probability * self._value(outcome, depth - 1) for outcome, probability in outcomes.items())
+
+    def _estimate(self, state):
+        """Leaf heuristic: final score of the expected-value trajectory with no more upgrades"""
+        food_production, wood_production, gold_production, stone_production = state.production
+        food = state.food
+        other = state.gold + state.wood + state.stone
+        population = state.population
+        for _ in range(self.victory_day - state.day):
+            food += food_production
+            other += wood_production + gold_production + stone_production
+            if food >= population:
+                food -= population
+                population = min(state.max_population, population + GROWTH_CHANCE)
+            else:
+                population -= population - food
+                food = 0
+            food += EXPECTED_FOOD_DELTA
+            other += EXPECTED_OTHER_DELTA
+            population = max(0.0, population + EXPECTED_POPULATION_DELTA)
+        return max(0, food + other) * population
+
+def main():
+    planner = Planner()
+    stats = StrategyStats()
+    start = time.perf_counter()
+    for seed in range(20):
+        game = SLGGame(seed, sink=NULL_SINK)
+        while not game.game_over:
+            planner(game)
+            game.next_day()
+        stats.add(game)
+    elapsed = time.perf_counter() - start
+    print(f"Planner ({planner.budget * 1000:.0f} ms/move): {stats}")
+    print(f"Transposition table: {len(planner.table)} entries, "
+          f"{planner.hits} hits / {planner.misses} misses, {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# SLG Strategy Game - Per-Phase Profiling Hooks and Counters
+
+import argparse
+import threading
+import time
+from collections import Counter
+
+from slg_core import SLGGame
+from slg_io import write_atomic
+from slg_sinks import NULL_SINK
+
+# The phases SLGGame.next_day runs, in order
+PHASES = ('collect_resources', 'consume_resources', 'random_event', 'check_game_over')
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class PhaseProfiler:
+    """Opt-in timers and counters for the phases of next_day.
+
+    attach() wraps the phase methods of one game instance, so games that
+    were never attached run the plain methods and pay nothing. One
+    profiler can be attached to any number of games and aggregates them
+    all: time and calls per phase, event firings by name, starvation
+    deaths and upgrades attempted versus succeeded.
+    """
+
+    def __init__(self):
+        self.nanoseconds = dict.fromkeys(PHASES, 0)
+        self.calls = dict.fromkeys(PHASES, 0)
+        self.events = Counter()
+        self.starvation_deaths = 0
+        self.upgrades_attempted = 0
+        self.upgrades_succeeded = 0
+        self._dumper = None
+        self._stop = None
+
+    def _timed(self, phase, method):
+        perf = time.perf_counter_ns
+        nanoseconds = self.nanoseconds
+        calls = self.calls
+
+        def timed():
+            start = perf()
+            result = method()
+            nanoseconds[phase] += perf() - start
+            calls[phase] += 1
+            return result
+        return timed
+
+    def attach(self, game):
+        """Instrument a game; returns the game"""
+        game.collect_resources = self._timed('collect_resources', game.collect_resources)
+        game.check_game_over = self._timed('check_game_over', game.check_game_over)
+
+        consume = self._timed('consume_resources', game.consume_resources)
+
+        def consume_resources():
+            population = game.population
+            consume()
+            if game.population < population:
+                self.starvation_deaths += population - game.population
+        game.consume_resources = consume_resources
+
+        roll = self._timed('random_event', game.random_event)
+        events = self.events
+
+        def random_event():
+            event = roll()
+            if event is not None:
+                events[event.name] += 1
+            return event
+        game.random_event = random_event
+
+        upgrade = game.upgrade_building
+
+        def upgrade_building(building_name):
+            self.upgrades_attempted += 1
+            upgraded = upgrade(building_name)
+            if upgraded:
+                self.upgrades_succeeded += 1
+            return upgraded
+        game.upgrade_building = upgrade_building
+        return game
+
+    @staticmethod
+    def detach(game):
+        """Remove the instrumentation from a game"""
+        for name in PHASES + ('upgrade_building',):
+            game.__dict__.pop(name, None)
+
+    def snapshot(self):
+        """Current timers and counters as a plain dict"""
+        return {
+            'days': self.calls['check_game_over'],
+            'phases': {phase: {'calls': self.calls[phase], 'seconds': self.nanoseconds[phase] / 1e9}
+                       for phase in PHASES},
+            'events': dict(self.events),
+            'starvation_deaths': self.starvation_deaths,
+            'upgrades_attempted': self.upgrades_attempted,
+            'upgrades_succeeded': self.upgrades_succeeded,
+        }
+
+    def prometheus(self, prefix='slg'):
+        """Current timers and counters in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = [f"# HELP {prefix}_phase_seconds_total Time spent in each next_day phase",
+                 f"# TYPE {prefix}_phase_seconds_total counter"]
+        lines += [f'{prefix}_phase_seconds_total{{phase="{phase}"}} {stats["seconds"]:.9f}'
+                  for phase, stats in snapshot['phases'].items()]
+        lines += [f"# HELP {prefix}_phase_calls_total Calls of each next_day phase",
+                  f"# TYPE {prefix}_phase_calls_total counter"]
+        lines += [f'{prefix}_phase_calls_total{{phase="{phase}"}} {stats["calls"]}'
+                  for phase, stats in snapshot['phases'].items()]
+        lines += [f"# HELP {prefix}_events_total Random events fired, by name",
+                  f"# TYPE {prefix}_events_total counter"]
+        lines += [f'{prefix}_events_total{{event="{_label(name)}"}} {count}'
+                  for name, count in sorted(snapshot['events'].items())]
+        for name, help_text in (('starvation_deaths', "People who died of starvation"),
+                                ('upgrades_attempted', "upgrade_building calls"),
+                                ('upgrades_succeeded', "upgrade_building calls that upgraded")):
+            lines += [f"# HELP {prefix}_{name}_total {help_text}",
+                      f"# TYPE {prefix}_{name}_total counter",
+                      f"{prefix}_{name}_total {snapshot[name]}"]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path, prefix='slg'):
+        """Atomically replace path with the current metrics, e.g. for a textfile collector"""
+        write_atomic(path, self.prometheus(prefix))
+
+    def dump_periodically(self, path, interval=15.0, prefix='slg'):
+        """Rewrite path with the metrics every interval seconds from a daemon thread"""
+        self.stop_dumping()
+        self._stop = threading.Event()
+
+        def dump(stop):
+            while not stop.wait(interval):
+                self.write_prometheus(path, prefix)
+        self._dumper = threading.Thread(target=dump, args=(self._stop,), daemon=True)
+        self._dumper.start()
+
+    def stop_dumping(self):
+        if self._dumper is not None:
+            self._stop.set()
+            self._dumper.join()
+            self._dumper = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show where next_day spends its time")
+    parser.add_argument('--games', type=int, default=2000)
+    parser.add_argument('--prometheus', action='store_true', help="print Prometheus text instead")
+    args = parser.parse_args()
+
+    profiler = PhaseProfiler()
+    for seed in range(args.games):
+        game = profiler.attach(SLGGame(seed, sink=NULL_SINK))
+        while not game.game_over:
+            game.upgrade_building('farm')
+            game.next_day()
+
+    if args.prometheus:
+        print(profiler.prometheus(), end="")
+        return
+    snapshot = profiler.snapshot()
+    total = sum(stats['seconds'] for stats in snapshot['phases'].values())
+    print(f"{args.games:,} games, {snapshot['days']:,} days")
+    for phase, stats in snapshot['phases'].items():
+        share = stats['seconds'] / total if total else 0.0
+        print(f"  {phase:18} {stats['seconds'] * 1000:9.1f} ms  {share:6.1%}  "
+              f"{stats['seconds'] / max(1, stats['calls']) * 1e9:6.0f} ns/call")
+    print(f"Events: {', '.join(f'{name}: {count:,}' for name, count in profiler.events.most_common())}")
+    print(f"Starvation deaths: {snapshot['starvation_deaths']:,}")
+    print(f"Upgrades: {snapshot['upgrades_succeeded']:,} of {snapshot['upgrades_attempted']:,} attempts succeeded")
+
+
+if __name__ == "__main__":
+    main()
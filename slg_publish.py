@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# SLG Strategy Game - Live State Deltas over Server-Sent Events
+
+import argparse
+import asyncio
+import json
+import os
+from collections import deque
+from urllib.parse import parse_qs, urlsplit
+
+from slg import run_script
+from slg_core import SLGGame
+from slg_montecarlo import STRATEGIES
+from slg_sinks import NULL_SINK
+from slg_state import GameState
+
+# Every client gets a full state when the version is a multiple of this,
+# so a client that missed or misapplied a delta recovers within that many
+# versions
+SNAPSHOT_EVERY = 10
+
+# Versions kept to diff against; clients further behind get a full state
+HISTORY = 64
+
+PAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'survival_game.html')
+
+
+class StatePublisher:
+    """Numbered versions of a game's state, sent as deltas.
+
+    publish() captures the game as a new version whenever it changed.
+    message(since) brings a client that has acknowledged version since up
+    to date: a JSON object with the version 'v' and only the scalar fields
+    and buildings that changed, found with GameState.changes. Buildings go
+    as {name: [level, count, production]}. The message is a full state,
+    marked 'full', when since is unknown or older than the history, and
+    every snapshot_every versions. Messages are encoded once per base
+    version, so clients that are in step share one encoding.
+    """
+
+    def __init__(self, game, snapshot_every=SNAPSHOT_EVERY, history=HISTORY):
+        self.game = game
+        self.snapshot_every = snapshot_every
+        self.states = {}
+        self.order = deque()
+        self.history = history
+        self.version = 0
+        self.state = None
+        self._encoded = {}
+        self.publish()
+
+    def publish(self):
+        """Capture the game as the next version if anything changed; returns the current version"""
+        state = self.game.snapshot()
+        if state == self.state:
+            return self.version
+        self.version += 1
+        self.state = state
+        self.states[self.version] = state
+        self.order.append(self.version)
+        if len(self.order) > self.history:
+            del self.states[self.order.popleft()]
+        self._encoded = {}
+        return self.version
+
+    def message(self, since=None):
+        """(version, JSON text) for a client that has acknowledged version since"""
+        base = since if since in self.states and self.version % self.snapshot_every else None
+        text = self._encoded.get(base)
+        if text is None:
+            text = self._encoded[base] = json.dumps(self.payload(base), separators=(',', ':'))
+        return self.version, text
+
+    def payload(self, since=None):
+        """The message for a client at version since as a dict; everything when since is None"""
+        state = self.state
+        registry = self.game.registry
+        base = self.states.get(since) if since is not None else None
+        changed = state.changes(base, registry)
+        message = {'v': self.version}
+        if base is None:
+            message['full'] = 1
+        for field in GameState.FIELDS:
+            if field in changed:
+                message[field] = getattr(state, field)
+        buildings = {name: [level, count, production] for name, level, count, production
+                     in zip(registry.names, state.levels, state.counts, state.production) if name in changed}
+        if buildings:
+            message['buildings'] = buildings
+        return message
+
+
+def apply_message(client, message):
+    """Fold a decoded message into a client's state dict, as the browser does"""
+    if message.get('full'):
+        client.clear()
+    buildings = message.get('buildings', {})
+    client.update((key, value) for key, value in message.items() if key not in ('full', 'buildings'))
+    client['buildings'] = dict(client.get('buildings', {}), **buildings)
+    return client
+
+
+def measure_bytes(seed=0, strategy='round_robin', snapshot_every=SNAPSHOT_EVERY):
+    """Bytes sent per tick to a client that stays in step, over one game.
+
+    Returns (delta bytes per tick, full state bytes per tick); the first
+    tick and every snapshot_every-th are full states in the delta stream.
+    """
+    game = SLGGame(seed, sink=NULL_SINK)
+    publisher = StatePublisher(game, snapshot_every)
+    play = STRATEGIES[strategy]
+    since = None
+    deltas, fulls = [], []
+    while True:
+        version, text = publisher.message(since)
+        deltas.append(len(text))
+        fulls.append(len(publisher.message(None)[1]))
+        since = version
+        if game.game_over:
+            return deltas, fulls
+        play(game)
+        game.next_day()
+        publisher.publish()
+
+
+class PublishServer:
+    """Serves one game to browsers: the page, a Server-Sent Events stream and commands.
+
+    GET / returns survival_game.html, which shows the engine panel when
+    opened with ?engine. GET /events streams message(since) as SSE events
+    whose id is the version; a reconnecting EventSource sends the last id
+    it saw as Last-Event-ID, so it resumes from a delta. POST /command runs
+    one CLI command line (see slg.run_script), or answers 409 Conflict once
+    the game is over. With tick > 0 the game also plays a day with the
+    strategy every tick seconds.
+    """
+
+    def __init__(self, game, host='127.0.0.1', port=8000, tick=1.0, strategy='round_robin', page=PAGE):
+        self.game = game
+        self.publisher = StatePublisher(game)
+        self.host = host
+        self.port = port
+        self.tick = tick
+        self.play = STRATEGIES[strategy]
+        self.page = page
+        self.changed = asyncio.Condition()
+        self._server = None
+        self._ticker = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self.tick > 0:
+            self._ticker = asyncio.create_task(self._play_days())
+        return self
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        if self._ticker is not None:
+            self._ticker.cancel()
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def update(self):
+        """Publish the game's state and wake the event streams if it changed"""
+        version = self.publisher.version
+        if self.publisher.publish() != version:
+            async with self.changed:
+                self.changed.notify_all()
+
+    async def _play_days(self):
+        while not self.game.game_over:
+            await asyncio.sleep(self.tick)
+            self.play(self.game)
+            self.game.next_day()
+            await self.update()
+
+    async def _handle_client(self, reader, writer):
+        try:
+            request = await reader.readline()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            method, target, _ = request.decode('latin-1').split(' ', 2)
+            url = urlsplit(target)
+            if method == 'GET' and url.path in ('/', '/survival_game.html'):
+                with open(self.page, 'rb') as f:
+                    await self._respond(writer, '200 OK', 'text/html; charset=utf-8', f.read())
+            elif method == 'GET' and url.path == '/events':
+                since = headers.get('last-event-id') or parse_qs(url.query).get('since', [None])[0]
+                await self._stream(reader, writer, int(since) if since and since.isdigit() else None)
+            elif method == 'POST' and url.path == '/command':
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+                if self.game.game_over:
+                    await self._respond(writer, '409 Conflict', 'text/plain', b'Game over')
+                    return
+                run_script(self.game, [body.decode(errors='replace')], json_output=True)
+                await self.update()
+                await self._respond(writer, '204 No Content')
+            else:
+                await self._respond(writer, '404 Not Found', 'text/plain', b'Not found')
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, content_type=None, body=b''):
+        head = f"HTTP/1.1 {status}\r\nContent-Length: {len(body)}\r\nConnection: close\r\n"
+        if content_type:
+            head += f"Content-Type: {content_type}\r\n"
+        writer.write(head.encode() + b"\r\n" + body)
+        await writer.drain()
+
+    async def _stream(self, reader, writer, since):
+        """Send events until the client goes away; its wait on changed is cancelled then"""
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\nConnection: keep-alive\r\n\r\n")
+        publisher = self.publisher
+        gone = asyncio.ensure_future(_disconnected(reader))
+        try:
+            while True:
+                if publisher.version != since:
+                    since, text = publisher.message(since)
+                    writer.write(f"id: {since}\ndata: {text}\n\n".encode())
+                    await writer.drain()
+                changed = asyncio.ensure_future(self._wait_past(since))
+                await asyncio.wait((changed, gone), return_when=asyncio.FIRST_COMPLETED)
+                if gone.done():
+                    changed.cancel()
+                    return
+        finally:
+            gone.cancel()
+
+    async def _wait_past(self, version):
+        async with self.changed:
+            await self.changed.wait_for(lambda: self.publisher.version != version)
+
+
+async def _disconnected(reader):
+    """Returns once the client has closed its side of the connection"""
+    try:
+        while await reader.read(1024):
+            pass
+    except ConnectionError:
+        pass
+
+
+async def run_server(host, port, seed, tick, strategy):
+    server = await PublishServer(SLGGame(seed, sink=NULL_SINK), host, port, tick, strategy).start()
+    print(f"🎮 Live game at http://{server.host}:{server.port}/?engine")
+    await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish live SLG game state to the browser as deltas")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--strategy', default='round_robin', choices=sorted(STRATEGIES))
+    parser.add_argument('--serve', action='store_true', help="serve the game over HTTP instead of measuring")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--tick', type=float, default=1.0,
+                        help="with --serve, seconds between automatic days (0: only POST /command)")
+    args = parser.parse_args()
+
+    if args.serve:
+        try:
+            asyncio.run(run_server(args.host, args.port, args.seed, args.tick, args.strategy))
+        except KeyboardInterrupt:
+            print("\nServer stopped.")
+        return
+
+    deltas, fulls = measure_bytes(args.seed, args.strategy)
+    print(f"{len(deltas)} ticks (seed {args.seed}, {args.strategy}), full state every {SNAPSHOT_EVERY} versions")
+    print(f"  full state:  {sum(fulls) / len(fulls):6.1f} bytes/tick, {sum(fulls):6,} bytes in all")
+    print(f"  deltas:      {sum(deltas) / len(deltas):6.1f} bytes/tick, {sum(deltas):6,} bytes in all "
+          f"(min {min(deltas)}, max {max(deltas)})")
+
+
+if __name__ == "__main__":
+    main()
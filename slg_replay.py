@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# SLG Strategy Game - Recording, Replay and Verification
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from slg_core import SLGGame
+from slg_montecarlo import STRATEGIES
+from slg_sinks import NULL_SINK
+
+
+def state_fields(state):
+    """GameState as a JSON-friendly list"""
+    return [state.day, state.gold, state.food, state.wood, state.stone, state.population,
+            state.max_population, state.game_over, list(state.levels), list(state.production),
+            list(state.counts)]
+
+
+class RecordingGame:
+    """Wraps an SLGGame and records its commands and the state after every day.
+
+    A skip is recorded as one command, followed by the state it ended in.
+    Anything other than upgrade_building, build_building, next_day and the
+    skips is passed straight through to the wrapped game, so a
+    RecordingGame can stand in for one.
+    """
+
+    def __init__(self, seed, game=None):
+        self.seed = seed
+        self.game = game if game is not None else SLGGame(seed, sink=NULL_SINK)
+        self.commands = []
+        self.states = []
+
+    def __getattr__(self, name):
+        return getattr(self.game, name)
+
+    def upgrade_building(self, building_name):
+        upgraded = self.game.upgrade_building(building_name)
+        self.commands.append(f"upgrade {building_name}")
+        return upgraded
+
+    def build_building(self, building_name):
+        built = self.game.build_building(building_name)
+        self.commands.append(f"build {building_name}")
+        return built
+
+    def next_day(self):
+        self.game.next_day()
+        self.commands.append("next")
+        self.states.append(state_fields(self.game.snapshot()))
+
+    def skip_days(self, days):
+        played = self.game.skip_days(days)
+        self.commands.append(f"skip {days}")
+        self.states.append(state_fields(self.game.snapshot()))
+        return played
+
+    def skip_until_upgrade(self, building_name):
+        played = self.game.skip_until_upgrade(building_name)
+        self.commands.append(f"skip until upgrade {building_name}")
+        self.states.append(state_fields(self.game.snapshot()))
+        return played
+
+    def to_dict(self):
+        return {'seed': self.seed, 'commands': self.commands, 'states': self.states}
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, separators=(',', ':'))
+
+
+class ReplayResult:
+    """Outcome of replaying one recording"""
+
+    __slots__ = ('path', 'days', 'divergent_day', 'expected', 'actual')
+
+    def __init__(self, path, days, divergent_day=None, expected=None, actual=None):
+        self.path = path
+        self.days = days
+        self.divergent_day = divergent_day
+        self.expected = expected
+        self.actual = actual
+
+    @property
+    def ok(self):
+        return self.divergent_day is None
+
+    def __repr__(self):
+        if self.ok:
+            return f"ReplayResult({self.path!r}, ok, {self.days} days)"
+        return (f"ReplayResult({self.path!r}, diverged on day {self.divergent_day}: "
+                f"expected {self.expected}, got {self.actual})")
+
+
+def replay(recording, path=None):
+    """Re-run a recording headless and compare the state after every day or skip.
+
+    Stops at the first day whose state differs from the recording.
+    """
+    game = SLGGame(recording['seed'], sink=NULL_SINK)
+    expected_states = recording['states']
+    days = 0
+    for command in recording['commands']:
+        if command == 'next' or command.startswith('skip '):
+            if command == 'next':
+                game.next_day()
+            elif command.startswith('skip until upgrade '):
+                game.skip_until_upgrade(command.split(' ')[3])
+            else:
+                game.skip_days(int(command.split(' ')[1]))
+            actual = state_fields(game.snapshot())
+            expected = expected_states[days] if days < len(expected_states) else None
+            days += 1
+            if actual != expected:
+                return ReplayResult(path, days, actual[0], expected, actual)
+        elif command.startswith('build '):
+            game.build_building(command.split(' ', 1)[1])
+        else:
+            game.upgrade_building(command.split(' ', 1)[1])
+    if days != len(expected_states):
+        return ReplayResult(path, days, days + 1, expected_states[days], None)
+    return ReplayResult(path, days)
+
+
+def replay_file(path):
+    with open(path, encoding='utf-8') as f:
+        return replay(json.load(f), path)
+
+
+def replay_files(paths):
+    """Replay a batch of recordings in one worker"""
+    return [replay_file(path) for path in paths]
+
+
+def replay_directory(directory, workers=None, batch_size=500):
+    """Replay every *.json recording in a directory on a worker pool.
+
+    Returns the results (in file name order) and the replays per second.
+    """
+    paths = sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.json'))
+    batches = [paths[i:i + batch_size] for i in range(0, len(paths), batch_size)]
+    start = time.perf_counter()
+    if workers == 1:
+        results = [result for batch in batches for result in replay_files(batch)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = [result for batch in executor.map(replay_files, batches) for result in batch]
+    elapsed = time.perf_counter() - start
+    return results, len(results) / elapsed if elapsed else 0.0
+
+
+def generate_recordings(directory, count, strategy='round_robin', first_seed=0):
+    """Record count strategy-driven games into a directory"""
+    os.makedirs(directory, exist_ok=True)
+    play = STRATEGIES[strategy]
+    for seed in range(first_seed, first_seed + count):
+        game = RecordingGame(seed)
+        while not game.game_over:
+            play(game)
+            game.next_day()
+        game.save(os.path.join(directory, f"game-{seed:08d}.json"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded SLG games and verify every day's state")
+    parser.add_argument('directory', help="directory of *.json recordings")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--generate', type=int, default=0, metavar='N',
+                        help="first record N strategy-driven games into the directory")
+    args = parser.parse_args()
+
+    if args.generate:
+        generate_recordings(args.directory, args.generate)
+    results, rate = replay_directory(args.directory, args.workers)
+    failures = [result for result in results if not result.ok]
+    print(f"Replayed {len(results):,} recordings ({rate:,.0f} replays/s)")
+    for result in failures[:20]:
+        print(f"  {result}")
+    if failures:
+        print(f"❌ {len(failures):,} recordings diverged")
+        raise SystemExit(1)
+    print("✅ All recordings match")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# SLG Strategy Game - Asyncio Multi-Session Server
+
+import argparse
+import asyncio
+import io
+import itertools
+import os
+import random
+import sys
+import time
+
+from slg import ADVANCES, command_handlers, parse_command
+from slg_buildings import BUILDING_REGISTRY
+from slg_core import SLGGame
+from slg_events import EVENT_TABLE
+from slg_profile import PhaseProfiler
+from slg_replay import RecordingGame
+from slg_sinks import TextSink
+
+# Every response ends with this prompt line, so clients can pipeline commands
+PROMPT = ">"
+
+# Bytes of Mersenne Twister state behind each random.Random (624 words + index)
+RNG_STATE_BYTES = 625 * 4
+
+
+def session_handlers(game, output):
+    """command_handlers for a game whose TextSink writes to output, with help written there too"""
+    handlers = command_handlers(game)
+    handlers['help'] = lambda: print(game.help_text(), file=output)
+    return handlers
+
+
+def deep_sizeof(obj, seen=None):
+    """Approximate memory held by an object and everything it references"""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(key, seen) + deep_sizeof(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, '__dict__'):
+        size += deep_sizeof(vars(obj), seen)
+    if isinstance(obj, random.Random):
+        size += RNG_STATE_BYTES
+    return size
+
+
+class Session:
+    """One connected player and their game, whose text goes to the session's own buffer"""
+
+    __slots__ = ('session_id', 'game', 'output', 'handlers', 'writer', 'last_active')
+
+    def __init__(self, session_id, writer, seed):
+        self.session_id = session_id
+        self.output = io.StringIO()
+        self.game = SLGGame(seed, sink=TextSink(self.output))
+        self.handlers = None
+        self.writer = writer
+        self.last_active = time.monotonic()
+
+    @property
+    def memory(self):
+        """Estimated bytes held by the game right now, including what a RecordingGame has recorded"""
+        # The event table and building registry are shared by every game,
+        # so they are not charged to sessions
+        return deep_sizeof(self.game, seen={id(EVENT_TABLE), id(BUILDING_REGISTRY)})
+
+
+class SLGServer:
+    """Hosts many SLGGame sessions in one event loop over a line protocol.
+
+    Commands are parsed and run exactly as in the CLI (slg.parse_command),
+    including ' xN' repeats, and the status follows every advance as in
+    interactive play. Each response ends with a prompt line. A session is
+    not read from again until its output has drained below the write
+    buffer limit, which gives backpressure on slow clients; sessions idle
+    for longer than idle_timeout are closed by a single sweeper task. With a
+    record_dir, each finished session is saved there for slg_replay; with
+    a PhaseProfiler, every session's game is instrumented by it.
+    """
+
+    def __init__(self, host='127.0.0.1', port=8765, idle_timeout=300.0,
+                 write_buffer_limit=64 * 1024, max_line=1024, record_dir=None, profiler=None):
+        self.host = host
+        self.port = port
+        self.idle_timeout = idle_timeout
+        self.write_buffer_limit = write_buffer_limit
+        self.max_line = max_line
+        self.record_dir = record_dir
+        self.profiler = profiler
+        self.sessions = {}
+        self.commands = 0
+        self.evicted = 0
+        self._ids = itertools.count(1)
+        self._server = None
+        self._sweeper = None
+        self._handlers = set()
+
+    @property
+    def memory_bytes(self):
+        """Estimated bytes held by the games of all live sessions, measured now"""
+        return sum(session.memory for session in self.sessions.values())
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port,
+                                                  limit=self.max_line)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._sweeper = asyncio.create_task(self._evict_idle())
+        return self
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        self._sweeper.cancel()
+        self._server.close()
+        for session in list(self.sessions.values()):
+            session.writer.close()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def _handle_client(self, reader, writer):
+        session = Session(next(self._ids), writer, random.getrandbits(64))
+        if self.profiler is not None:
+            self.profiler.attach(session.game)
+        if self.record_dir is not None:
+            session.game = RecordingGame(session.game.seed, session.game)
+        session.handlers = session_handlers(session.game, session.output)
+        self.sessions[session.session_id] = session
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        writer.transport.set_write_buffer_limits(high=self.write_buffer_limit)
+        try:
+            session.handlers['help']()
+            await self._send(session, self.take_output(session.output))
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                session.last_active = time.monotonic()
+                response, keep_open = self.execute(session.game, line.decode(errors='replace'),
+                                                  session.output, session.handlers)
+                self.commands += 1
+                await self._send(session, response)
+                if not keep_open:
+                    break
+        except (ConnectionError, ValueError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            self.sessions.pop(session.session_id, None)
+            self._handlers.discard(handler)
+            writer.close()
+            if self.record_dir is not None:
+                session.game.save(os.path.join(self.record_dir, f"session-{session.session_id:08d}.json"))
+
+    async def _send(self, session, text):
+        writer = session.writer
+        writer.write(f"{text}{PROMPT}\n".encode())
+        if writer.transport.get_write_buffer_size() > self.write_buffer_limit:
+            await writer.drain()
+
+    @staticmethod
+    def take_output(output):
+        """Everything written to a session buffer since the last take, emptying it"""
+        text = output.getvalue()
+        output.seek(0)
+        output.truncate()
+        return text
+
+    @staticmethod
+    def execute(game, line, output, handlers=None):
+        """Run one command line against a game whose TextSink writes to output, returning (text, keep_open)"""
+        action, argument, repeat = parse_command(line)
+        if action == 'quit':
+            print("Thanks for playing!", file=output)
+            return SLGServer.take_output(output), False
+        handler = (handlers or session_handlers(game, output))[action]
+        for _ in range(repeat):
+            if game.game_over:
+                break
+            if argument is None:
+                handler()
+            else:
+                handler(argument)
+        if action in ADVANCES and not game.game_over:
+            game.emit(game.status_record())
+        return SLGServer.take_output(output), not game.game_over
+
+    async def _evict_idle(self):
+        interval = min(1.0, self.idle_timeout / 2)
+        while True:
+            await asyncio.sleep(interval)
+            cutoff = time.monotonic() - self.idle_timeout
+            for session in [s for s in self.sessions.values() if s.last_active < cutoff]:
+                self.sessions.pop(session.session_id, None)
+                session.writer.close()
+                self.evicted += 1
+
+
+async def run_server(host, port, idle_timeout, record_dir, metrics_file=None):
+    profiler = None
+    if metrics_file:
+        profiler = PhaseProfiler()
+        profiler.dump_periodically(metrics_file)
+    server = await SLGServer(host, port, idle_timeout, record_dir=record_dir, profiler=profiler).start()
+    print(f"🎮 SLG server listening on {server.host}:{server.port}")
+    await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Host many SLG game sessions over TCP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--idle-timeout', type=float, default=300.0, help="seconds before idle sessions close")
+    parser.add_argument('--record-dir', default=None, help="save every finished session here for replay")
+    parser.add_argument('--metrics-file', default=None,
+                        help="profile every game and rewrite this Prometheus text file every 15 s")
+    args = parser.parse_args()
+    if args.record_dir:
+        os.makedirs(args.record_dir, exist_ok=True)
+    try:
+        asyncio.run(run_server(args.host, args.port, args.idle_timeout, args.record_dir, args.metrics_file))
+    except KeyboardInterrupt:
+        print("\nServer stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# SLG Strategy Game - Typed Game Event Records and Output Sinks
+
+import sys
+from collections import namedtuple
+
+# Records the engine emits while applying the rules
+ResourcesCollected = namedtuple('ResourcesCollected', 'day food wood gold stone')
+FoodConsumed = namedtuple('FoodConsumed', 'day amount')
+PopulationGrew = namedtuple('PopulationGrew', 'day population')
+Starvation = namedtuple('Starvation', 'day deaths')
+BuildingUpgraded = namedtuple('BuildingUpgraded', 'day building level')
+UpgradeFailed = namedtuple('UpgradeFailed', 'day building gold wood stone')
+BuildingBuilt = namedtuple('BuildingBuilt', 'day building count')
+BuildFailed = namedtuple('BuildFailed', 'day building gold wood stone')
+InvalidBuilding = namedtuple('InvalidBuilding', 'day building')
+EventTriggered = namedtuple('EventTriggered', 'day name message')
+DaysSkipped = namedtuple('DaysSkipped', 'day days')
+GameOver = namedtuple('GameOver', 'day victory population total_resources score')
+
+# Records the command front ends emit; buildings is ((name, level, count), ...)
+StatusShown = namedtuple('StatusShown', 'day gold food wood stone population max_population buildings')
+InvalidCommand = namedtuple('InvalidCommand', 'day command')
+
+
+def render_text(record):
+    """The CLI text for a record, exactly as slg.py used to print it"""
+    kind = type(record)
+    if kind is ResourcesCollected:
+        return "\nResources collected for the day!"
+    if kind is FoodConsumed:
+        return f"Population consumed {record.amount} food"
+    if kind is PopulationGrew:
+        return "Population grew by 1!"
+    if kind is Starvation:
+        return f"STARVATION! {record.deaths} people died from hunger!"
+    if kind is BuildingUpgraded:
+        return f"{record.building.title()} upgraded to level {record.level}!"
+    if kind is UpgradeFailed:
+        return ("Not enough resources for upgrade!\n"
+                f"Cost: Gold: {record.gold}, Wood: {record.wood}, Stone: {record.stone}")
+    if kind is BuildingBuilt:
+        return f"{record.building.title()} built! You now have {record.count}."
+    if kind is BuildFailed:
+        return ("Not enough resources to build!\n"
+                f"Cost: Gold: {record.gold}, Wood: {record.wood}, Stone: {record.stone}")
+    if kind is InvalidBuilding:
+        return "Invalid building name!"
+    if kind is EventTriggered:
+        return f"\n*** EVENT: {record.name} ***\n{record.message}"
+    if kind is DaysSkipped:
+        return f"\nSkipped {record.days} days to day {record.day}."
+    if kind is GameOver:
+        if not record.victory:
+            return "\n💀 GAME OVER - Your population has perished!"
+        return (f"\n🎉 VICTORY! You survived {record.day} days!\n"
+                "\n=== FINAL SCORE ===\n"
+                f"Days Survived: {record.day}\n"
+                f"Final Population: {record.population}\n"
+                f"Total Resources: {record.total_resources}\n"
+                f"Final Score: {record.score}")
+    if kind is StatusShown:
+        lines = [f"\n=== Day {record.day} ===",
+                 f"Resources: Gold: {record.gold} | Food: {record.food} | Wood: {record.wood} | "
+                 f"Stone: {record.stone}",
+                 f"Population: {record.population}/{record.max_population}",
+                 "Buildings:"]
+        for name, level, count in record.buildings:
+            copies = f" x{count}" if count != 1 else ""
+            lines.append(f"  {name.title()}: Level {level}{copies}")
+        return "\n".join(lines)
+    if kind is InvalidCommand:
+        return "Invalid command. Type 'help' for available commands."
+    raise TypeError(f"Unknown game record {record!r}")
+
+
+class NullSink:
+    """Discards everything. Games skip building records entirely for it."""
+
+    def emit(self, record):
+        pass
+
+    def flush(self):
+        pass
+
+
+class TextSink:
+    """Renders records as today's CLI text.
+
+    By default every record is written straight to the current sys.stdout,
+    so it interleaves with display_status and friends. With buffered=True
+    the text is kept in memory until flush().
+    """
+
+    def __init__(self, stream=None, buffered=False):
+        self.stream = stream
+        self.buffered = buffered
+        self.lines = []
+
+    def emit(self, record):
+        if self.buffered:
+            self.lines.append(render_text(record))
+        else:
+            print(render_text(record), file=self.stream or sys.stdout)
+
+    def flush(self):
+        if self.lines:
+            stream = self.stream or sys.stdout
+            stream.write("\n".join(self.lines) + "\n")
+            self.lines.clear()
+        if self.stream is not None:
+            self.stream.flush()
+
+
+class JsonLinesSink:
+    """Writes one JSON object per record, in batches of batch_size lines"""
+
+    def __init__(self, stream, batch_size=1000):
+        import json
+        self.dumps = json.dumps
+        self.stream = stream
+        self.batch_size = batch_size
+        self.lines = []
+
+    def emit(self, record):
+        fields = record._asdict()
+        fields['type'] = type(record).__name__
+        self.lines.append(self.dumps(fields, ensure_ascii=False))
+        if len(self.lines) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.lines:
+            self.stream.write("\n".join(self.lines) + "\n")
+            self.lines.clear()
+        self.stream.flush()
+
+
+class ListSink:
+    """Keeps every record in a list, for tests and tools"""
+
+    def __init__(self):
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+    def flush(self):
+        pass
+
+
+# Shared instance for headless runs
+NULL_SINK = NullSink()
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# SLG Strategy Game - Streaming Score Distributions
+
+import argparse
+import json
+import math
+import os
+import random
+import time
+
+from slg_core import SLGGame, stream_seed
+from slg_io import write_atomic
+from slg_montecarlo import STRATEGIES, shard_seeds
+from slg_sinks import NULL_SINK
+
+# What a GameAggregator tracks for every finished game
+METRICS = ('score', 'days', 'population')
+
+# Percentiles main() prints
+PERCENTILES = (0.01, 0.1, 0.5, 0.9, 0.99, 0.999)
+
+
+class Moments:
+    """Running count, mean, variance, min and max, mergeable without loss"""
+
+    __slots__ = ('count', 'mean', 'm2', 'min', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """Fold another Moments into this one"""
+        if not other.count:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self):
+        """Population variance"""
+        return self.m2 / self.count if self.count else 0.0
+
+    def to_dict(self):
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2,
+                'min': self.min if self.count else None, 'max': self.max if self.count else None}
+
+    @classmethod
+    def from_dict(cls, data):
+        moments = cls()
+        moments.count = data['count']
+        moments.mean = data['mean']
+        moments.m2 = data['m2']
+        if moments.count:
+            moments.min = data['min']
+            moments.max = data['max']
+        return moments
+
+
+class KLLSketch:
+    """KLL quantile sketch: about 3k stored values however many are added.
+
+    Values live in levels; a value at level h stands for 2 ** h inputs.
+    When the sketch is full, the lowest level over its capacity is sorted
+    and every other value (from a random offset) moves up a level.
+    Capacities shrink by 2/3 per level below the top, so quantiles stay
+    within about 1.7 / k of the true rank with high probability.
+    """
+
+    __slots__ = ('k', 'levels', 'count', 'size', 'max_size', 'rng')
+
+    def __init__(self, k=200, seed=0):
+        self.k = k
+        self.levels = [[]]
+        self.count = 0
+        self.size = 0
+        self.rng = random.Random(seed)
+        self._resize()
+
+    def _capacity(self, level):
+        return max(2, math.ceil(self.k * (2 / 3) ** (len(self.levels) - level - 1)))
+
+    def _resize(self):
+        self.max_size = sum(self._capacity(level) for level in range(len(self.levels)))
+
+    def add(self, value):
+        self.levels[0].append(value)
+        self.count += 1
+        self.size += 1
+        if self.size >= self.max_size:
+            self._compress()
+
+    def _compress(self):
+        while self.size >= self.max_size:
+            for level, items in enumerate(self.levels):
+                if len(items) >= self._capacity(level):
+                    break
+            if level + 1 == len(self.levels):
+                self.levels.append([])
+                self._resize()
+            items.sort()
+            keep = [items.pop()] if len(items) % 2 else []
+            promoted = items[self.rng.getrandbits(1)::2]
+            self.levels[level + 1].extend(promoted)
+            self.levels[level] = keep
+            self.size -= len(items) - len(promoted)
+
+    def merge(self, other):
+        """Fold another sketch into this one"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for level, items in enumerate(other.levels):
+            self.levels[level].extend(items)
+        self.count += other.count
+        self.size += other.size
+        self._resize()
+        self._compress()
+        return self
+
+    def quantiles(self, fractions):
+        """Approximate values at each fraction (0..1) of the sorted inputs"""
+        weighted = sorted((value, 1 << level) for level, items in enumerate(self.levels) for value in items)
+        if not weighted:
+            return [None for _ in fractions]
+        results = []
+        for fraction in fractions:
+            target = fraction * self.count
+            seen = 0
+            for value, weight in weighted:
+                seen += weight
+                if seen > target:
+                    break
+            results.append(value)
+        return results
+
+    def quantile(self, fraction):
+        return self.quantiles([fraction])[0]
+
+    def to_dict(self):
+        return {'k': self.k, 'count': self.count, 'levels': self.levels}
+
+    @classmethod
+    def from_dict(cls, data, seed=0):
+        sketch = cls(data['k'], seed)
+        sketch.levels = [list(items) for items in data['levels']]
+        sketch.count = data['count']
+        sketch.size = sum(len(items) for items in sketch.levels)
+        sketch._resize()
+        return sketch
+
+
+class GameAggregator:
+    """Distributions of final score, days survived and final population.
+
+    Each metric keeps Moments and a KLLSketch, so memory stays at a few
+    kilobytes whatever the number of games. Aggregators from different
+    worker processes merge(), and save()/load() use a small JSON file.
+    """
+
+    def __init__(self, k=200):
+        self.moments = {metric: Moments() for metric in METRICS}
+        self.sketches = {metric: KLLSketch(k, seed) for seed, metric in enumerate(METRICS)}
+
+    def __len__(self):
+        return self.moments['score'].count
+
+    def add(self, game):
+        """Record one finished game"""
+        for metric, value in (('score', game.final_score()), ('days', game.day),
+                              ('population', game.population)):
+            self.moments[metric].add(value)
+            self.sketches[metric].add(value)
+
+    def attach(self, game):
+        """Record a game automatically when it ends; returns the game"""
+        check_game_over = game.check_game_over
+
+        def recorded_check_game_over():
+            was_over = game.game_over
+            check_game_over()
+            if game.game_over and not was_over:
+                self.add(game)
+        game.check_game_over = recorded_check_game_over
+        return game
+
+    def merge(self, other):
+        """Fold another aggregator into this one"""
+        for metric in METRICS:
+            self.moments[metric].merge(other.moments[metric])
+            self.sketches[metric].merge(other.sketches[metric])
+        return self
+
+    def quantiles(self, metric, fractions=PERCENTILES):
+        return self.sketches[metric].quantiles(fractions)
+
+    def to_dict(self):
+        return {metric: {'moments': self.moments[metric].to_dict(),
+                         'sketch': self.sketches[metric].to_dict()} for metric in METRICS}
+
+    @classmethod
+    def from_dict(cls, data):
+        aggregator = cls()
+        for seed, metric in enumerate(METRICS):
+            aggregator.moments[metric] = Moments.from_dict(data[metric]['moments'])
+            aggregator.sketches[metric] = KLLSketch.from_dict(data[metric]['sketch'], seed)
+        return aggregator
+
+    def save(self, path):
+        """Atomically write the aggregator to a JSON file"""
+        write_atomic(path, json.dumps(self.to_dict(), separators=(',', ':')))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+def aggregate_shard(strategy, first_seed, last_seed, run_seed=0):
+    """Play games [first_seed, last_seed) of a run with a named strategy into a GameAggregator"""
+    aggregator = GameAggregator()
+    play = STRATEGIES[strategy]
+    for index in range(first_seed, last_seed):
+        game = aggregator.attach(SLGGame(stream_seed(run_seed, index), sink=NULL_SINK))
+        while not game.game_over:
+            play(game)
+            game.next_day()
+    return aggregator
+
+
+def aggregate_games(strategy, first_seed, last_seed, workers=None, shard_size=10000, run_seed=0):
+    """Distributions over games [first_seed, last_seed) of a run, played on a process pool (workers=1: in-process)"""
+    shards = shard_seeds(first_seed, last_seed, shard_size)
+    aggregator = GameAggregator()
+    if workers == 1:
+        for start, stop in shards:
+            aggregator.merge(aggregate_shard(strategy, start, stop, run_seed))
+        return aggregator
+
+    # Imported here so in-process runs and pool workers skip multiprocessing setup
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(aggregate_shard, strategy, start, stop, run_seed) for start, stop in shards]
+        for future in futures:
+            aggregator.merge(future.result())
+    return aggregator
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming distributions of SLG game results")
+    parser.add_argument('--strategy', default='round_robin', choices=sorted(STRATEGIES))
+    parser.add_argument('--games', type=int, default=100000)
+    parser.add_argument('--first-seed', type=int, default=0, help="index of the first game in the run")
+    parser.add_argument('--run-seed', type=int, default=0, help="seed every game's stream is derived from")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--merge', nargs='*', default=[], metavar='FILE', help="fold in saved aggregators")
+    parser.add_argument('--output', default=None, help="save the aggregator to this file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    aggregator = GameAggregator()
+    if args.games:
+        aggregator = aggregate_games(args.strategy, args.first_seed, args.first_seed + args.games, args.workers,
+                                     run_seed=args.run_seed)
+    for path in args.merge:
+        aggregator.merge(GameAggregator.load(path))
+    elapsed = time.perf_counter() - start
+
+    played = f" ({args.games / elapsed:,.0f} games/s played)" if args.games else ""
+    print(f"{len(aggregator):,} games{played}")
+    for metric in METRICS:
+        moments = aggregator.moments[metric]
+        values = ", ".join(f"p{fraction * 100:g} {value:g}" for fraction, value
+                           in zip(PERCENTILES, aggregator.quantiles(metric)))
+        print(f"  {metric:10} mean {moments.mean:9.1f}  std {math.sqrt(moments.variance):8.1f}  "
+              f"min {moments.min:g}  max {moments.max:g}  {values}")
+    if args.output:
+        aggregator.save(args.output)
+        print(f"Saved to {args.output} ({os.path.getsize(args.output):,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
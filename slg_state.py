@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# SLG Strategy Game - Compact Game State
+
+import struct
+
+from slg_buildings import BUILDING_REGISTRY
+from slg_events import EVENT_TABLE
+
+# Default building order, used by the engines that only know the default buildings
+BUILDINGS = BUILDING_REGISTRY.names
+
+
+class GameState:
+    """Immutable, hashable snapshot of everything that SLGGame rules depend on.
+
+    The RNG is not part of the state: two games in the same GameState
+    behave identically given the same random draws, which is what lookahead
+    search and transposition tables need. levels, production and counts
+    hold one entry per building type, in the game's registry order; counts
+    defaults to one copy of each.
+    """
+
+    __slots__ = ('day', 'gold', 'food', 'wood', 'stone', 'population', 'max_population',
+                 'game_over', 'levels', 'production', 'counts', '_hash')
+
+    # Little-endian layouts used by pack()/unpack(), by number of building types
+    _records = {}
+
+    def __init__(self, day, gold, food, wood, stone, population, max_population,
+                 game_over, levels, production, counts=None):
+        set_field = object.__setattr__
+        set_field(self, 'day', day)
+        set_field(self, 'gold', gold)
+        set_field(self, 'food', food)
+        set_field(self, 'wood', wood)
+        set_field(self, 'stone', stone)
+        set_field(self, 'population', population)
+        set_field(self, 'max_population', max_population)
+        set_field(self, 'game_over', game_over)
+        set_field(self, 'levels', tuple(levels))
+        set_field(self, 'production', tuple(production))
+        set_field(self, 'counts', tuple(counts) if counts is not None else (1,) * len(self.levels))
+        set_field(self, '_hash', None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("GameState is immutable")
+
+    @classmethod
+    def record(cls, building_count):
+        """Binary layout for a state with building_count building types"""
+        layout = cls._records.get(building_count)
+        if layout is None:
+            layout = cls._records[building_count] = struct.Struct(f'<8q{3 * building_count}q')
+        return layout
+
+    @classmethod
+    def from_game(cls, game):
+        """Capture the state of an SLGGame"""
+        infos = [game.buildings[building.name] for building in game.registry.types]
+        return cls(game.day, game.gold, game.food, game.wood, game.stone,
+                   game.population, game.max_population, game.game_over,
+                   [info['level'] for info in infos],
+                   [info[building.key] for building, info in zip(game.registry.types, infos)],
+                   [info['count'] for info in infos])
+
+    def apply_to(self, game):
+        """Write this state back into an SLGGame, reusing its building dicts.
+
+        The game's production vector is rebuilt from the per-type production.
+        """
+        game.day = self.day
+        game.gold = self.gold
+        game.food = self.food
+        game.wood = self.wood
+        game.stone = self.stone
+        game.population = self.population
+        game.max_population = self.max_population
+        game.game_over = self.game_over
+        buildings = game.buildings
+        for building, level, production, count in zip(game.registry.types, self.levels,
+                                                      self.production, self.counts):
+            info = buildings[building.name]
+            info['level'] = level
+            info['count'] = count
+            info[building.key] = production
+        game.production = game.registry.production_vector(self.production)
+
+    # Scalar fields compared by changes()
+    FIELDS = ('day', 'gold', 'food', 'wood', 'stone', 'population', 'max_population', 'game_over')
+
+    def changes(self, other, registry=BUILDING_REGISTRY):
+        """Names of what differs from other: scalar fields, and buildings whose level or count differs.
+
+        Everything counts as changed when other is None.
+        """
+        if other is None:
+            return set(self.FIELDS) | set(registry.names)
+        changed = {field for field in self.FIELDS if getattr(self, field) != getattr(other, field)}
+        if self.levels != other.levels or self.counts != other.counts:
+            changed.update(name for name, level, count, old_level, old_count
+                           in zip(registry.names, self.levels, self.counts, other.levels, other.counts)
+                           if level != old_level or count != old_count)
+        return changed
+
+    def _key(self):
+        return (self.day, self.gold, self.food, self.wood, self.stone, self.population,
+                self.max_population, self.game_over, self.levels, self.production, self.counts)
+
+    def __eq__(self, other):
+        if not isinstance(other, GameState):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self):
+        if self._hash is None:
+            object.__setattr__(self, '_hash', hash(self._key()))
+        return self._hash
+
+    def __repr__(self):
+        return (f"GameState(day={self.day}, gold={self.gold}, food={self.food}, wood={self.wood}, "
+                f"stone={self.stone}, population={self.population}/{self.max_population}, "
+                f"game_over={self.game_over}, levels={self.levels})")
+
+    def __getstate__(self):
+        return self._key()
+
+    def __setstate__(self, fields):
+        GameState.__init__(self, *fields)
+
+    def pack(self):
+        """Serialize to a fixed-size binary record"""
+        return self.record(len(self.levels)).pack(
+            self.day, self.gold, self.food, self.wood, self.stone, self.population,
+            self.max_population, int(self.game_over), *self.levels, *self.production, *self.counts)
+
+    @classmethod
+    def unpack(cls, record):
+        """Rebuild a GameState from pack() output"""
+        n = (len(record) // 8 - 8) // 3
+        fields = cls.record(n).unpack(record)
+        return cls(*fields[:7], bool(fields[7]), fields[8:8 + n], fields[8 + n:8 + 2 * n], fields[8 + 2 * n:])
+
+
+# Record layout of a state of the default buildings
+GameState.RECORD = GameState.record(len(BUILDINGS))
+
+
+# State-level transition rules, mirroring SLGGame.upgrade_building and
+# SLGGame.consume_resources in slg_core.py; buildings come from
+# slg_buildings and events from slg_events. The lookahead engines built on
+# these use the default buildings, where each building type produces a
+# different resource in RESOURCES order, so per-type production is also
+# the per-resource production vector.
+
+GROWTH_CHANCE = 0.3
+
+# Day on which a game is won, unless its balance says otherwise
+VICTORY_DAY = 30
+
+
+def upgrade_state(state, index, registry=BUILDING_REGISTRY):
+    """State after upgrading building type index, or None if it is unaffordable"""
+    building = registry.types[index]
+    count = state.counts[index]
+    food_cost, wood_cost, gold_cost, stone_cost = building.upgrade_cost(state.levels[index], count)
+    if (state.gold < gold_cost or state.wood < wood_cost or state.stone < stone_cost or
+            state.food < food_cost):
+        return None
+    levels = list(state.levels)
+    production = list(state.production)
+    levels[index] += 1
+    production[index] += building.per_level * count
+    return GameState(state.day, state.gold - gold_cost, state.food - food_cost, state.wood - wood_cost,
+                     state.stone - stone_cost, state.population, state.max_population,
+                     state.game_over, levels, production, state.counts)
+
+
+def day_transitions(gold, food, wood, stone, population, max_population, production,
+                    events=EVENT_TABLE, event_outcomes=None):
+    """Every random branch of one next_day as (probability, gold, food, wood, stone, population).
+
+    production is the daily production per resource, in RESOURCES order.
+    Works on plain integers so that bulk engines can key states on tuples;
+    the day counter is left to the caller. Branches are not merged, so the
+    same result may appear more than once. event_outcomes replaces
+    events.outcomes, e.g. with events.mean_outcomes.
+    """
+    food_production, wood_production, gold_production, stone_production = production
+    gold += gold_production
+    food += food_production
+    wood += wood_production
+    stone += stone_production
+
+    # Population consumes food, then may grow or starve
+    if food >= population:
+        food -= population
+        if population < max_population:
+            fed = ((GROWTH_CHANCE, food, population + 1), (1.0 - GROWTH_CHANCE, food, population))
+        else:
+            fed = ((1.0, food, population),)
+    else:
+        fed = ((1.0, 0, population - min(population - food, population)),)
+
+    # Then at most one event, with fields in EVENT_FIELDS order
+    branches = []
+    for chance, food, population in fed:
+        for probability, effects in event_outcomes or events.outcomes:
+            values = [gold, food, wood, stone, population]
+            for index, delta, floor in effects:
+                value = values[index] + delta
+                if floor is not None and value < floor:
+                    value = floor
+                values[index] = value
+            branches.append((chance * probability, *values))
+    return branches
+
+
+def next_day_outcomes(state, victory_day=VICTORY_DAY, event_outcomes=None):
+    """Exact distribution of next_day() from a state.
+
+    Returns a dict mapping each distinct resulting GameState to its
+    probability. Identical outcomes reached through different random
+    draws are merged. With event_outcomes (see day_transitions) the
+    distribution is only as exact as those outcomes.
+    """
+    day = state.day + 1
+    outcomes = {}
+    for probability, gold, food, wood, stone, population in day_transitions(
+            state.gold, state.food, state.wood, state.stone, state.population,
+            state.max_population, state.production, event_outcomes=event_outcomes):
+        result = GameState(day, gold, food, wood, stone, population, state.max_population,
+                           population <= 0 or day >= victory_day, state.levels, state.production, state.counts)
+        outcomes[result] = outcomes.get(result, 0.0) + probability
+    return outcomes
+
+
+def final_score(state):
+    """Score of a state, as in SLGGame.final_score"""
+    return (state.gold + state.food + state.wood + state.stone) * state.population
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# SLG Strategy Game - Balance Parameter Sweeps
+
+import argparse
+import hashlib
+import itertools
+import json
+import math
+import os
+import random
+from collections import namedtuple
+
+from slg_buildings import DEFAULT_BUILDINGS, BuildingRegistry
+from slg_core import DEFAULT_BALANCE, SLGGame, stream_seed
+from slg_events import DEFAULT_EVENTS, EventTable
+from slg_io import write_atomic
+from slg_montecarlo import STRATEGIES, StrategyStats
+from slg_sinks import NULL_SINK
+
+CACHE_DIR = '.slg_tuner_cache'
+
+# Bumped whenever the game rules change, so old cached results are not reused
+CACHE_VERSION = 2
+
+# Parameters besides the DEFAULT_BALANCE keys and 'event:<name>' event
+# probabilities: cost_scale multiplies every building cost, cost_growth
+# makes every building's cost grow geometrically per level instead of
+# linearly, and production_step_scale multiplies the production gained
+# per level
+BUILDING_PARAMETERS = ('cost_scale', 'cost_growth', 'production_step_scale')
+INTEGER_PARAMETERS = ('gold', 'food', 'wood', 'stone', 'population', 'max_population', 'victory_day')
+
+SweepResult = namedtuple('SweepResult', 'params stats stopped')
+
+
+def check_parameter(name):
+    if name in DEFAULT_BALANCE or name in BUILDING_PARAMETERS:
+        return
+    if name.startswith('event:') and name[6:] in {spec['name'] for spec in DEFAULT_EVENTS}:
+        return
+    raise ValueError(f"Unknown parameter {name!r}")
+
+
+def build_rules(params):
+    """SLGGame keyword arguments (balance, registry, events) for a parameter point"""
+    balance = {name: round(value) if name in INTEGER_PARAMETERS else value
+               for name, value in params.items() if name in DEFAULT_BALANCE}
+    rules = {'balance': balance}
+
+    if any(name in params for name in BUILDING_PARAMETERS):
+        cost_scale = params.get('cost_scale', 1.0)
+        step_scale = params.get('production_step_scale', 1.0)
+        specs = []
+        for spec in DEFAULT_BUILDINGS:
+            spec = dict(spec, cost={resource: round(amount * cost_scale)
+                                    for resource, amount in spec['cost'].items()},
+                        production_per_level=round(spec['production_per_level'] * step_scale))
+            if 'cost_growth' in params:
+                spec['cost_growth'] = params['cost_growth']
+            specs.append(spec)
+        rules['registry'] = BuildingRegistry(specs)
+
+    events = {name[6:]: value for name, value in params.items() if name.startswith('event:')}
+    if events:
+        rules['events'] = EventTable([dict(spec, probability=events.get(spec['name'], spec['probability']))
+                                      for spec in DEFAULT_EVENTS])
+    return rules
+
+
+def evaluate_batch(params, strategy, first_seed, last_seed, run_seed=0):
+    """Play games [first_seed, last_seed) of a run under a parameter point with a named strategy"""
+    rules = build_rules(params)
+    play = STRATEGIES[strategy]
+    stats = StrategyStats()
+    for index in range(first_seed, last_seed):
+        game = SLGGame(stream_seed(run_seed, index), sink=NULL_SINK, **rules)
+        while not game.game_over:
+            play(game)
+            game.next_day()
+        stats.add(game)
+    return stats
+
+
+def batch_key(params, strategy, first_seed, last_seed, run_seed=0):
+    """Cache key of one batch: a hash of the parameters, strategy and seeds"""
+    text = json.dumps({'version': CACHE_VERSION, 'params': params, 'strategy': strategy,
+                       'seeds': [first_seed, last_seed], 'run_seed': run_seed}, sort_keys=True)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class ResultCache:
+    """Batch results on disk, one JSON file per batch_key"""
+
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), encoding='utf-8') as f:
+                return StrategyStats.from_dict(json.load(f))
+        except FileNotFoundError:
+            return None
+
+    def put(self, key, stats):
+        write_atomic(self._path(key), json.dumps(stats.to_dict()))
+
+
+def parse_range(text):
+    """'name=low:high:steps', 'name=low:high' or 'name=a,b,c' as (name, spec)"""
+    name, _, values = text.partition('=')
+    check_parameter(name)
+    if ':' in values:
+        return name, tuple(float(value) for value in values.split(':'))
+    return name, [float(value) for value in values.split(',')]
+
+
+def grid_points(ranges):
+    """Every combination of the ranges; low:high:steps spans steps evenly spaced values"""
+    axes = []
+    for name, spec in ranges:
+        if isinstance(spec, tuple):
+            low, high, steps = spec if len(spec) == 3 else spec + (2,)
+            steps = int(steps)
+            values = [low + (high - low) * i / (steps - 1) for i in range(steps)] if steps > 1 else [low]
+        else:
+            values = spec
+        axes.append([(name, value) for value in values])
+    return [normalize(dict(point)) for point in itertools.product(*axes)]
+
+
+def random_points(ranges, count, seed=0):
+    """count points drawn uniformly from low:high ranges (or from the listed values)"""
+    rng = random.Random(seed)
+    points = []
+    for _ in range(count):
+        point = {}
+        for name, spec in ranges:
+            point[name] = rng.uniform(spec[0], spec[1]) if isinstance(spec, tuple) else rng.choice(spec)
+        points.append(normalize(point))
+    return points
+
+
+def normalize(params):
+    """Round values the way the rules use them, so equal games share cache entries"""
+    return {name: round(value) if name in INTEGER_PARAMETERS else round(value, 6)
+            for name, value in sorted(params.items())}
+
+
+def clearly_outside(stats, target, tolerance, z=3.0):
+    """True if the win rate's Wilson interval lies entirely outside target +/- tolerance"""
+    n = stats.games
+    if not n:
+        return False
+    p = stats.win_rate
+    denominator = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denominator
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return center + half < target - tolerance or center - half > target + tolerance
+
+
+def sweep(points, strategy='round_robin', games=2000, batch_size=250, first_seed=0, cache=None,
+          workers=None, target=0.7, tolerance=0.1, on_batch=None, run_seed=0):
+    """Evaluate every point on the same games of a run, batch by batch.
+
+    Batches found in the cache are not replayed. After each round of
+    batches, points whose win rate is clearly outside target +/- tolerance
+    stop early. workers=1 plays in-process. on_batch(computed, cached) is
+    called after every round. Returns a SweepResult per point.
+    """
+    results = [StrategyStats() for _ in points]
+    active = list(range(len(points)))
+    stopped = set()
+    executor = None
+    try:
+        for start in range(first_seed, first_seed + games, batch_size):
+            stop = min(start + batch_size, first_seed + games)
+            pending = []
+            cached = 0
+            for index in active:
+                key = batch_key(points[index], strategy, start, stop, run_seed)
+                stats = cache.get(key) if cache is not None else None
+                if stats is None:
+                    pending.append((index, key))
+                else:
+                    results[index].merge(stats)
+                    cached += 1
+
+            if workers == 1:
+                computed = [evaluate_batch(points[index], strategy, start, stop, run_seed)
+                            for index, _ in pending]
+            elif pending:
+                if executor is None:
+                    # Imported here so in-process sweeps skip multiprocessing setup
+                    from concurrent.futures import ProcessPoolExecutor
+                    executor = ProcessPoolExecutor(max_workers=workers)
+                futures = [executor.submit(evaluate_batch, points[index], strategy, start, stop, run_seed)
+                           for index, _ in pending]
+                computed = [future.result() for future in futures]
+            else:
+                computed = []
+            for (index, key), stats in zip(pending, computed):
+                results[index].merge(stats)
+                if cache is not None:
+                    cache.put(key, stats)
+            if on_batch is not None:
+                on_batch(len(computed), cached)
+
+            for index in active:
+                if clearly_outside(results[index], target, tolerance):
+                    stopped.add(index)
+            active = [index for index in active if index not in stopped]
+            if not active:
+                break
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return [SweepResult(point, stats, index in stopped)
+            for index, (point, stats) in enumerate(zip(points, results))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep SLG balance parameters with Monte Carlo batches")
+    parser.add_argument('--param', action='append', required=True, metavar='NAME=RANGE',
+                        help="low:high:steps, low:high (random search) or a,b,c; names are "
+                             f"{', '.join(DEFAULT_BALANCE)}, {', '.join(BUILDING_PARAMETERS)} "
+                             "or event:<event name>")
+    parser.add_argument('--random', type=int, default=None, metavar='N',
+                        help="evaluate N random points instead of the full grid")
+    parser.add_argument('--sample-seed', type=int, default=0)
+    parser.add_argument('--strategy', default='round_robin', choices=sorted(STRATEGIES))
+    parser.add_argument('--games', type=int, default=2000, help="seeds per point")
+    parser.add_argument('--batch-size', type=int, default=250)
+    parser.add_argument('--first-seed', type=int, default=0, help="index of the first game in the run")
+    parser.add_argument('--run-seed', type=int, default=0, help="seed every game's stream is derived from")
+    parser.add_argument('--target', type=float, default=0.7, help="win rate to aim for")
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help="stop points whose win rate is clearly further than this from the target")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--top', type=int, default=10, help="points to show")
+    args = parser.parse_args()
+
+    ranges = [parse_range(text) for text in args.param]
+    points = random_points(ranges, args.random, args.sample_seed) if args.random else grid_points(ranges)
+    counts = {'computed': 0, 'cached': 0}
+
+    def count(computed, cached):
+        counts['computed'] += computed
+        counts['cached'] += cached
+
+    results = sweep(points, args.strategy, args.games, args.batch_size, args.first_seed,
+                    ResultCache(args.cache_dir), args.workers, args.target, args.tolerance, count,
+                    args.run_seed)
+    print(f"{len(points)} points, {counts['computed']} batches played, {counts['cached']} from cache, "
+          f"{sum(result.stopped for result in results)} stopped early")
+    ranked = sorted(results, key=lambda result: (result.stopped, abs(result.stats.win_rate - args.target)))
+    for result in ranked[:args.top]:
+        params = ", ".join(f"{name}={value}" for name, value in result.params.items())
+        flag = "  (stopped early)" if result.stopped else ""
+        print(f"  win {result.stats.win_rate:6.1%}  score {result.stats.mean_score:8.1f}  "
+              f"games {result.stats.games:5}  {params}{flag}")
+
+
+if __name__ == "__main__":
+    main()
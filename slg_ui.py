@@ -1,26 +1,85 @@
 #!/usr/bin/env python3
 # SLG Strategy Game - Graphical UI Version
 
-import tkinter as tk
-from tkinter import ttk, messagebox
-import random
+import queue
+import statistics
+import time
+from collections import deque
+
+from slg_core import SLGGame
+from slg_history import HistoryRecorder
+from slg_planner import Planner
+from slg_sinks import NULL_SINK
+from slg_worker import POLL_SECONDS, SimulationWorker
+
+# tkinter is imported when the first window is created, so headless tools
+# can import this module quickly and on machines without Tk
+tk = ttk = messagebox = None
+
+def load_tk():
+    """Import tkinter on first use"""
+    global tk, ttk, messagebox
+    if tk is None:
+        import tkinter
+        from tkinter import messagebox as tk_messagebox, ttk as tk_ttk
+        tk, ttk, messagebox = tkinter, tk_ttk, tk_messagebox
+    return tk
+
+# Display names of the default buildings; other buildings use their title-cased name
+BUILDING_NAMES = {'farm': '🏠 Farm', 'lumber_mill': '🌲 Lumber Mill',
+                  'mine': '⛏️ Mine', 'quarry': '🗿 Quarry'}
+
+# Lines kept in the event log unless SLGGameUI is given another limit
+LOG_LINES = 200
+
+# Input-to-display latencies kept for the status box
+LATENCY_SAMPLES = 1000
+
+# Fields shown on the history chart and their colors
+CHART_SERIES = (('gold', '#f1c40f'), ('food', '#27ae60'), ('wood', '#8e5a2b'),
+                ('stone', '#7f8c8d'), ('population', '#2980b9'))
+
+def building_title(building):
+    return BUILDING_NAMES.get(building, building.replace('_', ' ').title())
 
 class SLGGameUI:
-    def __init__(self, root):
+    def __init__(self, root, log_lines=LOG_LINES):
+        load_tk()
         self.root = root
         self.root.title("SLG Strategy Game")
-        self.root.geometry("800x600")
+        self.root.geometry("800x760")
         self.root.configure(bg='#2c3e50')
         
-        # Initialize game state
-        self.game = SLGGame()
+        # The game runs on a worker thread and the UI renders its snapshots;
+        # touch self.game itself only while holding self.worker.lock
+        self.history = HistoryRecorder()
+        self.game = self.history.attach(SLGGame(sink=NULL_SINK))
+        self.registry = self.game.registry
+        self.state = self.game.snapshot()
+        self.worker = SimulationWorker(self.game, Planner(budget=0.05))
         
         # Initialize UI element references
         self.building_labels = {}
         
+        # Rendering state: the snapshot on screen, whether a render is
+        # scheduled, and log lines waiting for it (only the newest fit)
+        self.rendered = None
+        self.render_pending = False
+        self.log_lines = log_lines
+        self.pending_log = deque(maxlen=log_lines)
+        self.logged_lines = 0
+        
+        # Submit times of commands whose results are not on screen yet,
+        # and how long past commands took to get there
+        self.pending_inputs = []
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        
         # Create UI elements
         self.create_widgets()
         self.update_display()
+        self.worker.start()
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        self.root.after(int(POLL_SECONDS * 1000), self.poll)
     
     def create_widgets(self):
         # Main frame
@@ -62,16 +121,12 @@ class SLGGameUI:
         buildings_frame.grid(row=3, column=0, columnspan=4, sticky=(tk.W, tk.E), pady=(0, 10))
         
         # Building buttons and labels
-        buildings = ['farm', 'lumber_mill', 'mine', 'quarry']
-        building_names = {'farm': '🏠 Farm', 'lumber_mill': '🌲 Lumber Mill', 
-                         'mine': '⛏️ Mine', 'quarry': '🗿 Quarry'}
-        
         self.building_labels = {}
         self.upgrade_buttons = {}
         
-        for i, building in enumerate(buildings):
+        for i, building in enumerate(self.registry.names):
             # Building info label
-            label = ttk.Label(buildings_frame, text=f"{building_names[building]}: Level 1", 
+            label = ttk.Label(buildings_frame, text=f"{building_title(building)}: Level 1", 
                              font=('Arial', 11))
             label.grid(row=i, column=0, padx=10, pady=5, sticky=tk.W)
             self.building_labels[building] = label
@@ -91,6 +146,14 @@ class SLGGameUI:
                                       command=self.next_day, style='Accent.TButton')
         self.next_day_btn.grid(row=0, column=0, padx=10)
         
+        # Fast-forward days and button
+        self.fast_forward_days = tk.IntVar(value=10)
+        ttk.Spinbox(controls_frame, from_=1, to=30, width=4,
+                    textvariable=self.fast_forward_days).grid(row=1, column=0, padx=10, pady=(10, 0))
+        self.fast_forward_btn = ttk.Button(controls_frame, text="Fast Forward",
+                                           command=self.fast_forward)
+        self.fast_forward_btn.grid(row=1, column=1, padx=10, pady=(10, 0))
+        
         # Status button
         ttk.Button(controls_frame, text="Show Status", 
                   command=self.show_status).grid(row=0, column=1, padx=10)
@@ -99,6 +162,10 @@ class SLGGameUI:
         ttk.Button(controls_frame, text="Help", 
                   command=self.show_help).grid(row=0, column=2, padx=10)
         
+        # Hint button
+        ttk.Button(controls_frame, text="Hint", 
+                  command=self.show_hint).grid(row=0, column=3, padx=10)
+        
         # Event log frame
         self.event_frame = ttk.LabelFrame(main_frame, text="Event Log", padding="10")
         self.event_frame.grid(row=5, column=0, columnspan=4, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(10, 0))
@@ -112,6 +179,14 @@ class SLGGameUI:
         scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
         self.event_text.configure(yscrollcommand=scrollbar.set)
         
+        # History chart, redrawn from the recorder's min/max envelopes
+        history_frame = ttk.LabelFrame(main_frame, text="History", padding="10")
+        history_frame.grid(row=6, column=0, columnspan=4, sticky=(tk.W, tk.E), pady=(10, 0))
+        self.chart = tk.Canvas(history_frame, height=140, bg='white', highlightthickness=0)
+        self.chart.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        history_frame.columnconfigure(0, weight=1)
+        self.chart.bind('<Configure>', lambda event: self.draw_chart())
+        
         # Configure grid weights for resizing
         self.root.columnconfigure(0, weight=1)
         self.root.rowconfigure(0, weight=1)
@@ -121,72 +196,172 @@ class SLGGameUI:
         # Make event log read-only
         self.event_text.config(state=tk.DISABLED)
     
+    def poll(self):
+        """Pick up the worker's updates; the newest state is rendered once"""
+        while True:
+            try:
+                update = self.worker.updates.get_nowait()
+            except queue.Empty:
+                break
+            self.state = update.state
+            for message in update.messages:
+                self.log_event(message)
+            if update.submitted is not None:
+                self.pending_inputs.append(update.submitted)
+            self.update_display()
+        self.root.after(int(POLL_SECONDS * 1000), self.poll)
+    
     def update_display(self):
-        """Update all UI elements with current game state"""
-        # Update day counter
-        self.day_label.config(text=f"Day: {self.game.day}")
+        """Schedule a render; any number of calls before the UI is idle render once"""
+        if not self.render_pending:
+            self.render_pending = True
+            self.root.after_idle(self.render)
+    
+    def render(self):
+        """Reconfigure only the widgets whose game fields changed since the last render"""
+        self.render_pending = False
+        state = self.state
+        changed = state.changes(self.rendered, self.registry)
+        self.rendered = state
+        
+        if 'day' in changed:
+            self.day_label.config(text=f"Day: {state.day}")
+            self.draw_chart()
         
         # Update resources
-        self.gold_label.config(text=f"Gold: {self.game.gold}")
-        self.food_label.config(text=f"Food: {self.game.food}")
-        self.wood_label.config(text=f"Wood: {self.game.wood}")
-        self.stone_label.config(text=f"Stone: {self.game.stone}")
-        self.population_label.config(text=f"Population: {self.game.population}/{self.game.max_population}")
+        if 'gold' in changed:
+            self.gold_label.config(text=f"Gold: {state.gold}")
+        if 'food' in changed:
+            self.food_label.config(text=f"Food: {state.food}")
+        if 'wood' in changed:
+            self.wood_label.config(text=f"Wood: {state.wood}")
+        if 'stone' in changed:
+            self.stone_label.config(text=f"Stone: {state.stone}")
+        if 'population' in changed or 'max_population' in changed:
+            self.population_label.config(text=f"Population: {state.population}/{state.max_population}")
         
         # Update building levels
-        building_names = {'farm': '🏠 Farm', 'lumber_mill': '🌲 Lumber Mill', 
-                         'mine': '⛏️ Mine', 'quarry': '🗿 Quarry'}
+        for i, (building, label) in enumerate(self.building_labels.items()):
+            if building in changed:
+                copies = f" x{state.counts[i]}" if state.counts[i] != 1 else ""
+                label.config(text=f"{building_title(building)}: Level {state.levels[i]}{copies}")
         
-        for building, info in self.game.buildings.items():
-            self.building_labels[building].config(
-                text=f"{building_names[building]}: Level {info['level']}"
-            )
+        if self.pending_log:
+            self.flush_log()
         
-        # Disable next day button if game over
-        if self.game.game_over:
+        if self.pending_inputs:
+            now = time.perf_counter()
+            self.latencies.extend(now - submitted for submitted in self.pending_inputs)
+            self.pending_inputs.clear()
+        
+        # Disable the day buttons and announce the result once the game is over
+        if 'game_over' in changed and state.game_over:
             self.next_day_btn.config(state=tk.DISABLED)
+            self.fast_forward_btn.config(state=tk.DISABLED)
+            self.root.after_idle(self.announce_result)
+    
+    def announce_result(self):
+        if self.state.population <= 0:
+            messagebox.showerror("Game Over", "Your population has perished!")
+        else:
+            messagebox.showinfo("Victory!", f"You survived {self.state.day} days! Congratulations!")
+    
+    def draw_chart(self):
+        """Redraw the history chart; the work depends on the chart width, not the number of days"""
+        chart = self.chart
+        chart.delete('all')
+        width, height = chart.winfo_width(), chart.winfo_height()
+        with self.worker.lock:
+            days = len(self.history)
+        if width < 2 or days < 2:
+            return
+        
+        with self.worker.lock:
+            envelopes = [(color, self.history.envelope(field, width // 2))
+                         for field, color in CHART_SERIES]
+        top = max(high for _, envelope in envelopes for _, _, high in envelope) or 1
+        x_scale = (width - 1) / (days - 1)
+        y_scale = (height - 4) / top
+        for color, envelope in envelopes:
+            # Each bucket draws a vertical stroke from its min to its max
+            points = []
+            for first, low, high in envelope:
+                x = first * x_scale
+                points += [x, height - 2 - low * y_scale, x, height - 2 - high * y_scale]
+            chart.create_line(*points, fill=color)
+        for i, (field, color) in enumerate(CHART_SERIES):
+            chart.create_text(6 + 70 * i, 8, text=field.title(), fill=color, anchor=tk.W,
+                              font=('Arial', 8))
     
     def log_event(self, message):
-        """Add message to event log"""
+        """Queue a message for the event log, which keeps the newest log_lines lines"""
+        self.pending_log.append(f"Day {self.state.day}: {message}\n")
+        self.update_display()
+    
+    def flush_log(self):
+        """Write queued messages, dropping the oldest lines beyond log_lines"""
+        lines = self.pending_log
         self.event_text.config(state=tk.NORMAL)
-        self.event_text.insert(tk.END, f"Day {self.game.day}: {message}\n")
+        text = "".join(lines)
+        self.event_text.insert(tk.END, text)
+        self.logged_lines += text.count("\n")
+        lines.clear()
+        if self.logged_lines > self.log_lines:
+            self.event_text.delete("1.0", f"{self.logged_lines - self.log_lines + 1}.0")
+            self.logged_lines = self.log_lines
         self.event_text.see(tk.END)  # Auto-scroll to bottom
         self.event_text.config(state=tk.DISABLED)
     
     def upgrade_building(self, building_name):
         """Upgrade a building"""
-        if building_name not in self.game.buildings:
+        if building_name not in self.registry.by_name:
             messagebox.showerror("Error", "Invalid building name!")
             return
-        
-        if self.game.upgrade_building(building_name):
-            self.log_event(f"{building_name.title()} upgraded to level {self.game.buildings[building_name]['level']}!")
-            self.update_display()
+        self.worker.submit('upgrade', building_name)
     
     def next_day(self):
         """Advance to next day"""
-        if not self.game.game_over:
-            self.game.next_day()
-            self.update_display()
-            
-            if self.game.game_over:
-                if self.game.population <= 0:
-                    messagebox.showerror("Game Over", "Your population has perished!")
-                else:
-                    messagebox.showinfo("Victory!", "You survived 30 days! Congratulations!")
+        if not self.state.game_over:
+            self.worker.submit('next_day')
+    
+    def fast_forward(self):
+        """Play the chosen number of days on the worker, showing progress as it goes"""
+        try:
+            days = self.fast_forward_days.get()
+        except tk.TclError:
+            messagebox.showerror("Error", "Enter a number of days!")
+            return
+        if not self.state.game_over and days > 0:
+            self.worker.submit('fast_forward', days)
     
     def show_status(self):
         """Show detailed status in a message box"""
-        status_text = f"Day: {self.game.day}\n"
-        status_text += f"Resources - Gold: {self.game.gold}, Food: {self.game.food}, Wood: {self.game.wood}, Stone: {self.game.stone}\n"
-        status_text += f"Population: {self.game.population}/{self.game.max_population}\n\n"
+        state = self.state
+        status_text = f"Day: {state.day}\n"
+        status_text += f"Resources - Gold: {state.gold}, Food: {state.food}, Wood: {state.wood}, Stone: {state.stone}\n"
+        status_text += f"Population: {state.population}/{state.max_population}\n\n"
         status_text += "Buildings:\n"
         
-        for building, info in self.game.buildings.items():
-            status_text += f"  {building.title()}: Level {info['level']}\n"
+        for building, level in zip(self.registry.names, state.levels):
+            status_text += f"  {building.title()}: Level {level}\n"
+        
+        if self.latencies:
+            status_text += (f"\nInput latency: median {statistics.median(self.latencies) * 1000:.1f} ms, "
+                            f"max {max(self.latencies) * 1000:.1f} ms over {len(self.latencies)} inputs\n")
         
         messagebox.showinfo("Game Status", status_text)
     
+    def show_hint(self):
+        """Ask the planner, on the worker thread, for the best action; the hint is logged"""
+        if not self.state.game_over:
+            self.worker.submit('hint')
+    
+    def close(self):
+        """Stop the worker and close the window"""
+        self.worker.submit('cancel')
+        self.worker.stop()
+        self.root.destroy()
+    
     def show_help(self):
         """Show help information"""
         help_text = """SLG Strategy Game - Help
@@ -209,8 +384,10 @@ class SLGGameUI:
 
 ⚡ Commands:
 - Next Day: Advance time
+- Fast Forward: Play several days in a row
 - Upgrade: Improve buildings
 - Show Status: View details
+- Hint: Ask the planner for the best move
 
 💡 Tips:
 - Upgrade farms first to ensure food supply
@@ -219,157 +396,8 @@ class SLGGameUI:
         
         messagebox.showinfo("Game Help", help_text)
 
-class SLGGame:
-    def __init__(self):
-        # Game resources
-        self.gold = 100
-        self.food = 50
-        self.wood = 30
-        self.stone = 20
-        
-        # Buildings
-        self.buildings = {
-            'farm': {'level': 1, 'food_production': 5},
-            'lumber_mill': {'level': 1, 'wood_production': 3},
-            'mine': {'level': 1, 'gold_production': 2},
-            'quarry': {'level': 1, 'stone_production': 2}
-        }
-        
-        # Population
-        self.population = 10
-        self.max_population = 20
-        
-        # Game state
-        self.day = 1
-        self.game_over = False
-    
-    def upgrade_building(self, building_name):
-        """Upgrade a building if resources are sufficient"""
-        if building_name not in self.buildings:
-            return False
-            
-        current_level = self.buildings[building_name]['level']
-        cost_multiplier = current_level * 10
-        
-        costs = {
-            'gold': cost_multiplier * 5,
-            'wood': cost_multiplier * 3,
-            'stone': cost_multiplier * 2
-        }
-        
-        # Check if player has enough resources
-        if (self.gold >= costs['gold'] and 
-            self.wood >= costs['wood'] and 
-            self.stone >= costs['stone']):
-            
-            # Deduct resources
-            self.gold -= costs['gold']
-            self.wood -= costs['wood']
-            self.stone -= costs['stone']
-            
-            # Upgrade building
-            self.buildings[building_name]['level'] += 1
-            
-            # Increase production based on building type
-            if building_name == 'farm':
-                self.buildings[building_name]['food_production'] += 3
-            elif building_name == 'lumber_mill':
-                self.buildings[building_name]['wood_production'] += 2
-            elif building_name == 'mine':
-                self.buildings[building_name]['gold_production'] += 2
-            elif building_name == 'quarry':
-                self.buildings[building_name]['stone_production'] += 1
-            
-            return True
-        else:
-            return False
-    
-    def collect_resources(self):
-        """Collect resources from buildings"""
-        self.food += self.buildings['farm']['food_production']
-        self.wood += self.buildings['lumber_mill']['wood_production']
-        self.gold += self.buildings['mine']['gold_production']
-        self.stone += self.buildings['quarry']['stone_production']
-    
-    def consume_resources(self):
-        """Population consumes food"""
-        food_needed = self.population
-        if self.food >= food_needed:
-            self.food -= food_needed
-            
-            # Chance for population growth if food is sufficient
-            if random.random() < 0.3 and self.population < self.max_population:
-                self.population += 1
-        else:
-            # Starvation
-            starvation = min(food_needed - self.food, self.population)
-            self.population -= starvation
-            self.food = 0
-    
-    def next_day(self):
-        """Advance to the next day"""
-        self.day += 1
-        
-        # Collect resources from buildings
-        self.collect_resources()
-        
-        # Population consumes food
-        self.consume_resources()
-        
-        # Random event
-        self.random_event()
-        
-        # Check game over conditions
-        if self.population <= 0:
-            self.game_over = True
-        elif self.day >= 30:
-            self.game_over = True
-    
-    def random_event(self):
-        """Random events that can occur"""
-        events = [
-            {
-                'name': 'Bountiful Harvest',
-                'probability': 0.2,
-                'effect': lambda: self.food + random.randint(10, 20),
-                'message': "A bountiful harvest provides extra food!"
-            },
-            {
-                'name': 'Bandit Raid',
-                'probability': 0.15,
-                'effect': lambda: self.gold - random.randint(5, 15),
-                'message': "Bandits raided your treasury!"
-            },
-            {
-                'name': 'Trade Opportunity',
-                'probability': 0.1,
-                'effect': lambda: (self.wood + 10, self.gold - 5),
-                'message': "A merchant offers a good trade!"
-            },
-            {
-                'name': 'Plague',
-                'probability': 0.1,
-                'effect': lambda: self.population - random.randint(1, 3),
-                'message': "A plague strikes your population!"
-            }
-        ]
-        
-        for event in events:
-            if random.random() < event['probability']:
-                result = event['effect']()
-                if isinstance(result, tuple):
-                    # Handle multiple resource changes
-                    self.wood, self.gold = result
-                elif event['name'] == 'Bountiful Harvest':
-                    self.food = result
-                elif event['name'] == 'Bandit Raid':
-                    self.gold = max(0, result)
-                elif event['name'] == 'Plague':
-                    self.population = max(1, result)
-                break
-
 def main():
-    root = tk.Tk()
+    root = load_tk().Tk()
     app = SLGGameUI(root)
     root.mainloop()
 
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# SLG Strategy Game - Background Simulation Worker
+
+import argparse
+import queue
+import random
+import statistics
+import threading
+import time
+from collections import namedtuple
+
+from slg_core import SLGGame
+from slg_planner import NEXT_DAY, Planner
+from slg_sinks import NULL_SINK
+
+# What the worker publishes after every command and every fast-forward
+# slice: the game state, log messages, and the perf_counter() time the
+# command was submitted (None for fast-forward progress)
+Update = namedtuple('Update', 'state messages submitted')
+
+# Longest stretch of fast-forwarding between progress updates, in seconds
+SLICE_SECONDS = 1 / 120
+
+# How often the UI (or measure_latency's stand-in for it) polls for updates
+POLL_SECONDS = 0.016
+
+
+class SimulationWorker:
+    """Runs an SLGGame on a background thread, driven by a command queue.
+
+    submit() may be called from any thread. The worker runs commands in
+    order and puts an Update on `updates` after each one. A fast-forward
+    runs in slices of at most SLICE_SECONDS, publishing progress after
+    each and running commands submitted in the meantime, so it delays
+    other input by one slice at most. The worker holds `lock` while it
+    changes the game; other threads hold it to read the game, or a
+    recorder attached to it, consistently.
+
+    Commands: upgrade <building>, next_day, fast_forward <days>, cancel,
+    hint (ask the planner) and status (publish the state unchanged).
+    """
+
+    def __init__(self, game=None, planner=None):
+        self.game = game if game is not None else SLGGame(sink=NULL_SINK)
+        self.planner = planner if planner is not None else Planner(budget=0.05)
+        self.commands = queue.Queue()
+        self.updates = queue.Queue()
+        self.lock = threading.Lock()
+        self.remaining_days = 0
+        self.handlers = {
+            'upgrade': self.upgrade,
+            'next_day': self.next_day,
+            'fast_forward': self.fast_forward,
+            'cancel': self.cancel,
+            'hint': self.hint,
+            'status': lambda: (),
+        }
+        self._thread = threading.Thread(target=self._run, name='slg-worker', daemon=True)
+
+    def start(self):
+        """Start the worker thread; returns the worker"""
+        self._thread.start()
+        return self
+
+    def submit(self, command, *args):
+        """Queue a command for the worker"""
+        self.commands.put((command, args, time.perf_counter()))
+
+    def stop(self):
+        """Finish the queued commands and any fast-forward, then end the worker thread"""
+        self.commands.put(None)
+        self._thread.join()
+
+    def _run(self):
+        commands = self.commands
+        while True:
+            try:
+                item = commands.get(block=not self.remaining_days)
+            except queue.Empty:
+                self._fast_forward_slice()
+                continue
+            if item is None:
+                while self.remaining_days:
+                    self._fast_forward_slice()
+                return
+            command, args, submitted = item
+            messages = self.handlers[command](*args)
+            self.updates.put(Update(self.game.snapshot(), tuple(messages), submitted))
+
+    def _fast_forward_slice(self):
+        game = self.game
+        deadline = time.perf_counter() + SLICE_SECONDS
+        with self.lock:
+            while self.remaining_days and not game.game_over:
+                game.next_day()
+                self.remaining_days -= 1
+                if time.perf_counter() >= deadline:
+                    break
+        messages = ()
+        if game.game_over or not self.remaining_days:
+            self.remaining_days = 0
+            messages = (f"Fast-forwarded to day {game.day}",)
+        self.updates.put(Update(game.snapshot(), messages, None))
+
+    def upgrade(self, building_name):
+        with self.lock:
+            if not self.game.upgrade_building(building_name):
+                return ()
+        level = self.game.buildings[building_name]['level']
+        return (f"{building_name.title()} upgraded to level {level}!",)
+
+    def next_day(self):
+        if not self.game.game_over:
+            with self.lock:
+                self.game.next_day()
+        return ()
+
+    def fast_forward(self, days):
+        if self.game.game_over:
+            return ()
+        self.remaining_days = max(0, int(days))
+        return (f"Fast-forwarding {self.remaining_days} days...",)
+
+    def cancel(self):
+        self.remaining_days = 0
+        return ()
+
+    def hint(self):
+        if self.game.game_over:
+            return ()
+        action = self.planner.choose(self.game.snapshot(), self.game.victory_day)
+        if action == NEXT_DAY:
+            return ("Hint: advance to the next day",)
+        return (f"Hint: upgrade the {action.replace('_', ' ').title()}",)
+
+
+def measure_latency(probes=200, load_threads=1, poll=POLL_SECONDS, seed=0):
+    """Input-to-display latencies in seconds, with load_threads threads playing games meanwhile.
+
+    The calling thread stands in for the Tk loop: it drains the updates
+    every poll seconds and submits one command per poll at a random moment
+    in between, as user input would arrive; a command's latency
+    runs from submit() until the poll that picks up its Update. Probes
+    alternate status, next_day and fast_forward commands, restarting the
+    game whenever it ends.
+    """
+    stop = threading.Event()
+
+    def load():
+        game_seed = 0
+        while not stop.is_set():
+            game = SLGGame(game_seed, sink=NULL_SINK)
+            while not game.game_over:
+                game.upgrade_building('farm')
+                game.next_day()
+            game_seed += 1
+    loaders = [threading.Thread(target=load, daemon=True) for _ in range(load_threads)]
+    for thread in loaders:
+        thread.start()
+
+    rng = random.Random(seed)
+    latencies = []
+
+    def drain(worker, now):
+        while True:
+            try:
+                update = worker.updates.get_nowait()
+            except queue.Empty:
+                return
+            if update.submitted is not None:
+                latencies.append(now - update.submitted)
+
+    worker = SimulationWorker(SLGGame(seed, sink=NULL_SINK)).start()
+    try:
+        commands = (('status',), ('next_day',), ('fast_forward', 10))
+        for probe in range(probes):
+            wait = rng.uniform(0, poll)
+            time.sleep(wait)
+            worker.submit(*commands[probe % len(commands)])
+            time.sleep(poll - wait)
+            drain(worker, time.perf_counter())
+            if worker.game.game_over:
+                worker.stop()
+                drain(worker, time.perf_counter())
+                seed += 1
+                worker = SimulationWorker(SLGGame(seed, sink=NULL_SINK)).start()
+    finally:
+        worker.stop()
+        drain(worker, time.perf_counter())
+        stop.set()
+        for thread in loaders:
+            thread.join()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure input-to-display latency of the simulation worker")
+    parser.add_argument('--probes', type=int, default=200)
+    parser.add_argument('--load-threads', type=int, nargs='*', default=[0, 1, 4],
+                        help="numbers of busy game-playing threads to measure under")
+    args = parser.parse_args()
+    for load_threads in args.load_threads:
+        latencies = sorted(measure_latency(args.probes, load_threads))
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        print(f"{load_threads} load threads: median {statistics.median(latencies) * 1000:5.1f} ms, "
+              f"p95 {p95 * 1000:5.1f} ms, max {latencies[-1] * 1000:5.1f} ms "
+              f"({POLL_SECONDS * 1000:.0f} ms poll interval)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# SLG Strategy Game - Multi-Settlement World with Trade
+
+import argparse
+import itertools
+import os
+import time
+from collections import deque, namedtuple
+
+from slg_buildings import DEFAULT_BUILDINGS, RESOURCES, BuildingRegistry
+from slg_core import SLGGame, stream_seed
+from slg_montecarlo import STRATEGIES
+from slg_sinks import NULL_SINK
+
+# Trading rules. A settlement offers part of its largest stock for its
+# smallest, keeping FOOD_RESERVE_DAYS of food for its population; offers
+# are for up to TRADE_LIMIT units and anything under MIN_TRADE is not
+# worth a caravan. Unlike the Trade Opportunity event's merchant, the
+# other side of every trade is another settlement, one for one.
+FOOD_RESERVE_DAYS = 3
+TRADE_LIMIT = 50
+MIN_TRADE = 5
+FOOD = RESOURCES.index('food')
+
+# Settlement i specializes in DEFAULT_BUILDINGS[i % 4] and starts with
+# this many copies of it, so neighbours have different surpluses to trade
+SPECIALTY_COPIES = 3
+SPECIALTY_REGISTRIES = [BuildingRegistry([dict(spec, count=SPECIALTY_COPIES) if index == specialty else spec
+                                          for index, spec in enumerate(DEFAULT_BUILDINGS)])
+                        for specialty in range(len(DEFAULT_BUILDINGS))]
+
+# Resource cycles trades can clear along, shortest first: (a, b) swaps a
+# for b between two settlements, (a, b, c) passes a for b, b for c and
+# c for a around three
+CYCLES = [cycle for length in range(2, len(RESOURCES) + 1)
+          for cycle in itertools.permutations(range(len(RESOURCES)), length) if cycle[0] == min(cycle)]
+
+# An offer to give `amount` of RESOURCES[give] for as much of RESOURCES[want];
+# a fill is the part of an offer that was matched
+Offer = namedtuple('Offer', 'settlement give want amount')
+Fill = namedtuple('Fill', 'settlement give want amount')
+
+# What a shard reports after advancing a day
+ShardReport = namedtuple('ShardReport', 'offers live population seconds')
+
+# What World.tick() reports: per-shard compute seconds and round-trip
+# seconds, the whole tick's seconds, the offers filled for the next day
+# and the settlements still playing
+TickReport = namedtuple('TickReport', 'day shard_seconds shard_latency seconds trades live')
+
+
+def trade_offer(settlement, index):
+    """The offer a settlement makes at the end of a day, or None"""
+    stocks = (settlement.food, settlement.wood, settlement.gold, settlement.stone)
+    spare = list(stocks)
+    spare[FOOD] -= settlement.population * FOOD_RESERVE_DAYS
+    give = max(range(len(spare)), key=spare.__getitem__)
+    want = min(range(len(stocks)), key=stocks.__getitem__)
+    amount = min(TRADE_LIMIT, (spare[give] - stocks[want]) // 2)
+    if give == want or amount < MIN_TRADE:
+        return None
+    return Offer(index, give, want, amount)
+
+
+def match_offers(offers):
+    """Clear offers along resource cycles; returns one fill per offer that traded.
+
+    Each cycle moves the same amount along every edge, so every resource
+    given is received by someone else. Offers on an edge are filled in
+    settlement order, so the result depends only on the offers, not on
+    how settlements are spread over shards.
+    """
+    book = {}
+    for offer in sorted(offers):
+        book.setdefault((offer.give, offer.want), deque()).append([offer.settlement, offer.amount])
+    totals = {edge: sum(amount for _, amount in queue) for edge, queue in book.items()}
+
+    filled = {}
+    for cycle in CYCLES:
+        edges = list(zip(cycle, cycle[1:] + cycle[:1]))
+        flow = min(totals.get(edge, 0) for edge in edges)
+        if not flow:
+            continue
+        for edge in edges:
+            totals[edge] -= flow
+            queue = book[edge]
+            left = flow
+            while left:
+                head = queue[0]
+                amount = min(head[1], left)
+                key = (head[0],) + edge
+                filled[key] = filled.get(key, 0) + amount
+                head[1] -= amount
+                left -= amount
+                if not head[1]:
+                    queue.popleft()
+    return [Fill(*key, amount) for key, amount in sorted(filled.items())]
+
+
+class Shard:
+    """A contiguous range of settlements, advanced one day at a time.
+
+    Settlement i plays stream_seed(world_seed, i) with its specialty's
+    buildings and the world's upgrade strategy; finished settlements stay
+    as they ended and stop trading.
+    """
+
+    def __init__(self, world_seed, first, last, strategy='round_robin'):
+        self.first = first
+        self.settlements = [SLGGame(stream_seed(world_seed, index), sink=NULL_SINK,
+                                    registry=SPECIALTY_REGISTRIES[index % len(SPECIALTY_REGISTRIES)])
+                            for index in range(first, last)]
+        self.strategy = STRATEGIES[strategy]
+
+    def tick(self, fills):
+        """Apply yesterday's fills, play one day everywhere and collect new offers"""
+        start = time.perf_counter()
+        settlements = self.settlements
+        first = self.first
+        for settlement, give, want, amount in fills:
+            game = settlements[settlement - first]
+            setattr(game, RESOURCES[give], getattr(game, RESOURCES[give]) - amount)
+            setattr(game, RESOURCES[want], getattr(game, RESOURCES[want]) + amount)
+
+        strategy = self.strategy
+        offers = []
+        live = population = 0
+        for index, game in enumerate(settlements, first):
+            if game.game_over:
+                population += game.population
+                continue
+            strategy(game)
+            game.next_day()
+            population += game.population
+            if not game.game_over:
+                live += 1
+                offer = trade_offer(game, index)
+                if offer is not None:
+                    offers.append(offer)
+        return ShardReport(offers, live, population, time.perf_counter() - start)
+
+
+def run_shard(connection, world_seed, first, last, strategy):
+    """Shard process: tick on every batch of fills received, until None arrives"""
+    shard = Shard(world_seed, first, last, strategy)
+    connection.send(None)
+    while True:
+        fills = connection.recv()
+        if fills is None:
+            break
+        connection.send(shard.tick(fills))
+    connection.close()
+
+
+def shard_ranges(settlements, shards):
+    """Split settlement indices into shards contiguous ranges of near-equal size"""
+    return [(settlements * shard // shards, settlements * (shard + 1) // shards)
+            for shard in range(shards)]
+
+
+class World:
+    """Tens of thousands of settlements, sharded over worker processes.
+
+    Each tick sends every shard its batch of fills, waits for all shards to
+    play the day, then matches the offers they return. Trades matched on
+    day d are applied at the start of day d + 1, so shards never talk to
+    each other and a world plays the same for any number of shards.
+    processes=False ticks the shards in this process instead.
+    """
+
+    def __init__(self, settlements, shards=None, seed=0, strategy='round_robin', processes=True):
+        self.shards = shards or os.cpu_count() or 1
+        self.ranges = shard_ranges(settlements, self.shards)
+        self.day = 1
+        self.fills = []
+        self.reports = []
+        self.population = 0  # as of the last tick
+        self.local = None
+        self.connections = []
+        self.processes = []
+        if not processes:
+            self.local = [Shard(seed, first, last, strategy) for first, last in self.ranges]
+            return
+
+        # Imported here so in-process worlds skip multiprocessing setup
+        import multiprocessing
+        for first, last in self.ranges:
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=run_shard, args=(child, seed, first, last, strategy),
+                                              daemon=True)
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+        for connection in self.connections:
+            connection.recv()  # the shard has built its settlements
+
+    def _batches(self):
+        batches = [[] for _ in self.ranges]
+        shard = 0
+        for fill in sorted(self.fills):
+            while fill.settlement >= self.ranges[shard][1]:
+                shard += 1
+            batches[shard].append(fill)
+        return batches
+
+    def tick(self):
+        """Advance every settlement one day; returns a TickReport"""
+        start = time.perf_counter()
+        batches = self._batches()
+        if self.local is not None:
+            reports, latency = [], []
+            for shard, fills in zip(self.local, batches):
+                sent = time.perf_counter()
+                reports.append(shard.tick(fills))
+                latency.append(time.perf_counter() - sent)
+        else:
+            sent = time.perf_counter()
+            for connection, fills in zip(self.connections, batches):
+                connection.send(fills)
+            reports, latency = [], []
+            for connection in self.connections:
+                reports.append(connection.recv())
+                latency.append(time.perf_counter() - sent)
+
+        self.fills = match_offers([offer for report in reports for offer in report.offers])
+        self.day += 1
+        report = TickReport(self.day, [report.seconds for report in reports], latency,
+                            time.perf_counter() - start, len(self.fills),
+                            sum(report.live for report in reports))
+        self.reports.append(report)
+        self.population = sum(report.population for report in reports)
+        return report
+
+    def close(self):
+        """Stop the shard processes"""
+        for connection in self.connections:
+            connection.send(None)
+            connection.close()
+        for process in self.processes:
+            process.join()
+        self.connections = []
+        self.processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a multi-settlement SLG world with trade")
+    parser.add_argument('--settlements', type=int, default=20000)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--shards', type=int, default=None, help="shard processes (default: all cores)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--strategy', default='round_robin', choices=sorted(STRATEGIES))
+    parser.add_argument('--in-process', action='store_true', help="tick the shards in this process")
+    args = parser.parse_args()
+
+    with World(args.settlements, args.shards, args.seed, args.strategy, not args.in_process) as world:
+        for _ in range(args.days - 1):
+            report = world.tick()
+            slowest = max(report.shard_latency)
+            print(f"Day {report.day:3}: {report.seconds * 1000:8.1f} ms, slowest shard "
+                  f"{slowest * 1000:7.1f} ms, {report.trades:6,} trades, {report.live:7,} settlements playing")
+        print(f"\n{args.settlements:,} settlements in {world.shards} shards, population {world.population:,}")
+        for shard, (first, last) in enumerate(world.ranges):
+            seconds = [report.shard_seconds[shard] for report in world.reports]
+            latency = [report.shard_latency[shard] for report in world.reports]
+            print(f"  shard {shard} [{first}, {last}): compute mean {sum(seconds) / len(seconds) * 1000:.1f} ms, "
+                  f"tick latency mean {sum(latency) / len(latency) * 1000:.1f} ms, max {max(latency) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# Test script for the SLG game engine
+
+import io
+import json
+import random
+import subprocess
+import sys
+from contextlib import redirect_stdout
+
+from slg import SLGGame, parse_command, run_script, spawn_seeds, stream_seed
+from slg_sinks import NULL_SINK, DaysSkipped, InvalidCommand, ListSink, StatusShown, render_text
+
+
+def play(game):
+    with redirect_stdout(io.StringIO()):
+        while not game.game_over:
+            game.upgrade_building('farm')
+            game.next_day()
+    return (game.day, game.gold, game.food, game.wood, game.stone, game.population)
+
+
+def test_same_seed_replays_exactly():
+    """A game is reproduced exactly from its seed"""
+    assert play(SLGGame(seed=42)) == play(SLGGame(seed=42))
+
+
+def test_games_do_not_touch_global_random():
+    """Playing a game leaves the module-level RNG alone"""
+    random.seed(1)
+    expected = random.random()
+    random.seed(1)
+    play(SLGGame(seed=3))
+    assert random.random() == expected
+
+
+def test_child_streams_are_independent_and_jumpable():
+    """Child streams are distinct and can be addressed directly"""
+    seeds = spawn_seeds(7, 100)
+    assert len(set(seeds)) == 100
+    assert spawn_seeds(7, 10, start=50) == seeds[50:60]
+    assert stream_seed(7, 3) == seeds[3]
+    assert stream_seed(7, 3, 0) != stream_seed(7, 3)
+    results = {play(SLGGame(seed)) for seed in seeds[:20]}
+    assert len(results) > 1
+
+
+def test_front_ends_share_one_headless_engine():
+    """slg and slg_ui use the core SLGGame, and importing them needs no tkinter"""
+    check = ("import sys, slg, slg_core, slg_ui; "
+             "assert slg.SLGGame is slg_ui.SLGGame is slg_core.SLGGame; "
+             "assert 'tkinter' not in sys.modules")
+    subprocess.run([sys.executable, '-c', check], check=True)
+
+
+def affordable(game, building):
+    info = game.buildings[building]
+    food, wood, gold, stone = game.registry.by_name[building].upgrade_cost(info['level'], info['count'])
+    return game.food >= food and game.wood >= wood and game.gold >= gold and game.stone >= stone
+
+
+def test_skip_days_plays_the_same_days_quietly():
+    """Skipping is next_day without the per-day records"""
+    for seed in range(50):
+        skipped, stepped = SLGGame(seed, sink=ListSink()), SLGGame(seed, sink=NULL_SINK)
+        assert skipped.skip_days(12) == 12
+        for _ in range(12):
+            stepped.next_day()
+        assert skipped.snapshot() == stepped.snapshot()
+        assert skipped.rng.getstate() == stepped.rng.getstate()
+        assert skipped.sink.records == [DaysSkipped(13, 12)]
+
+
+def test_skip_until_upgrade_stops_on_first_affordable_day():
+    """The skip lands exactly where pressing next would first allow the upgrade"""
+    for seed in range(100):
+        for building in ('farm', 'lumber_mill', 'mine', 'quarry'):
+            skipped, stepped = SLGGame(seed, sink=NULL_SINK), SLGGame(seed, sink=NULL_SINK)
+            for game in (skipped, stepped):
+                game.upgrade_building(building)
+            skipped.skip_until_upgrade(building)
+            while not stepped.game_over and not affordable(stepped, building):
+                stepped.next_day()
+            assert skipped.snapshot() == stepped.snapshot()
+            assert affordable(skipped, building) or skipped.game_over
+
+
+def test_commands_parse_with_repeats():
+    assert parse_command("  Next x25 ") == ('next_day', None, 25)
+    assert parse_command("upgrade farm x3") == ('upgrade_building', 'farm', 3)
+    assert parse_command("skip until upgrade mine") == ('skip_until_upgrade', 'mine', 1)
+    assert parse_command("skip 4 x2") == ('skip_days', 4, 2)
+    assert parse_command("skip soon") == ('invalid', 'skip soon', 1)
+    assert parse_command("status now") == ('invalid', 'status now', 1)
+
+
+def test_script_plays_like_direct_calls():
+    """A script runs the same calls in order and stops when the game ends"""
+    scripted, direct = SLGGame(4, sink=ListSink()), SLGGame(4, sink=ListSink())
+    executed = run_script(scripted, ["# opening", "upgrade farm x2", "", "next x5", "bogus", "status",
+                                     "skip 3", "next x100", "next"])
+    direct.upgrade_building('farm')
+    direct.upgrade_building('farm')
+    for _ in range(5):
+        direct.next_day()
+    direct.sink.records += [InvalidCommand(6, 'bogus'), direct.status_record()]
+    direct.skip_days(3)
+    while not direct.game_over:
+        direct.next_day()
+    assert scripted.sink.records == direct.sink.records
+    assert executed == 2 + 5 + 2 + 1 + (direct.day - 9)
+
+
+def test_script_does_nothing_once_the_game_is_over():
+    game = SLGGame(4, sink=NULL_SINK)
+    game.skip_days(30)
+    before = game.snapshot()
+    game.set_sink(ListSink())
+    assert run_script(game, ["status", "upgrade farm", "bogus", "next x3"]) == 0
+    assert game.sink.records == [] and game.snapshot() == before
+
+
+def test_status_record_renders_like_display_status():
+    game = SLGGame(1, sink=NULL_SINK)
+    game.build_building('farm')
+    output = io.StringIO()
+    with redirect_stdout(output):
+        game.display_status()
+    record = game.status_record()
+    assert isinstance(record, StatusShown)
+    assert output.getvalue() == render_text(record) + "\n"
+
+
+def test_script_mode_streams_json_lines():
+    result = subprocess.run([sys.executable, 'slg.py', '--script', '-', '--json', '--seed', '2'],
+                            input="upgrade farm\nnext x30\nstatus\n", capture_output=True, text=True, check=True)
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert records[0]['type'] == 'BuildingUpgraded'
+    assert records[-1]['type'] == 'GameOver' and records[-1]['day'] == 30
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# Test script for the SLG batch simulator
+
+import io
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from slg import SLGGame
+from slg_batch import BatchSLGGame, BUILDINGS
+from slg_events import EventTable
+from slg_sinks import NULL_SINK
+
+
+def test_collect_and_upgrade_match_scalar():
+    """Collection and upgrade costs match SLGGame exactly"""
+    batch = BatchSLGGame(3, seed=1)
+    game = SLGGame()
+    with redirect_stdout(io.StringIO()):
+        batch.gold[:] = game.gold = 1000
+        batch.wood[:] = game.wood = 1000
+        batch.stone[:] = game.stone = 1000
+        for building in BUILDINGS:
+            upgraded = batch.upgrade_building(building)
+            assert upgraded.all()
+            assert game.upgrade_building(building)
+        batch.collect_resources(batch.active)
+        game.collect_resources()
+
+    for field in ('gold', 'food', 'wood', 'stone'):
+        assert (getattr(batch, field) == getattr(game, field)).all()
+    for column, building in enumerate(BUILDINGS):
+        assert (batch.levels[:, column] == game.buildings[building]['level']).all()
+
+
+def test_upgrade_respects_cost_and_mask():
+    """Only affordable, selected games are upgraded"""
+    batch = BatchSLGGame(3, seed=1)
+    batch.gold[1] = 0
+    upgraded = batch.upgrade_building('farm', mask=np.array([True, True, False]))
+    assert upgraded.tolist() == [True, False, False]
+    assert batch.levels[:, 0].tolist() == [2, 1, 1]
+    assert batch.production[:, 0].tolist() == [8, 5, 5]
+
+
+def test_starvation_matches_scalar():
+    """Starvation removes the unfed population and empties the granary"""
+    batch = BatchSLGGame(1, seed=1)
+    game = SLGGame()
+    batch.food[:] = game.food = 4
+    with redirect_stdout(io.StringIO()):
+        batch.consume_resources(batch.active)
+        game.consume_resources()
+    assert batch.food[0] == game.food == 0
+    assert batch.population[0] == game.population == 4
+
+
+def test_game_over_and_finished_games_are_frozen():
+    """Games end at day 30 or when the population perishes"""
+    batch = BatchSLGGame(1000, seed=7)
+    batch.run()
+    assert batch.game_over.all()
+    assert (batch.day <= 30).all()
+    assert (batch.day[batch.victory] == 30).all()
+
+    before = batch.day.copy()
+    assert batch.next_day() == 0
+    assert (batch.day == before).all()
+
+
+def test_non_default_balance_matches_scalar():
+    """Starting resources, growth chance and victory day come from the balance in both engines"""
+    balance = {'gold': 400, 'food': 90, 'wood': 300, 'stone': 200, 'population': 6,
+               'max_population': 9, 'growth_chance': 1.0, 'victory_day': 12}
+    no_events = EventTable([])
+    batch = BatchSLGGame(2, seed=1, events=no_events, balance=balance)
+    game = SLGGame(seed=1, events=no_events, sink=NULL_SINK, balance=balance)
+    while not game.game_over:
+        for building in BUILDINGS:
+            assert batch.upgrade_building(building).tolist() == [game.upgrade_building(building)] * 2
+        game.next_day()
+        batch.next_day()
+        for field in ('day', 'gold', 'food', 'wood', 'stone', 'population'):
+            assert (getattr(batch, field) == getattr(game, field)).all(), field
+        for column, building in enumerate(BUILDINGS):
+            assert (batch.levels[:, column] == game.buildings[building]['level']).all()
+    assert batch.game_over.all() and batch.victory.all() and game.day == 12
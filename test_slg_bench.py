@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+# Test script for the SLG benchmark suite
+
+from slg_bench import METRICS, compare, environment, mismatched_environment, run_benchmarks
+
+
+def test_compare_flags_only_large_regressions():
+    """Throughput must not drop, memory and import time must not grow, beyond the threshold"""
+    baseline = {'games_per_second': 1000.0, 'bytes_per_game': 4000.0, 'import_slg_ms': 20.0}
+    results = {'games_per_second': 850.0, 'bytes_per_game': 5200.0, 'import_slg_ms': 10.0}
+    regressions = compare(results, baseline, threshold=0.25)
+    assert [(name, round(change, 2)) for name, _, _, change in regressions] == [('bytes_per_game', 0.3)]
+    assert compare(results, {}, threshold=0.25) == []
+
+
+def test_baseline_from_another_machine_is_not_comparable():
+    """Absolute numbers only gate when python and machine match the baseline's"""
+    here = dict(environment(), metrics={})
+    assert mismatched_environment(here, dict(here)) == []
+    elsewhere = dict(here, python='2.7.18', machine='arm64')
+    assert mismatched_environment(here, elsewhere) == ['python', 'machine']
+    assert mismatched_environment(here, {}) == ['python', 'machine']
+
+
+def test_quick_run_reports_every_metric():
+    """A scaled-down run measures every metric"""
+    results = run_benchmarks(scale=0.01)
+    assert set(results) == set(METRICS)
+    assert all(value > 0 for value in results.values())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# Test script for the SLG building registry
+
+import json
+
+import pytest
+
+from slg_buildings import BUILDING_REGISTRY, DEFAULT_BUILDINGS, RESOURCES, BuildingRegistry
+from slg_core import SLGGame
+from slg_sinks import NULL_SINK
+from slg_state import GameState
+
+
+def mod_registry(types=300):
+    """Many building types spread over every resource, some with geometric costs"""
+    return BuildingRegistry([
+        {'name': f'building_{i}', 'resource': RESOURCES[i % len(RESOURCES)], 'production': 1 + i % 3,
+         'production_per_level': 1, 'cost': {'gold': 10, 'food': i % 2}, 'count': i % 3,
+         'cost_growth': 1.5 if i % 5 == 0 else None}
+        for i in range(types)])
+
+
+def brute_force_vector(game):
+    totals = [0] * len(RESOURCES)
+    for building in game.registry.types:
+        info = game.buildings[building.name]
+        totals[building.resource_index] += building.production(info['level']) * info['count']
+    return totals
+
+
+def test_default_registry_keeps_classic_rules():
+    """Default costs and production match the original hard-coded game"""
+    farm = BUILDING_REGISTRY.by_name['farm']
+    assert farm.upgrade_cost(3) == (0, 90, 150, 60)
+    assert [building.production(2) for building in BUILDING_REGISTRY.types] == [8, 5, 4, 3]
+    game = SLGGame(seed=1, sink=NULL_SINK)
+    assert game.buildings['farm'] == {'level': 1, 'count': 1, 'food_production': 5}
+    assert game.production == [5, 3, 2, 2]
+
+
+def test_production_vector_tracks_builds_and_upgrades():
+    """The cached vector always equals the sum over every building copy"""
+    game = SLGGame(seed=4, sink=NULL_SINK, registry=mod_registry())
+    game.gold = game.food = 10 ** 9
+    assert game.production == brute_force_vector(game)
+    for i in range(2000):
+        name = f'building_{i * 7 % 300}'
+        if i % 3:
+            assert game.upgrade_building(name)
+        else:
+            assert game.build_building(name)
+        if i % 50 == 0:
+            game.next_day()
+    assert game.production == brute_force_vector(game)
+
+    state = game.snapshot()
+    fresh = SLGGame(sink=NULL_SINK, registry=game.registry)
+    fresh.restore(GameState.unpack(state.pack()))
+    assert fresh.snapshot() == state and fresh.production == game.production
+
+
+def test_costs_and_counts():
+    """Upgrades are charged per copy; builds add a copy at the current level"""
+    game = SLGGame(seed=2, sink=NULL_SINK)
+    game.gold, game.wood, game.stone = 1000, 1000, 1000
+    assert game.build_building('farm')
+    assert game.buildings['farm'] == {'level': 1, 'count': 2, 'food_production': 10}
+    assert game.upgrade_building('farm')
+    assert (game.gold, game.wood, game.stone) == (1000 - 50 - 100, 1000 - 30 - 60, 1000 - 20 - 40)
+    assert game.buildings['farm']['food_production'] == 16 and game.production[0] == 16
+    assert not game.build_building('castle') and not game.upgrade_building('castle')
+
+
+def test_registry_from_file_and_validation(tmp_path):
+    """Definitions load from JSON and bad definitions are rejected"""
+    path = tmp_path / 'buildings.json'
+    path.write_text(json.dumps(DEFAULT_BUILDINGS))
+    assert BuildingRegistry.from_file(str(path)).names == BUILDING_REGISTRY.names
+    with pytest.raises(ValueError):
+        BuildingRegistry([{'name': 'well', 'resource': 'water', 'production': 1}])
+    with pytest.raises(ValueError):
+        BuildingRegistry([{'name': 'farm', 'resource': 'food', 'production': 1, 'cost': {'mana': 1}}])
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# Test script for the SLG vectorized environment
+
+import numpy as np
+
+from slg_core import SLGGame
+from slg_env import ACTIONS, NEXT_DAY, OBSERVATION_FIELDS, SLGVectorEnv
+from slg_sinks import NULL_SINK
+
+
+def test_action_mask_follows_upgrade_cost_rule():
+    """A masked-in upgrade is exactly one that SLGGame.upgrade_building accepts"""
+    env = SLGVectorEnv(500)
+    env.reset(seed=3)
+    rng = np.random.default_rng(3)
+    games = env.games
+    for field in ('gold', 'wood', 'stone'):
+        getattr(games, field)[:] = rng.integers(0, 400, env.n_envs)
+    games.levels[:] = rng.integers(1, 5, (env.n_envs, NEXT_DAY))
+    env._observe()
+
+    for row in range(env.n_envs):
+        for column, building in enumerate(ACTIONS[:NEXT_DAY]):
+            game = SLGGame(sink=NULL_SINK)
+            game.gold, game.wood, game.stone = int(games.gold[row]), int(games.wood[row]), int(games.stone[row])
+            game.buildings[building]['level'] = int(games.levels[row, column])
+            assert env.action_mask[row, column] == game.upgrade_building(building)
+    assert env.action_mask[:, NEXT_DAY].all()
+
+
+def test_episodes_reward_final_score_and_reset():
+    """Sparse rewards pay the final score once; finished games restart on the next step"""
+    env = SLGVectorEnv(64)
+    observations, _ = env.reset(seed=1)
+    assert observations.shape == (64, len(OBSERVATION_FIELDS)) and (observations[:, 0] == 1).all()
+
+    # Upgrade the farm when it is legal, otherwise advance the day
+    steps = 0
+    while not env.terminated.any():
+        _, rewards, terminated, truncated, _ = env.step(np.where(env.action_mask[:, 0], 0, NEXT_DAY))
+        scores = env.games.final_scores()
+        assert (rewards[~terminated] == 0).all()
+        assert (rewards[terminated] == scores[terminated]).all()
+        assert not truncated.any()
+        steps += 1
+    assert 29 <= steps < 60 and (env.games.levels[:, 0] > 1).all()
+
+    finished = env.terminated.copy()
+    observations, rewards, *_ = env.step(np.full(64, NEXT_DAY))
+    assert (observations[finished, 0] == 1).all() and (rewards[finished] == 0).all()
+
+
+def test_dense_rewards_sum_to_score_gain():
+    """Dense rewards telescope to final score minus starting score"""
+    env = SLGVectorEnv(32, dense=True)
+    env.reset(seed=5)
+    start = env.games.final_scores().copy()
+    total = np.zeros(32)
+    done = np.zeros(32, dtype=bool)
+    final = np.zeros(32)
+    while not done.all():
+        _, rewards, terminated, _, _ = env.step(np.full(32, NEXT_DAY))
+        total += np.where(done, 0, rewards)
+        final = np.where(terminated & ~done, env.games.final_scores(), final)
+        done |= terminated
+    assert np.allclose(total, final - start)
+
+
+def test_illegal_upgrades_are_no_ops_and_truncate():
+    """Unaffordable upgrades change nothing; endless no-ops are truncated"""
+    env = SLGVectorEnv(4, max_episode_steps=10)
+    env.reset(seed=0)
+    env.games.gold[:] = 0
+    env._observe()
+    before = env.observations.copy()
+    for step in range(10):
+        observations, _, terminated, truncated, _ = env.step(np.zeros(4, dtype=np.int64))
+        assert (observations == before).all() and not terminated.any()
+    assert truncated.all()
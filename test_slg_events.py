@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# Test script for the SLG event table
+
+import json
+import random
+
+import pytest
+
+from slg import SLGGame
+from slg_events import DEFAULT_EVENTS, EVENT_TABLE, EventTable
+
+
+def test_thresholds_keep_sequential_probabilities():
+    """One draw reproduces the try-each-event-in-turn probabilities"""
+    chances = [event.chance for event in EVENT_TABLE.events]
+    assert chances == pytest.approx([0.2, 0.8 * 0.15, 0.8 * 0.85 * 0.1, 0.8 * 0.85 * 0.9 * 0.1])
+    assert EVENT_TABLE.no_event_chance == pytest.approx(0.8 * 0.85 * 0.9 * 0.9)
+    assert sum(p for p, _ in EVENT_TABLE.outcomes) == pytest.approx(1.0)
+    assert EVENT_TABLE.pick(0.0).name == 'Bountiful Harvest'
+    assert EVENT_TABLE.pick(0.25).name == 'Bandit Raid'
+    assert EVENT_TABLE.pick(0.99) is None
+
+
+def test_effects_respect_floors():
+    """Raids never push gold below zero and plague leaves one survivor"""
+    game = SLGGame(seed=0)
+    game.gold, game.population = 3, 2
+    EVENT_TABLE.apply(EVENT_TABLE.by_name['Bandit Raid'], game, random.Random(0))
+    EVENT_TABLE.apply(EVENT_TABLE.by_name['Plague'], game, random.Random(0))
+    assert game.gold == 0 and game.population == 1
+
+    EVENT_TABLE.apply(EVENT_TABLE.by_name['Trade Opportunity'], game, random.Random(0))
+    assert game.gold == -5 and game.wood == 40
+
+
+def test_load_from_json(tmp_path):
+    """A table loaded from JSON behaves like the built-in one"""
+    path = tmp_path / 'events.json'
+    path.write_text(json.dumps(DEFAULT_EVENTS))
+    table = EventTable.from_file(str(path))
+    assert table.thresholds == EVENT_TABLE.thresholds
+    assert SLGGame(events=table).events is table
+
+
+def test_invalid_events_are_rejected():
+    with pytest.raises(ValueError):
+        EventTable([{'name': 'Flood', 'probability': 0.1, 'effects': [{'field': 'mana', 'min': 1, 'max': 2}]}])
+    with pytest.raises(ValueError):
+        EventTable([{'name': 'Flood', 'probability': 1.5}])
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# Test script for the SLG exact outcome distribution engine
+
+import pytest
+
+from slg_core import SLGGame
+from slg_exact import ExactnessError, StrategyPolicy, exact_distribution
+from slg_montecarlo import farm_first, no_upgrades, round_robin
+from slg_sinks import NULL_SINK
+
+
+def test_probability_mass_is_conserved():
+    """Wins, deaths and pruned mass add up to one"""
+    result = exact_distribution(StrategyPolicy(no_upgrades), epsilon=1e-4, victory_day=8, max_pruned=1.0)
+    total = result.win_probability + sum(result.death_days.values()) + result.pruned_probability
+    assert abs(total - 1.0) < 1e-9
+    assert result.peak_states == max(result.states_per_day)
+    assert result.states_per_day[0] == 1
+
+
+def test_pruning_past_the_tolerance_raises():
+    with pytest.raises(ExactnessError):
+        exact_distribution(StrategyPolicy(no_upgrades), epsilon=1e-4, victory_day=8)
+
+
+def test_short_games_match_monte_carlo():
+    """Win probability and mean score agree with sampled games to within sampling error"""
+    victory_day, games = 5, 3000
+    result = exact_distribution(StrategyPolicy(round_robin), victory_day=victory_day)
+    assert result.pruned_probability == 0.0
+    wins, scores = 0, []
+    for seed in range(games):
+        game = SLGGame(seed, sink=NULL_SINK, balance={'victory_day': victory_day})
+        while not game.game_over:
+            round_robin(game)
+            game.next_day()
+        wins += game.population > 0
+        scores.append(game.final_score())
+    p = result.win_probability
+    assert abs(wins / games - p) <= 4 * (p * (1 - p) / games) ** 0.5 + 1e-9
+    assert abs(sum(scores) / games - result.expected_score) < 4 * (result.score_variance / games) ** 0.5
+
+
+def test_policy_upgrades_are_applied():
+    """A strategy policy returns the state after its upgrades"""
+    policy = StrategyPolicy(farm_first)
+    state = policy.game.snapshot()
+    upgraded = policy(state)
+    assert upgraded.levels[0] == state.levels[0] + 1
+    assert upgraded.gold == state.gold - 50
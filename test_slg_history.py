@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# Test script for the SLG per-day history recorder
+
+import csv
+import os
+import random
+import tempfile
+
+import numpy as np
+
+from slg_core import SLGGame
+from slg_history import STATE_FIELDS, HistoryRecorder, MinMaxPyramid
+from slg_sinks import NULL_SINK
+
+
+def play(game):
+    while not game.game_over:
+        game.upgrade_building('farm')
+        game.next_day()
+    return game.snapshot()
+
+
+def test_records_one_row_per_day():
+    """One row for the start and one per day played, matching the game, without changing play"""
+    history = HistoryRecorder()
+    game = history.attach(SLGGame(3, sink=NULL_SINK))
+    rows = [(game.day, game.gold, game.food)]
+    while not game.game_over:
+        game.upgrade_building('farm')
+        game.next_day()
+        rows.append((game.day, game.gold, game.food))
+
+    assert game.snapshot() == play(SLGGame(3, sink=NULL_SINK))
+    assert len(history) == len(rows) == game.day
+    assert list(zip(history.column('day'), history.column('gold'), history.column('food'))) == rows
+    assert history.fields == STATE_FIELDS + ('farm_level', 'lumber_mill_level', 'mine_level', 'quarry_level')
+    assert history.column('farm_level')[-1] == game.buildings['farm']['level']
+
+
+def test_skipped_days_are_recorded():
+    history = HistoryRecorder()
+    game = history.attach(SLGGame(5, sink=NULL_SINK))
+    game.skip_days(10)
+    assert list(history.column('day')) == list(range(1, 12))
+
+
+def test_envelope_matches_brute_force():
+    """Every bucket holds the exact min and max of the values it covers"""
+    rng = random.Random(0)
+    for n in (1, 2, 3, 7, 64, 100, 1000, 4097):
+        pyramid = MinMaxPyramid()
+        values = [rng.randrange(-1000, 1000) for _ in range(n)]
+        for value in values:
+            pyramid.append(value)
+        for buckets in (1, 5, 64, 5000):
+            envelope = pyramid.envelope(buckets)
+            assert len(envelope) <= buckets + 1
+            assert envelope[0][0] == 0
+            bounds = [first for first, _, _ in envelope] + [n]
+            for (first, low, high), end in zip(envelope, bounds[1:]):
+                assert first < end
+                assert (low, high) == (min(values[first:end]), max(values[first:end]))
+
+
+def test_export_csv_and_npz():
+    history = HistoryRecorder()
+    play(history.attach(SLGGame(7, sink=NULL_SINK)))
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, 'history.csv')
+        history.to_csv(csv_path)
+        with open(csv_path, newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+        assert tuple(rows[0]) == history.fields
+        assert [int(row[1]) for row in rows[1:]] == list(history.column('gold'))
+
+        npz_path = os.path.join(directory, 'history.npz')
+        history.to_npz(npz_path)
+        with np.load(npz_path) as data:
+            assert set(data.files) == set(history.fields)
+            assert data['population'].tolist() == list(history.column('population'))
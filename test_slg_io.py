@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+# Test script for the shared SLG file helpers
+
+import os
+
+import pytest
+
+from slg_io import write_atomic
+
+
+def test_write_atomic_replaces_text_and_bytes(tmp_path):
+    path = tmp_path / "state.json"
+    write_atomic(str(path), "old")
+    write_atomic(str(path), "new ✓")
+    assert path.read_text(encoding='utf-8') == "new ✓"
+    write_atomic(str(path), b"\x00\x01", fsync=True)
+    assert path.read_bytes() == b"\x00\x01"
+    assert os.listdir(tmp_path) == ["state.json"]
+
+
+def test_failed_write_keeps_the_old_file(tmp_path):
+    """A write that fails part way leaves the old contents and no temporary file"""
+    path = tmp_path / "state.json"
+    write_atomic(str(path), "old")
+    with pytest.raises(TypeError):
+        write_atomic(str(path), 42)
+    assert path.read_text(encoding='utf-8') == "old"
+    assert os.listdir(tmp_path) == ["state.json"]
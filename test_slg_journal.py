@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# Test script for the SLG command journal
+
+import io
+import os
+from contextlib import redirect_stdout
+
+import pytest
+
+from slg import SLGGame
+from slg_buildings import BuildingRegistry, DEFAULT_BUILDINGS
+from slg_journal import JournalError, JournaledGame
+
+
+def play(game, days):
+    with redirect_stdout(io.StringIO()):
+        for _ in range(days):
+            game.upgrade_building('farm')
+            game.upgrade_building('mine')
+            game.next_day()
+
+
+def test_recovery_continues_the_same_game(tmp_path):
+    """A recovered game is in the same state and keeps the same RNG stream"""
+    reference = SLGGame(seed=11)
+    play(reference, 40)
+
+    journaled = JournaledGame(str(tmp_path), seed=11, snapshot_every=7, background=False)
+    play(journaled, 25)
+    journaled.close()
+
+    recovered = JournaledGame(str(tmp_path), snapshot_every=7, background=False)
+    assert recovered.commands == journaled.commands
+    play(recovered, 15)
+    recovered.close()
+    assert recovered.game.snapshot() == reference.snapshot()
+
+
+def test_compaction_keeps_only_latest_segment(tmp_path):
+    journaled = JournaledGame(str(tmp_path), seed=3, snapshot_every=5)
+    play(journaled, 30)
+    journaled.close()
+    names = sorted(os.listdir(tmp_path))
+    assert [name.split('-')[0] for name in names] == ['journal', 'snapshot']
+
+
+def test_torn_record_is_dropped(tmp_path):
+    """A half-written trailing record is truncated on recovery"""
+    journaled = JournaledGame(str(tmp_path), seed=5, snapshot_every=1000, background=False)
+    play(journaled, 3)
+    expected = journaled.game.snapshot()
+    journaled.close()
+    segment = next(path for path in tmp_path.iterdir() if path.name.startswith('journal'))
+    with open(segment, 'ab') as f:
+        f.write(b'\x00\x03\x01')
+
+    recovered = JournaledGame(str(tmp_path), background=False)
+    assert recovered.game.snapshot() == expected
+    assert recovered.commands == journaled.commands
+    recovered.close()
+
+
+def play_every_command(game):
+    with redirect_stdout(io.StringIO()):
+        game.build_building('farm')
+        game.skip_days(3)
+        game.skip_until_upgrade('mine')
+        game.upgrade_building('mine')
+        game.next_day()
+        game.skip_until_upgrade('quarry')
+
+
+def test_every_state_changing_command_is_journaled(tmp_path):
+    reference = SLGGame(seed=9)
+    play_every_command(reference)
+
+    journaled = JournaledGame(str(tmp_path), seed=9, background=False)
+    play_every_command(journaled)
+    journaled.close()
+    assert journaled.commands == 6
+
+    recovered = JournaledGame(str(tmp_path), background=False)
+    assert recovered.commands == 6
+    assert recovered.game.snapshot() == reference.snapshot()
+    assert recovered.game.rng.getstate() == reference.rng.getstate()
+    recovered.close()
+
+
+def test_recovery_needs_the_same_buildings(tmp_path):
+    JournaledGame(str(tmp_path), seed=1, background=False).close()
+    registry = BuildingRegistry(DEFAULT_BUILDINGS[:2])
+    with pytest.raises(JournalError):
+        JournaledGame(str(tmp_path), background=False, registry=registry)
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# Test script for the SLG Monte Carlo strategy evaluator
+
+from slg_core import SLGGame, stream_seed
+from slg_montecarlo import StrategyStats, evaluate_strategy, farm_first, play_game, round_robin
+from slg_sinks import NULL_SINK
+
+
+def test_results_do_not_depend_on_worker_count():
+    """Merged aggregates are identical for any sharding of the seeds"""
+    serial = evaluate_strategy(round_robin, 0, 200, workers=1, shard_size=200)
+    sharded = evaluate_strategy(round_robin, 0, 200, workers=1, shard_size=7)
+    pooled = evaluate_strategy(round_robin, 0, 200, workers=3, shard_size=13)
+    assert serial == sharded == pooled
+    assert serial.games == 200
+
+
+def test_games_play_streams_of_the_run_seed():
+    """Game i of a run is seeded with stream_seed(run_seed, i), not with i itself"""
+    game = SLGGame(stream_seed(7, 3), sink=NULL_SINK)
+    while not game.game_over:
+        round_robin(game)
+        game.next_day()
+    assert play_game(round_robin, 3, run_seed=7).snapshot() == game.snapshot()
+    first_run = evaluate_strategy(round_robin, 0, 50, workers=1, run_seed=1)
+    assert first_run != evaluate_strategy(round_robin, 0, 50, workers=1, run_seed=2)
+
+
+def test_aggregates_are_consistent():
+    """Wins plus deaths cover every game"""
+    stats = evaluate_strategy(farm_first, 100, 300, workers=1)
+    assert stats.wins + sum(stats.death_days.values()) == stats.games
+    assert 0.0 <= stats.win_rate <= 1.0
+    assert stats.score_variance >= 0.0
+    assert all(2 <= day <= 30 for day in stats.death_days)
+
+
+def test_empty_stats():
+    stats = StrategyStats()
+    assert stats.win_rate == stats.mean_score == stats.score_variance == 0.0
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# Test script for the SLG expectimax planner
+
+import io
+from contextlib import redirect_stdout
+
+from slg import SLGGame
+from slg_planner import ACTIONS, NEXT_DAY, Planner
+from slg_state import BUILDINGS, GameState, next_day_outcomes, upgrade_state
+
+
+def test_outcomes_form_a_distribution():
+    """next_day outcomes cover every draw exactly once"""
+    state = SLGGame().snapshot()
+    outcomes = next_day_outcomes(state)
+    assert abs(sum(outcomes.values()) - 1.0) < 1e-12
+    assert all(outcome.day == state.day + 1 for outcome in outcomes)
+
+
+def test_upgrade_state_matches_game():
+    """State-level upgrades follow SLGGame.upgrade_building"""
+    game = SLGGame()
+    game.gold = game.wood = game.stone = 500
+    for index, building in enumerate(BUILDINGS):
+        expected = upgrade_state(game.snapshot(), index)
+        with redirect_stdout(io.StringIO()):
+            assert game.upgrade_building(building)
+        assert game.snapshot() == expected
+    game.gold = 0
+    assert upgrade_state(game.snapshot(), 0) is None
+
+
+def test_choose_searches_a_full_day_within_ten_ms():
+    """Decisions are legal, reach depth 1 at the default budget and the table stays bounded"""
+    planner = Planner(budget=0.01, table_size=500)
+    action = planner.choose(SLGGame().snapshot())
+    assert action in ACTIONS
+    assert planner.last_depth >= 1
+    assert len(planner.table) <= 500
+
+
+def test_one_day_of_search_expands_few_nodes():
+    """Mean event outcomes keep a day of search to a handful of expanded nodes"""
+    planner = Planner(budget=60.0, max_depth=1)
+    planner.choose(SLGGame().snapshot())
+    assert planner.last_depth == 1
+    assert 0 < planner.misses <= 20 and planner.hits == 0
+
+
+def test_last_day_upgrade_is_never_chosen():
+    """Spending resources on the final day only lowers the score"""
+    state = GameState(29, 1000, 100, 1000, 1000, 15, 20, False, (1, 1, 1, 1), (5, 3, 2, 2))
+    assert Planner().choose(state) == NEXT_DAY
+
+
+def test_search_stops_at_the_deadline_on_rich_states():
+    """With the budget spent, choose stops at the first node it would expand"""
+    state = GameState(3, 100000, 5000, 100000, 100000, 15, 20, False, (1, 1, 1, 1), (5, 3, 2, 2))
+    planner = Planner(budget=0.0)
+    assert planner.choose(state) in ACTIONS
+    assert planner.last_depth == 0 and planner.misses == 1
+
+
+def test_victory_day_comes_from_the_game():
+    """A shorter game ends the search, and the last-day rule, earlier"""
+    state = GameState(9, 1000, 100, 1000, 1000, 15, 20, False, (1, 1, 1, 1), (5, 3, 2, 2))
+    planner = Planner(budget=60.0)
+    assert planner.choose(state, victory_day=10) == NEXT_DAY
+    assert planner.last_depth == 1 and planner.victory_day == 10
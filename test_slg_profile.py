@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# Test script for the SLG per-phase profiler
+
+import os
+import tempfile
+
+from slg_core import SLGGame
+from slg_profile import PHASES, PhaseProfiler
+from slg_sinks import BuildingUpgraded, EventTriggered, ListSink, Starvation
+
+
+def play(game):
+    while not game.game_over:
+        game.upgrade_building('farm')
+        game.next_day()
+    return game.snapshot()
+
+
+def test_counters_match_game_records():
+    """Counters agree with the records the games emit, and play is unchanged"""
+    profiler = PhaseProfiler()
+    records = []
+    for seed in range(20):
+        sink = ListSink()
+        assert play(profiler.attach(SLGGame(seed, sink=sink))) == play(SLGGame(seed, sink=ListSink()))
+        records += sink.records
+
+    snapshot = profiler.snapshot()
+    days = sum(1 for record in records if type(record).__name__ == 'ResourcesCollected')
+    assert snapshot['days'] == days
+    assert all(snapshot['phases'][phase]['calls'] == days for phase in PHASES)
+    assert all(snapshot['phases'][phase]['seconds'] > 0 for phase in PHASES)
+    assert snapshot['events'] == {name: sum(1 for r in records if isinstance(r, EventTriggered) and r.name == name)
+                                  for name in snapshot['events']}
+    assert sum(snapshot['events'].values()) == sum(isinstance(r, EventTriggered) for r in records)
+    assert snapshot['starvation_deaths'] == sum(r.deaths for r in records if isinstance(r, Starvation))
+    assert snapshot['upgrades_attempted'] == days
+    assert snapshot['upgrades_succeeded'] == sum(isinstance(r, BuildingUpgraded) for r in records)
+
+
+def test_detach_and_prometheus_dump():
+    """Detached games stop counting; metrics are written as Prometheus text"""
+    profiler = PhaseProfiler()
+    game = profiler.attach(SLGGame(1, sink=ListSink()))
+    game.next_day()
+    profiler.detach(game)
+    game.next_day()
+    assert profiler.snapshot()['days'] == 1
+    assert 'next_day' not in vars(game) and 'collect_resources' not in vars(game)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'slg.prom')
+        profiler.write_prometheus(path)
+        with open(path, encoding='utf-8') as f:
+            text = f.read()
+    assert '# TYPE slg_phase_seconds_total counter' in text
+    assert 'slg_phase_calls_total{phase="random_event"} 1\n' in text
+    assert 'slg_upgrades_attempted_total 0\n' in text
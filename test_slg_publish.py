@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# Test script for the SLG live state publisher
+
+import asyncio
+import json
+
+from slg_core import SLGGame
+from slg_montecarlo import round_robin
+from slg_publish import PublishServer, StatePublisher, apply_message, measure_bytes
+from slg_sinks import NULL_SINK
+
+
+def test_deltas_rebuild_the_full_state():
+    """A client applying every delta always holds the same state as a full snapshot"""
+    game = SLGGame(5, sink=NULL_SINK)
+    publisher = StatePublisher(game, snapshot_every=10)
+    client, since = {}, None
+    while not game.game_over:
+        since, text = publisher.message(since)
+        message = json.loads(text)
+        assert ('full' in message) == (since == 1 or since % 10 == 0)
+        full = apply_message({}, json.loads(publisher.message(None)[1]))
+        assert apply_message(client, message) == full
+        round_robin(game)
+        game.next_day()
+        publisher.publish()
+
+    assert publisher.publish() == publisher.publish() == since + 1
+    assert 'full' in json.loads(publisher.message(since - publisher.history)[1])
+
+
+def test_deltas_are_smaller_than_full_states():
+    deltas, fulls = measure_bytes(seed=1)
+    assert len(deltas) == 30
+    assert sum(deltas) < sum(fulls) / 2
+
+
+async def stream_game():
+    server = await PublishServer(SLGGame(2, sink=NULL_SINK), port=0, tick=0).start()
+    reader, writer = await asyncio.open_connection(server.host, server.port)
+    writer.write(b"GET /events HTTP/1.1\r\nLast-Event-ID: 99\r\n\r\n")
+    assert (await reader.readline()).startswith(b"HTTP/1.1 200")
+    await reader.readuntil(b"\r\n\r\n")
+    first = await reader.readuntil(b"\n\n")
+
+    _, command = await asyncio.open_connection(server.host, server.port)
+    command.write(b"POST /command HTTP/1.1\r\nContent-Length: 4\r\n\r\nnext")
+    second = await reader.readuntil(b"\n\n")
+    writer.close()
+    command.close()
+    await server.close()
+    return first.decode(), second.decode()
+
+
+def test_server_streams_deltas_as_server_sent_events():
+    first, second = asyncio.run(stream_game())
+    assert first.startswith("id: 1\ndata: ") and '"full":1' in first
+    assert second.startswith("id: 2\ndata: ")
+    message = json.loads(second.split("data: ", 1)[1])
+    assert message['day'] == 2 and 'full' not in message
+
+
+async def command_after_game_over():
+    game = SLGGame(2, sink=NULL_SINK)
+    game.skip_days(30)
+    server = await PublishServer(game, port=0, tick=0).start()
+    reader, writer = await asyncio.open_connection(server.host, server.port)
+    writer.write(b"POST /command HTTP/1.1\r\nContent-Length: 4\r\n\r\nnext")
+    status = await reader.readline()
+    writer.close()
+    await server.close()
+    return status, game.day
+
+
+def test_commands_are_refused_once_the_game_is_over():
+    status, day = asyncio.run(command_after_game_over())
+    assert status.startswith(b"HTTP/1.1 409")
+    assert day == 30
+
+
+async def waiters(server, wanted):
+    """Streams waiting on the server's changed condition, once wanted(count) or after a second"""
+    for _ in range(100):
+        if wanted(len(server.changed._waiters)):
+            break
+        await asyncio.sleep(0.01)
+    return len(server.changed._waiters)
+
+
+async def disconnect_stream():
+    server = await PublishServer(SLGGame(2, sink=NULL_SINK), port=0, tick=0).start()
+    reader, writer = await asyncio.open_connection(server.host, server.port)
+    writer.write(b"GET /events HTTP/1.1\r\n\r\n")
+    await reader.readuntil(b"\r\n\r\n")
+    await reader.readuntil(b"\n\n")
+    waiting = await waiters(server, lambda count: count > 0)
+    writer.close()
+    left = await waiters(server, lambda count: count == 0)
+    await server.close()
+    return waiting, left
+
+
+def test_disconnected_streams_stop_waiting():
+    waiting, left = asyncio.run(disconnect_stream())
+    assert (waiting, left) == (1, 0)
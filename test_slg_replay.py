@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+# Test script for SLG recording and replay
+
+import json
+
+from slg_replay import generate_recordings, replay, replay_directory
+
+
+def test_recordings_replay_cleanly(tmp_path):
+    generate_recordings(str(tmp_path), 30)
+    results, rate = replay_directory(str(tmp_path), workers=2, batch_size=7)
+    assert len(results) == 30 and rate > 0
+    assert all(result.ok and result.days == 29 for result in results)
+
+
+def test_first_divergent_day_is_reported(tmp_path):
+    """Tampering with one day's state is caught on exactly that day"""
+    generate_recordings(str(tmp_path), 1, first_seed=4)
+    path = next(tmp_path.iterdir())
+    recording = json.loads(path.read_text())
+    recording['states'][9][1] += 1  # gold after the 10th next_day
+    result = replay(recording, str(path))
+    assert not result.ok
+    assert result.divergent_day == recording['states'][9][0] == 11
+    assert result.expected[1] == result.actual[1] + 1
+
+
+def test_building_counts_are_compared(tmp_path):
+    generate_recordings(str(tmp_path), 1, first_seed=4)
+    path = next(tmp_path.iterdir())
+    recording = json.loads(path.read_text())
+    recording['states'][4][-1][0] += 1  # farm copies after the 5th next_day
+    result = replay(recording, str(path))
+    assert result.divergent_day == recording['states'][4][0]
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# Test script for the SLG multi-session server
+
+import asyncio
+import io
+
+from slg_core import SLGGame
+from slg_loadgen import PROMPT_LINE
+from slg_replay import RecordingGame, replay_directory
+from slg_server import Session, SLGServer
+from slg_sinks import TextSink
+
+
+async def read_response(reader):
+    lines = []
+    while True:
+        line = await reader.readline()
+        if line in (PROMPT_LINE, b''):
+            return b''.join(lines).decode()
+        lines.append(line)
+
+
+async def play_session():
+    server = await SLGServer(port=0).start()
+    reader, writer = await asyncio.open_connection(server.host, server.port)
+    assert "SLG GAME COMMANDS" in await read_response(reader)
+
+    writer.write(b"status\nupgrade farm\nnext\nbogus\n")
+    responses = [await read_response(reader) for _ in range(4)]
+    assert "=== Day 1 ===" in responses[0]
+    assert "Farm upgraded to level 2!" in responses[1]
+    assert "=== Day 2 ===" in responses[2]
+    assert "Invalid command" in responses[3]
+    assert len(server.sessions) == 1 and server.memory_bytes > 0
+
+    writer.write(b"quit\n")
+    assert "Thanks for playing!" in await read_response(reader)
+    assert await reader.read() == b''
+    writer.close()
+    await server.close()
+    return server
+
+
+def test_commands_take_repeats_like_the_cli():
+    buffer = io.StringIO()
+    game = SLGGame(3, sink=TextSink(buffer))
+    output, keep_open = SLGServer.execute(game, "next x4", buffer)
+    assert keep_open and game.day == 5 and buffer.getvalue() == ""
+    assert output.count("=== Day") == 1 and "=== Day 5 ===" in output
+    output, keep_open = SLGServer.execute(game, "next x100", buffer)
+    assert not keep_open and game.day == 30 and "VICTORY" in output
+
+
+async def idle_session():
+    server = await SLGServer(port=0, idle_timeout=0.1).start()
+    reader, writer = await asyncio.open_connection(server.host, server.port)
+    await read_response(reader)
+    assert await asyncio.wait_for(reader.read(), 2.0) == b''
+    writer.close()
+    await server.close()
+    return server
+
+
+def test_commands_mirror_cli(capsys):
+    """Each command gets the CLI's output followed by a prompt, and none of it goes to stdout"""
+    server = asyncio.run(play_session())
+    assert capsys.readouterr().out == ""
+    assert server.commands == 5
+    assert not server.sessions
+
+
+def test_idle_sessions_are_evicted():
+    """The sweeper closes sessions that stay silent past the timeout"""
+    server = asyncio.run(idle_session())
+    assert server.evicted == 1
+
+
+async def recorded_session(record_dir):
+    server = await SLGServer(port=0, record_dir=record_dir).start()
+    reader, writer = await asyncio.open_connection(server.host, server.port)
+    await read_response(reader)
+    writer.write(b"upgrade farm\nnext\nnext\nquit\n")
+    for _ in range(4):
+        await read_response(reader)
+    writer.close()
+    await server.close()
+
+
+def test_sessions_are_recorded_for_replay(tmp_path):
+    """Finished sessions are saved and replay without divergence"""
+    asyncio.run(recorded_session(str(tmp_path)))
+    results, _ = replay_directory(str(tmp_path), workers=1)
+    assert len(results) == 1 and results[0].ok and results[0].days == 2
+
+
+def test_session_memory_counts_the_recording():
+    """A recorded session is measured as it grows, not once when it opens"""
+    session = Session(1, None, seed=5)
+    session.game = RecordingGame(5, session.game)
+    opened = session.memory
+    SLGServer.execute(session.game, "next x10", session.output)
+    assert session.memory > opened + 10 * 100
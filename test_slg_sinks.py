@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# Test script for SLG game records and sinks
+
+import io
+import json
+from contextlib import redirect_stdout
+
+from slg import SLGGame
+from slg_sinks import (NULL_SINK, BuildingUpgraded, GameOver, JsonLinesSink, ListSink,
+                       ResourcesCollected, TextSink)
+
+
+def play(game):
+    game.upgrade_building('castle')
+    while not game.game_over:
+        game.upgrade_building('farm')
+        game.next_day()
+    game.sink.flush()
+    return game
+
+
+def test_default_sink_prints_cli_text():
+    output = io.StringIO()
+    with redirect_stdout(output):
+        play(SLGGame(seed=2))
+    text = output.getvalue()
+    assert text.startswith("Invalid building name!\nFarm upgraded to level 2!\n")
+    assert "\nResources collected for the day!\n" in text
+    assert "🎉 VICTORY! You survived 30 days!" in text and "=== FINAL SCORE ===" in text
+
+
+def test_victory_text_uses_the_games_length():
+    game = SLGGame(seed=2, balance={'victory_day': 12})
+    output = io.StringIO()
+    with redirect_stdout(output):
+        game.skip_days(20)
+    assert "🎉 VICTORY! You survived 12 days!" in output.getvalue()
+
+
+def test_buffered_text_matches_unbuffered():
+    direct = io.StringIO()
+    with redirect_stdout(direct):
+        play(SLGGame(seed=8))
+    buffered = io.StringIO()
+    game = play(SLGGame(seed=8, sink=TextSink(buffered, buffered=True)))
+    assert buffered.getvalue() == direct.getvalue()
+    assert not game.sink.lines
+
+
+def test_typed_records_and_json_lines():
+    records = play(SLGGame(seed=3, sink=ListSink())).sink.records
+    assert isinstance(records[1], BuildingUpgraded) and records[1].level == 2
+    assert sum(isinstance(r, ResourcesCollected) for r in records) == 29
+    assert isinstance(records[-1], GameOver) and records[-1].victory
+
+    stream = io.StringIO()
+    play(SLGGame(seed=3, sink=JsonLinesSink(stream, batch_size=16)))
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line['type'] for line in lines] == [type(r).__name__ for r in records]
+
+
+def test_null_sink_is_silent():
+    output = io.StringIO()
+    with redirect_stdout(output):
+        game = play(SLGGame(seed=2, sink=NULL_SINK))
+    assert output.getvalue() == "" and game.emit is None
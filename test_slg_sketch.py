@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# Test script for the SLG streaming score distributions
+
+import bisect
+import os
+import random
+import tempfile
+
+from slg_core import SLGGame
+from slg_sinks import NULL_SINK
+from slg_sketch import GameAggregator, KLLSketch, Moments, aggregate_games
+
+
+def test_sketch_ranks_stay_close_with_bounded_size():
+    rng = random.Random(1)
+    values = [rng.expovariate(1.0) for _ in range(200000)]
+    halves = KLLSketch(seed=1), KLLSketch(seed=2)
+    for i, value in enumerate(values):
+        halves[i % 2].add(value)
+    sketch = halves[0].merge(halves[1])
+    values.sort()
+    assert sketch.count == len(values)
+    assert sketch.size < 3 * sketch.k + 2 * len(sketch.levels)
+    for fraction in (0.01, 0.5, 0.9, 0.99):
+        rank = bisect.bisect_left(values, sketch.quantile(fraction)) / len(values)
+        assert abs(rank - fraction) < 0.02
+
+
+def test_moments_merge_exactly():
+    values = [3, 1, 4, 1, 5, 9, 2, 6]
+    whole, left, right = Moments(), Moments(), Moments()
+    for value in values:
+        whole.add(value)
+    for value in values[:3]:
+        left.add(value)
+    for value in values[3:]:
+        right.add(value)
+    left.merge(right)
+    assert (left.count, left.min, left.max) == (8, 1, 9)
+    assert abs(left.mean - whole.mean) < 1e-12 and abs(left.variance - whole.variance) < 1e-9
+
+
+def test_aggregator_records_games_as_they_end_and_round_trips():
+    aggregator = GameAggregator()
+    scores = []
+    for seed in range(50):
+        game = aggregator.attach(SLGGame(seed, sink=NULL_SINK))
+        while not game.game_over:
+            game.upgrade_building('farm')
+            game.next_day()
+        scores.append(game.final_score())
+        game.next_day()  # playing on after the end is not counted twice
+    assert len(aggregator) == 50
+    assert aggregator.moments['score'].max == max(scores)
+    assert aggregator.quantiles('score', [0.0, 0.5])[0] == min(scores)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'scores.json')
+        aggregator.save(path)
+        loaded = GameAggregator.load(path)
+    assert loaded.to_dict() == aggregator.to_dict()
+    assert len(loaded.merge(aggregator)) == 100
+
+
+def test_pooled_aggregation_matches_in_process():
+    pooled = aggregate_games('round_robin', 0, 400, workers=2, shard_size=100)
+    local = aggregate_games('round_robin', 0, 400, workers=1, shard_size=100)
+    assert pooled.to_dict() == local.to_dict()
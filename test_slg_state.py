@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# Test script for the compact SLG game state
+
+import io
+import pickle
+from contextlib import redirect_stdout
+
+import slg
+from slg_state import GameState
+
+
+def advance(game, days):
+    with redirect_stdout(io.StringIO()):
+        for _ in range(days):
+            game.upgrade_building('farm')
+            game.next_day()
+
+
+def test_snapshot_restore_round_trip():
+    """Restoring a snapshot undoes any later play"""
+    game = slg.SLGGame(seed=5)
+    advance(game, 3)
+    state = game.snapshot()
+    advance(game, 10)
+    assert game.snapshot() != state
+    game.restore(state)
+    assert game.snapshot() == state
+    assert game.buildings['farm']['level'] == state.levels[0]
+
+
+def test_states_are_hashable_keys():
+    """Equal states compare and hash equal"""
+    a = slg.SLGGame(seed=1).snapshot()
+    b = slg.SLGGame(seed=2).snapshot()
+    assert a == b and hash(a) == hash(b)
+    assert len({a: 1, b: 2}) == 1
+
+
+def test_binary_record_and_pickle():
+    """States pack into a fixed-size record and survive pickling"""
+    game = slg.SLGGame(seed=9)
+    advance(game, 5)
+    state = game.snapshot()
+    record = state.pack()
+    assert len(record) == GameState.RECORD.size == 160
+    assert GameState.unpack(record) == state
+    assert pickle.loads(pickle.dumps(state)) == state
+
+
+def test_changes_reports_changed_fields():
+    """Only the fields an action touched are reported as changed"""
+    game = slg.SLGGame(seed=4)
+    state = game.snapshot()
+    assert state.changes(None) == set(GameState.FIELDS) | set(game.buildings)
+
+    game.gold = game.wood = game.stone = 1000
+    state = game.snapshot()
+    with redirect_stdout(io.StringIO()):
+        game.upgrade_building('mine')
+    upgraded = game.snapshot()
+    assert upgraded.changes(state) == {'gold', 'wood', 'stone', 'mine'}
+    assert game.snapshot().changes(upgraded) == set()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# Test script for the SLG balance tuner
+
+import tempfile
+
+from slg_core import SLGGame
+from slg_sinks import NULL_SINK
+from slg_tuner import ResultCache, build_rules, grid_points, sweep
+
+
+def test_rules_apply_every_parameter():
+    rules = build_rules({'gold': 60.4, 'growth_chance': 0.5, 'victory_day': 20, 'cost_scale': 2.0,
+                         'production_step_scale': 2.0, 'event:Plague': 0.9})
+    game = SLGGame(1, sink=NULL_SINK, **rules)
+    assert (game.gold, game.growth_chance, game.victory_day) == (60, 0.5, 20)
+    farm = game.registry.by_name['farm']
+    assert farm.upgrade_cost(1) == (0, 60, 100, 40)
+    assert farm.per_level == 6
+    assert [event.name for event in game.events.events][3] == 'Plague'
+    assert game.events.events[3].chance > 0.5
+    while not game.game_over:
+        game.next_day()
+    assert game.day == 20
+
+
+def test_overlapping_sweeps_reuse_the_cache():
+    """A second sweep plays only the new points and agrees with an uncached, pooled run"""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ResultCache(directory)
+        counts = []
+        first = sweep(grid_points([('food', (10, 50, 2))]), games=200, batch_size=100, cache=cache,
+                      workers=1, target=1.0, tolerance=0.5, on_batch=lambda *batch: counts.append(batch))
+        assert counts == [(2, 0), (2, 0)]
+
+        counts.clear()
+        points = grid_points([('food', (10, 50, 3))])
+        second = sweep(points, games=200, batch_size=100, cache=cache, workers=1, target=1.0,
+                       tolerance=0.5, on_batch=lambda *batch: counts.append(batch))
+        assert counts == [(1, 2), (1, 2)]
+        assert [second[0].stats, second[2].stats] == [result.stats for result in first]
+        assert [result.stats for result in sweep(points, games=200, batch_size=100, workers=2,
+                                                 target=1.0, tolerance=0.5)] == [r.stats for r in second]
+
+
+def test_clearly_bad_points_stop_early():
+    points = [{'food': 50}, {'population': 0, 'max_population': 0}]
+    results = sweep(points, games=1000, batch_size=100, workers=1, target=0.5, tolerance=0.1)
+    assert all(result.stopped for result in results)
+    assert [result.stats.games for result in results] == [100, 100]
+
+    results = sweep(points, games=300, batch_size=100, workers=1, target=0.95, tolerance=0.1)
+    assert [(result.stopped, result.stats.games) for result in results] == [(False, 300), (True, 100)]
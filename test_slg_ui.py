@@ -1,71 +1,176 @@
 #!/usr/bin/env python3
 # Test script for SLG Game UI
 
-import tkinter as tk
+import time
+import types
+
+import pytest
+
+import slg_ui
 from slg_ui import SLGGameUI
 
+
+class StubWidget:
+    """Accepts any widget call and keeps the latest configured options"""
+
+    def __init__(self, *args, **options):
+        self.options = dict(options)
+
+    def config(self, **options):
+        self.options.update(options)
+
+    configure = config
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class StubText(StubWidget):
+    """Enough of tk.Text for the event log: whole lines in, oldest lines out"""
+
+    def __init__(self, *args, **options):
+        super().__init__(*args, **options)
+        self.lines = []
+
+    def insert(self, index, text):
+        self.lines += text.splitlines()
+
+    def delete(self, first, last):
+        del self.lines[:int(last.split('.')[0]) - 1]
+
+
+class StubCanvas(StubWidget):
+    def __init__(self, *args, **options):
+        super().__init__(*args, **options)
+        self.items = 0
+
+    def winfo_width(self):
+        return 400
+
+    def winfo_height(self):
+        return 140
+
+    def delete(self, tag):
+        self.items = 0
+
+    def create_line(self, *args, **options):
+        self.items += 1
+
+    create_text = create_line
+
+
+class StubRoot(StubWidget):
+    """A Tk root whose after/after_idle callbacks run when the test says so"""
+
+    def __init__(self):
+        super().__init__()
+        self.idle = []
+        self.timers = []
+
+    def after(self, milliseconds, callback):
+        self.timers.append(callback)
+
+    def after_idle(self, callback):
+        self.idle.append(callback)
+
+    def run_idle(self):
+        while self.idle:
+            self.idle.pop(0)()
+
+
+@pytest.fixture
+def ui(monkeypatch):
+    """An SLGGameUI on stub widgets, so it runs without a display"""
+    tk = types.SimpleNamespace(Text=StubText, Canvas=StubCanvas, IntVar=StubWidget, TclError=Exception,
+                               W='w', E='e', N='n', S='s', END='end', NORMAL='normal', DISABLED='disabled')
+    ttk = types.SimpleNamespace(Frame=StubWidget, Label=StubWidget, LabelFrame=StubWidget, Button=StubWidget,
+                                Spinbox=StubWidget, Scrollbar=StubWidget)
+    announced = []
+    messagebox = types.SimpleNamespace(showinfo=lambda *args: announced.append(args),
+                                       showerror=lambda *args: announced.append(args))
+    monkeypatch.setattr(slg_ui, 'tk', tk)
+    monkeypatch.setattr(slg_ui, 'ttk', ttk)
+    monkeypatch.setattr(slg_ui, 'messagebox', messagebox)
+    game_ui = SLGGameUI(StubRoot(), log_lines=5)
+    game_ui.announced = announced
+    yield game_ui
+    game_ui.worker.stop()
+
+
+def test_render_updates_changed_labels(ui):
+    ui.root.run_idle()
+    assert ui.day_label.options['text'] == "Day: 1"
+    assert ui.gold_label.options['text'] == "Gold: 100"
+
+    with ui.worker.lock:
+        ui.game.gold = ui.game.wood = ui.game.stone = 700
+        ui.game.upgrade_building('farm')
+        ui.game.build_building('farm')
+        ui.state = ui.game.snapshot()
+    ui.update_display()
+    ui.update_display()
+    assert len(ui.root.idle) == 1, "renders are coalesced until the UI is idle"
+    ui.root.run_idle()
+    assert ui.day_label.options['text'] == "Day: 1"
+    assert ui.gold_label.options['text'] == f"Gold: {ui.state.gold}"
+    assert ui.building_labels['farm'].options['text'] == "🏠 Farm: Level 2 x2"
+    assert ui.chart.items == 0, "no chart before two days of history"
+
+
+def test_event_log_keeps_the_newest_lines(ui):
+    for number in range(12):
+        ui.log_event(f"message {number}")
+    ui.root.run_idle()
+    assert ui.event_text.lines == [f"Day 1: message {number}" for number in range(7, 12)]
+    ui.log_event("one more")
+    ui.root.run_idle()
+    assert len(ui.event_text.lines) == ui.logged_lines == 5
+    assert ui.event_text.lines[-1] == "Day 1: one more"
+
+
+def test_poll_renders_worker_updates(ui):
+    ui.fast_forward_days.get = lambda: 40
+    ui.fast_forward()
+    ui.root.run_idle()
+    deadline = time.monotonic() + 10
+    while not ui.rendered.game_over and time.monotonic() < deadline:
+        ui.poll()
+        ui.root.run_idle()
+    assert ui.day_label.options['text'] == "Day: 30"
+    assert ui.next_day_btn.options['state'] == 'disabled'
+    assert ui.announced == [("Victory!", "You survived 30 days! Congratulations!")]
+    assert ui.event_text.lines[-1] == "Day 30: Fast-forwarded to day 30"
+    assert ui.chart.items > len(slg_ui.CHART_SERIES)
+    assert len(ui.root.timers) > 1, "poll always schedules the next poll"
+
+
 def test_basic_functionality():
-    """Test basic functionality of the SLG game UI"""
-    print("Testing SLG Game UI...")
-    
-    # Test importing and creating the game
+    """The real window comes up on a display; skipped where there is none"""
+    tk = pytest.importorskip('tkinter')
     try:
         root = tk.Tk()
-        root.withdraw()  # Hide the window for testing
+    except tk.TclError:
+        pytest.skip("no display available")
+    root.withdraw()  # Hide the window for testing
+    try:
         game = SLGGameUI(root)
-        print("✓ UI creation successful")
-        
-        # Test game state initialization
-        if hasattr(game, 'game') and hasattr(game.game, 'gold'):
-            print(f"✓ Game state initialized - Gold: {game.game.gold}")
-        else:
-            print("✗ Game state initialization failed")
-            return False
-            
-        # Test resource collection
+        game.worker.stop()
+
         initial_food = game.game.food
         game.game.collect_resources()
-        if game.game.food > initial_food:
-            print(f"✓ Resource collection works - Food increased from {initial_food} to {game.game.food}")
-        else:
-            print("✗ Resource collection failed")
-            return False
-            
-        # Test building upgrade
+        assert game.game.food > initial_food
+
         initial_level = game.game.buildings['farm']['level']
-        game.game.gold = 1000  # Give enough resources for upgrade
-        game.game.wood = 1000
-        game.game.stone = 1000
-        
-        if game.game.upgrade_building('farm'):
-            new_level = game.game.buildings['farm']['level']
-            if new_level > initial_level:
-                print(f"✓ Building upgrade works - Farm level increased from {initial_level} to {new_level}")
-            else:
-                print("✗ Building upgrade level not increased")
-                return False
-        else:
-            print("✗ Building upgrade failed")
-            return False
-            
-        # Test next day functionality
+        game.game.gold = game.game.wood = game.game.stone = 1000
+        assert game.game.upgrade_building('farm')
+        assert game.game.buildings['farm']['level'] == initial_level + 1
+
         initial_day = game.game.day
         game.game.next_day()
-        if game.game.day == initial_day + 1:
-            print(f"✓ Next day functionality works - Day increased from {initial_day} to {game.game.day}")
-        else:
-            print("✗ Next day functionality failed")
-            return False
-            
-        print("\n🎉 All tests passed! The SLG Game UI is working correctly.")
-        return True
-        
-    except Exception as e:
-        print(f"✗ Error during testing: {e}")
-        return False
+        assert game.game.day == initial_day + 1
     finally:
-        if 'root' in locals():
-            root.destroy()
+        root.destroy()
+
 
 if __name__ == "__main__":
-    test_basic_functionality()
\ No newline at end of file
+    pytest.main([__file__])
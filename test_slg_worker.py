@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# Test script for the SLG background simulation worker
+
+from slg_core import SLGGame
+from slg_sinks import NULL_SINK
+from slg_worker import SimulationWorker, measure_latency
+
+
+def drain(worker):
+    updates = []
+    while not worker.updates.empty():
+        updates.append(worker.updates.get())
+    return updates
+
+
+def test_commands_run_in_order_on_the_worker():
+    """The worker plays exactly what the same commands would play directly"""
+    worker = SimulationWorker(SLGGame(6, sink=NULL_SINK)).start()
+    worker.submit('upgrade', 'farm')
+    worker.submit('next_day')
+    worker.submit('fast_forward', 5)
+    worker.submit('status')
+    worker.stop()
+
+    game = SLGGame(6, sink=NULL_SINK)
+    game.upgrade_building('farm')
+    for _ in range(6):
+        game.next_day()
+
+    updates = drain(worker)
+    assert updates[-1].state == game.snapshot()
+    assert updates[0].messages == ("Farm upgraded to level 2!",)
+    assert updates[0].state.levels[0] == 2
+    assert sum(update.submitted is not None for update in updates) == 4
+    assert "Fast-forwarded to day 7" in [message for update in updates for message in update.messages]
+
+
+def test_fast_forward_stops_at_game_over_and_on_cancel():
+    worker = SimulationWorker(SLGGame(2, sink=NULL_SINK)).start()
+    worker.submit('fast_forward', 100)
+    worker.stop()
+    assert drain(worker)[-1].state.game_over
+
+    worker = SimulationWorker(SLGGame(2, sink=NULL_SINK))
+    worker.submit('fast_forward', 100)
+    worker.submit('cancel')
+    worker.start().stop()
+    assert not drain(worker)[-1].state.game_over
+
+
+def test_latency_measurement():
+    latencies = measure_latency(probes=9, load_threads=1, poll=0.002)
+    assert len(latencies) == 9
+    assert all(latency > 0 for latency in latencies)
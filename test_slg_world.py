@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# Test script for the multi-settlement SLG world
+
+from collections import Counter
+
+from slg_world import Offer, World, match_offers
+
+
+def test_matching_conserves_resources():
+    """Every unit given is received, along two- and three-way cycles"""
+    offers = [Offer(0, 2, 3, 20), Offer(1, 3, 2, 15), Offer(2, 0, 1, 10), Offer(3, 1, 2, 30),
+              Offer(4, 2, 0, 8), Offer(5, 1, 3, 40)]
+    fills = match_offers(offers)
+    given, received = Counter(), Counter()
+    for fill in fills:
+        given[fill.give] += fill.amount
+        received[fill.want] += fill.amount
+    assert given == received
+    amounts = {offer.settlement: offer.amount for offer in offers}
+    assert all(fill.amount <= amounts[fill.settlement] for fill in fills)
+    assert {fill.settlement for fill in fills} == {0, 1, 2, 3, 4}
+    assert match_offers(list(reversed(offers))) == fills
+
+
+def test_world_plays_the_same_for_any_sharding():
+    """Shards only exchange trades at day boundaries, so sharding never changes the world"""
+    with World(60, shards=1, seed=3, processes=False) as one, \
+            World(60, shards=3, seed=3, processes=False) as three, \
+            World(60, shards=2, seed=3) as pool:
+        for _ in range(29):
+            a, b, c = one.tick(), three.tick(), pool.tick()
+            assert (a.trades, a.live) == (b.trades, b.live) == (c.trades, c.live)
+            assert one.population == three.population == pool.population
+        assert len(c.shard_latency) == 2
+        settlements = [game.snapshot() for shard in three.local for game in shard.settlements]
+        assert [game.snapshot() for game in one.local[0].settlements] == settlements
+        assert sum(report.trades for report in one.reports) > 0